@@ -0,0 +1,5 @@
+"""
+Benchmarks and local stub servers for the Weather MCP server.
+
+Run from the repository root, e.g. ``python -m benchmarks.bench_http_client``.
+"""
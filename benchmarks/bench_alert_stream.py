@@ -0,0 +1,112 @@
+"""
+Benchmark: incremental vs. whole-body parsing of a large alert feed.
+
+Fetches a large alerts feed from the stub NWS server and formats it with
+format_alert, comparing the previous path (read the whole body, json(),
+format every alert) with the streaming parser, with and without a limit.
+Reports latency and peak traced memory; a limited stream returns early
+but the feed still finishes downloading in the background (to be cached),
+which is waited for outside the timing but counts towards memory. Pass
+--feed with a recorded
+/alerts/active response to use real data; otherwise a synthetic feed with
+large polygons is generated.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+
+import config
+from benchmarks.stub_nws import StubNWSServer, alerts_payload
+from utils import formatters, weather_api
+
+def synthetic_feed(alerts: int, vertices: int) -> bytes:
+    """Build an alerts feed whose polygons and zone lists dominate its size."""
+    payload = alerts_payload("XX", alerts)
+    for i, feature in enumerate(payload["features"]):
+        feature["geometry"]["coordinates"] = [[
+            [-120.0 + j * 1e-4, 37.0 + (i + j) * 1e-4] for j in range(vertices)
+        ]]
+        feature["properties"]["affectedZones"] = [
+            f"https://api.weather.gov/zones/forecast/XXZ{j:03d}" for j in range(40)
+        ]
+        feature["properties"]["geocode"] = {"SAME": [f"{j:06d}" for j in range(40)]}
+    return json.dumps(payload).encode()
+
+async def whole_body(url: str, limit: Optional[int]) -> int:
+    """Previous path: parse the whole feed, then format every alert."""
+    config.ALERTS_STREAM_PARSE = False
+    alerts = await weather_api.make_nws_request(url)
+    return len([formatters.format_alert(alert) for alert in alerts[:limit]])
+
+async def streamed(url: str, limit: Optional[int]) -> int:
+    """Streaming path: format each alert as it is parsed."""
+    config.ALERTS_STREAM_PARSE = True
+    return len([
+        formatters.format_alert(alert)
+        async for alert in weather_api.stream_alert_features(url, limit)
+    ])
+
+async def drain() -> None:
+    """Wait for fetches still reading a feed after a limited stream returned."""
+    await asyncio.gather(*weather_api._inflight.values(), return_exceptions=True)
+
+async def measure(run: Callable[[str, Optional[int]], Awaitable[int]],
+                  url: str,
+                  limit: Optional[int],
+                  repeats: int) -> None:
+    latencies: List[float] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        count = await run(url, limit)
+        latencies.append(time.perf_counter() - start)
+        await drain()
+
+    tracemalloc.start()
+    await run(url, limit)
+    await drain()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    name = f"{run.__name__}" + (f" (limit {limit})" if limit else "")
+    print(f"{name:<24} alerts={count:<5} "
+          f"median={statistics.median(latencies) * 1000:8.1f}ms "
+          f"peak_mem={peak / 1e6:7.1f}MB")
+
+async def main_async(args: argparse.Namespace) -> None:
+    feed = Path(args.feed).read_bytes() if args.feed else synthetic_feed(args.alerts, args.vertices)
+    server = StubNWSServer(alerts_feed=feed).start()
+    config.NWS_API_BASE = server.base_url
+    config.ENABLE_CACHE = False
+    config.CONDITIONAL_REQUESTS = False
+    config.NWS_RATE_LIMIT = 0
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    url = f"{server.base_url}/alerts/active/area/XX"
+    print(f"feed size: {len(feed) / 1e6:.1f}MB")
+
+    await weather_api.open_client()
+    try:
+        await measure(whole_body, url, None, args.repeats)
+        await measure(streamed, url, None, args.repeats)
+        await measure(whole_body, url, args.limit, args.repeats)
+        await measure(streamed, url, args.limit, args.repeats)
+    finally:
+        await weather_api.close_client()
+        server.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming alert feed parsing benchmark")
+    parser.add_argument("--feed", help="Recorded alerts feed (JSON file)")
+    parser.add_argument("--alerts", type=int, default=300, help="Alerts in the synthetic feed")
+    parser.add_argument("--vertices", type=int, default=2000, help="Polygon vertices per synthetic alert")
+    parser.add_argument("--limit", type=int, default=10, help="Alert limit for the early-stop runs")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per variant")
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
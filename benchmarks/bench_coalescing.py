@@ -0,0 +1,50 @@
+"""
+Benchmark: request coalescing under a thundering herd.
+
+Fires many concurrent forecast lookups for one coordinate against the
+stub NWS server and checks that only one /points and one forecast
+request reach upstream.
+"""
+import argparse
+import asyncio
+import time
+
+import config
+from benchmarks.stub_nws import StubNWSServer
+from utils import weather_api
+
+async def main_async(args: argparse.Namespace) -> None:
+    server = StubNWSServer(latency=args.latency).start()
+    config.NWS_API_BASE = server.base_url
+    # Measure a cold start: a persisted gridpoint would skip the /points request
+    config.GRIDPOINT_INDEX_ENABLED = False
+    await weather_api.open_client()
+
+    try:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            weather_api.get_forecast_for_location(args.latitude, args.longitude)
+            for _ in range(args.calls)
+        ))
+        elapsed = time.perf_counter() - start
+    finally:
+        await weather_api.close_client()
+        server.stop()
+
+    failed = sum(1 for result in results if result is None)
+    print(f"{args.calls} concurrent calls in {elapsed * 1000:.1f}ms, {failed} failed")
+    print(f"Upstream requests: {server.request_count} {dict(server.requests)}")
+    print(f"Request stats: {weather_api.get_request_stats()}")
+    if server.request_count != 2 or failed:
+        raise SystemExit("Expected exactly two upstream requests (/points + forecast)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Request coalescing benchmark")
+    parser.add_argument("--calls", type=int, default=1000, help="Concurrent get_forecast calls")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub server delay in seconds")
+    parser.add_argument("--latitude", type=float, default=37.7749)
+    parser.add_argument("--longitude", type=float, default=-122.4194)
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
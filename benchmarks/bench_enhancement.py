@@ -0,0 +1,61 @@
+"""
+Benchmark: concurrent get_forecast calls with Deepseek enhancement.
+
+With a non-blocking Deepseek client, N simultaneous enhanced forecasts
+should finish in roughly the time of one (up to DEEPSEEK_MAX_CONCURRENCY).
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import config
+from benchmarks.stub_deepseek import StubDeepseekServer
+from benchmarks.stub_nws import StubNWSServer
+from deepseek_client import DeepseekClient
+from utils import weather_api
+import weather_server
+
+async def timed_calls(calls: int) -> float:
+    """Run concurrent get_forecast tool calls and return the wall time."""
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        weather_server.get_forecast(round(37.7749 + i * 0.1, 4), -122.4194)
+        for i in range(calls)
+    ))
+    return time.perf_counter() - start
+
+async def main_async(args: argparse.Namespace) -> None:
+    nws = StubNWSServer().start()
+    llm = StubDeepseekServer(latency=args.llm_latency).start()
+    config.NWS_API_BASE = nws.base_url
+    config.GRIDPOINT_INDEX_ENABLED = False
+    # Identical prompts would otherwise be served from the enhancement cache
+    config.ENHANCEMENT_CACHE_ENABLED = False
+    weather_server.deepseek = DeepseekClient(api_key="stub", base_url=llm.base_url)
+    await weather_api.open_client()
+
+    try:
+        single = await timed_calls(1)
+        concurrent = await timed_calls(args.calls)
+    finally:
+        await weather_api.close_client()
+        nws.stop()
+        llm.stop()
+
+    print(f"1 enhanced forecast:   {single * 1000:8.1f}ms")
+    print(f"{args.calls} enhanced forecasts: {concurrent * 1000:8.1f}ms "
+          f"({concurrent / single:.2f}x a single call)")
+    print(f"Deepseek requests: {llm.request_count}")
+
+def main():
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    parser = argparse.ArgumentParser(description="Concurrent enhancement benchmark")
+    parser.add_argument("--calls", type=int, default=config.DEEPSEEK_MAX_CONCURRENCY,
+                        help="Simultaneous get_forecast calls")
+    parser.add_argument("--llm-latency", type=float, default=1.0,
+                        help="Stub completion delay in seconds")
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: resolving place names in the offline gazetteer.
+
+Builds a synthetic gazetteer the size of the full Census place and ZCTA
+files (or uses --path) and times mapping it, exact, prefix and ZIP code
+lookups, and fuzzy matches of misspelled names.
+"""
+import argparse
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+import config
+from utils.gazetteer import STATES, Gazetteer, build
+
+def synthetic_source(path: Path, places: int, zips: int, seed: int) -> List[str]:
+    """Write a gazetteer source of random place names and ZIP codes; return the names."""
+    rng = random.Random(seed)
+    states = list(STATES)
+    names = []
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# key\tname\tstate\tlatitude\tlongitude\tpopulation\n")
+        for _ in range(places):
+            name = " ".join(
+                rng.choice(string.ascii_uppercase) + "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+                for _ in range(rng.choice((1, 1, 2)))
+            )
+            state = rng.choice(states)
+            names.append(f"{name}, {state}")
+            f.write(f"-\t{name}\t{state}\t{rng.uniform(25, 49):.4f}\t{rng.uniform(-124, -67):.4f}\t"
+                    f"{rng.randint(100, 100000)}\n")
+        for _ in range(zips):
+            f.write(f"-\t{rng.randint(1000, 99999):05d}\t\t{rng.uniform(25, 49):.4f}\t"
+                    f"{rng.uniform(-124, -67):.4f}\t0\n")
+    return names
+
+def misspell(name: str, rng: random.Random) -> str:
+    """Swap two adjacent letters of the place name (keeping the state)."""
+    place, _, state = name.partition(", ")
+    i = rng.randrange(1, len(place) - 1)
+    return place[:i] + place[i + 1] + place[i] + place[i + 2:] + ", " + state
+
+def per_call(run: Callable[[], Any], iterations: int) -> float:
+    """Return microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        run()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Gazetteer lookup benchmark")
+    parser.add_argument("--path", type=Path, help="Existing gazetteer to query (default: a synthetic one)")
+    parser.add_argument("--places", type=int, default=32000, help="Synthetic places")
+    parser.add_argument("--zips", type=int, default=33000, help="Synthetic ZIP codes")
+    parser.add_argument("--iterations", type=int, default=5000, help="Timed lookups per variant")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        if args.path:
+            path = args.path
+            probe = Gazetteer(path)
+            names = [probe._place(i).label for i in range(len(probe)) if probe._place(i).state]
+            probe.close()
+        else:
+            source = Path(directory) / "source.tsv"
+            names = synthetic_source(source, args.places, args.zips, args.seed)
+            path = Path(directory) / "gazetteer.tsv"
+            build([source], path)
+
+        gazetteer = Gazetteer(path, config.GAZETTEER_FUZZY_CUTOFF)
+        start = time.perf_counter()
+        count = len(gazetteer)
+        print(f"{count} places, {path.stat().st_size / 1e6:.1f}MB, mapped and indexed in "
+              f"{(time.perf_counter() - start) * 1000:.1f}ms")
+
+        queries = [rng.choice(names) for _ in range(args.iterations)]
+        rows = [
+            ("exact (name, state)", queries),
+            ("name only", [query.partition(", ")[0] for query in queries]),
+            ("prefix", [query[:max(4, len(query) // 2)] for query in queries]),
+            ("ZIP code", [f"{rng.randint(1000, 99999):05d}" for _ in queries]),
+            ("misspelled (fuzzy)", [misspell(query, rng) for query in queries[:args.iterations // 10]])
+        ]
+        for name, variant in rows:
+            lookups = iter(variant)
+            print(f"  {name:<22} {per_call(lambda: gazetteer.resolve(next(lookups)), len(variant)):8.1f}us/call")
+        stats = gazetteer.stats()
+        print(f"  hits {stats['hits']}, fuzzy {stats['fuzzy_hits']}, misses {stats['misses']}")
+        gazetteer.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: shared pooled HTTP client vs. a new client per request.
+
+Compares p50/p99 latency of make_nws_request against the previous
+behaviour of opening a fresh httpx.AsyncClient for every call, using
+the local stub NWS server. Every request is for a distinct URL and the
+response cache, conditional requests and rate limiter are turned off, so
+both variants reach the server and only connection handling differs.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+import httpx
+
+import config
+from benchmarks.stub_nws import StubNWSServer
+from utils import weather_api
+
+async def per_call_request(url: str) -> None:
+    """Fetch a URL the way make_nws_request used to: one client per call."""
+    headers = {"User-Agent": config.USER_AGENT, "Accept": "application/geo+json"}
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url, headers=headers, timeout=config.REQUEST_TIMEOUT)
+        response.raise_for_status()
+        response.json()
+
+async def shared_request(url: str) -> None:
+    """Fetch a URL through the shared pooled client."""
+    await weather_api.make_nws_request(url)
+
+async def run(fetch: Callable[[str], Awaitable[None]], urls: List[str], concurrency: int) -> List[float]:
+    """Fetch all URLs with bounded concurrency and return per-call latencies."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def timed(url: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await fetch(url)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(timed(url) for url in urls))
+    return latencies
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def report(name: str, latencies: List[float], elapsed: float) -> None:
+    print(f"{name:<10} n={len(latencies):<6} "
+          f"p50={percentile(latencies, 50) * 1000:7.2f}ms "
+          f"p99={percentile(latencies, 99) * 1000:7.2f}ms "
+          f"mean={statistics.mean(latencies) * 1000:7.2f}ms "
+          f"throughput={len(latencies) / elapsed:8.1f} req/s")
+
+async def main_async(args: argparse.Namespace) -> None:
+    server = StubNWSServer(latency=args.latency).start()
+    config.NWS_API_BASE = server.base_url
+    config.ENABLE_CACHE = False
+    config.CONDITIONAL_REQUESTS = False
+    # The limiter is created when weather_api is imported
+    weather_api._rate_limiter = None
+    # Distinct URLs, so concurrent requests are never coalesced
+    urls = [f"{server.base_url}/alerts/active/area/Z{i:05d}" for i in range(args.requests)]
+
+    try:
+        for name, fetch in (("per-call", per_call_request), ("shared", shared_request)):
+            await weather_api.open_client()
+            start = time.perf_counter()
+            latencies = await run(fetch, urls, args.concurrency)
+            report(name, latencies, time.perf_counter() - start)
+            await weather_api.close_client()
+    finally:
+        server.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared vs per-call HTTP client benchmark")
+    parser.add_argument("--requests", type=int, default=500, help="Total requests per variant")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent requests")
+    parser.add_argument("--latency", type=float, default=0.005, help="Stub server delay in seconds")
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""
+Load test: concurrent MCP sessions against the weather server.
+
+Starts the stub NWS and Deepseek servers, launches weather_server.py as a
+real subprocess pointed at them, and replays tool calls over many
+concurrent sessions, either over stdio (one server process per session,
+as MCP hosts run it) or streamable HTTP (one server process shared by
+all sessions). Calls are read from a JSON Lines file of
+{"tool": ..., "arguments": {...}} objects or generated as a synthetic
+get_alerts/get_forecast mix.
+
+Reports throughput, latency percentiles (overall and per tool), upstream
+request counts and peak memory, and can write the report as JSON and
+compare it with a previous run's report.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+from benchmarks.stub_deepseek import StubDeepseekServer
+from benchmarks.stub_nws import StubNWSServer
+
+ROOT = Path(__file__).resolve().parent.parent
+STATES = ["CA", "TX", "FL", "NY", "WA", "CO", "IL", "OK", "KS", "AZ"]
+
+Call = Tuple[str, Dict[str, Any]]
+
+def load_calls(path: Path) -> List[Call]:
+    """Read recorded tool calls, one {"tool": ..., "arguments": {...}} object per line."""
+    calls = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                calls.append((record["tool"], record.get("arguments") or {}))
+    return calls
+
+def synthetic_calls(count: int, alerts_ratio: float, locations: int, structured: bool, seed: int) -> List[Call]:
+    """Generate a get_alerts/get_forecast mix over a fixed set of states and locations."""
+    rng = random.Random(seed)
+    points = [(round(rng.uniform(30, 47), 4), round(rng.uniform(-120, -75), 4)) for _ in range(locations)]
+    calls = []
+    for _ in range(count):
+        if rng.random() < alerts_ratio:
+            arguments = {"state": rng.choice(STATES)}
+            tool = "get_alerts"
+        else:
+            latitude, longitude = rng.choice(points)
+            arguments = {"latitude": latitude, "longitude": longitude}
+            tool = "get_forecast"
+        if structured:
+            arguments["structured"] = True
+        calls.append((tool, arguments))
+    return calls
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered) + 0.5)) - 1))]
+
+def latency_stats(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "p50": round(percentile(ordered, 50) * 1000, 2),
+        "p95": round(percentile(ordered, 95) * 1000, 2),
+        "p99": round(percentile(ordered, 99) * 1000, 2),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2)
+    }
+
+def _server_pids() -> List[int]:
+    """Find weather_server.py processes started by this process and their workers (Linux only)."""
+    children = defaultdict(list)
+    commands = {}
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            commands[int(entry.name)] = (entry / "cmdline").read_bytes()
+        except OSError:
+            continue
+        children[int(stat.rpartition(")")[2].split()[1])].append(int(entry.name))
+
+    pending = [pid for pid in children[os.getpid()] if b"weather_server.py" in commands.get(pid, b"")]
+    pids = []
+    while pending:
+        pid = pending.pop()
+        pids.append(pid)
+        pending.extend(children[pid])
+    return pids
+
+def _peak_rss_mb(pid: int) -> Optional[float]:
+    """Peak resident memory of a process in MB, from /proc (None if unavailable)."""
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _upstream_kind(path: str) -> str:
+    """Group stub NWS request paths by endpoint."""
+    parts = path.strip("/").split("/")
+    if parts[0] == "gridpoints":
+        return "gridpoints/" + "/".join(parts[3:]) if len(parts) > 3 else "gridpoints"
+    return parts[0] if parts[0] != "alerts" else "alerts"
+
+@asynccontextmanager
+async def http_server(env: Dict[str, str], port: int, workers: int = 1) -> AsyncIterator[str]:
+    """Run weather_server.py with the streamable HTTP transport and yield its URL."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "weather_server.py",
+        cwd=ROOT,
+        env={**env, "MCP_TRANSPORT": "streamable-http", "MCP_HOST": "127.0.0.1", "MCP_PORT": str(port),
+             "MCP_WORKERS": str(workers)},
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.close()
+                break
+            except OSError:
+                if process.returncode is not None or time.monotonic() > deadline:
+                    raise RuntimeError("weather_server.py did not start listening")
+                await asyncio.sleep(0.1)
+        yield f"http://127.0.0.1:{port}/mcp"
+    finally:
+        process.terminate()
+        await process.wait()
+
+class LoadRun:
+    """Drives concurrent sessions through one shared queue of calls."""
+
+    def __init__(self, calls: List[Call], sessions: int):
+        self.calls: Iterator[Call] = iter(calls)
+        self.sessions = sessions
+        self.results: List[Tuple[str, float, bool]] = []
+        self.ready = asyncio.Event()
+        self.finished = asyncio.Event()
+        self.close = asyncio.Event()
+        self.started = 0.0
+        self.wall = 0.0
+        self.server_rss: List[Optional[float]] = []
+        self._ready_count = 0
+        self._finished_count = 0
+
+    async def session(self, transport: Any) -> None:
+        """Open one session, wait for the start signal, then run calls until none remain."""
+        async with transport as streams:
+            async with ClientSession(streams[0], streams[1]) as session:
+                await session.initialize()
+                self._ready_count += 1
+                if self._ready_count == self.sessions:
+                    self.ready.set()
+                await self.ready.wait()
+
+                for tool, arguments in self.calls:
+                    start = time.perf_counter()
+                    try:
+                        result = await session.call_tool(tool, arguments)
+                        error = bool(result.isError)
+                    except Exception:
+                        error = True
+                    self.results.append((tool, time.perf_counter() - start, error))
+
+                self._finished_count += 1
+                if self._finished_count == self.sessions:
+                    self.finished.set()
+                # Keep the server process alive until its memory has been sampled
+                await self.close.wait()
+
+async def _wait(event: asyncio.Event, tasks: List[asyncio.Task]) -> None:
+    """Wait for an event, re-raising the error of any session that fails first."""
+    waiter = asyncio.create_task(event.wait())
+    done, _ = await asyncio.wait([waiter, *tasks], return_when=asyncio.FIRST_COMPLETED)
+    if waiter not in done:
+        waiter.cancel()
+        for task in done:
+            task.result()
+        raise RuntimeError("A session ended early")
+
+async def run_load(args: argparse.Namespace, calls: List[Call]) -> Dict[str, Any]:
+    nws = StubNWSServer(latency=args.nws_latency, error_rate=args.nws_error_rate).start()
+    llm = StubDeepseekServer(latency=args.llm_latency, error_rate=args.llm_error_rate).start()
+    cache_dir = tempfile.TemporaryDirectory()
+    env = {
+        **os.environ,
+        "NWS_API_BASE": nws.base_url,
+        "DEEPSEEK_API_BASE": llm.base_url,
+        "DEEPSEEK_API_KEY": "" if args.no_llm else "stub",
+        "NWS_RATE_LIMIT": str(args.nws_rate_limit),
+        "WEATHER_CACHE_DIR": cache_dir.name,
+        "FASTMCP_LOG_LEVEL": "WARNING"
+    }
+    run = LoadRun(calls, args.sessions)
+    errlog = open(os.devnull, "w")
+
+    try:
+        setup_start = time.perf_counter()
+        if args.transport == "stdio":
+            params = StdioServerParameters(command=sys.executable, args=["weather_server.py"], env=env, cwd=ROOT)
+            tasks = [asyncio.create_task(run.session(stdio_client(params, errlog=errlog)))
+                     for _ in range(args.sessions)]
+            await _run_phases(run, tasks)
+        else:
+            async with http_server(env, _free_port(), args.workers) as url:
+                tasks = [asyncio.create_task(run.session(streamablehttp_client(url)))
+                         for _ in range(args.sessions)]
+                await _run_phases(run, tasks)
+        setup = run.started - setup_start
+    finally:
+        errlog.close()
+        nws.stop()
+        llm.stop()
+        cache_dir.cleanup()
+
+    latencies = [latency for _, latency, _ in run.results]
+    by_tool: Dict[str, List[float]] = defaultdict(list)
+    for tool, latency, _ in run.results:
+        by_tool[tool].append(latency)
+    upstream = Counter()
+    for path, count in nws.requests.items():
+        upstream[_upstream_kind(path)] += count
+    server_rss = [rss for rss in run.server_rss if rss is not None]
+
+    return {
+        "transport": args.transport,
+        "workers": args.workers if args.transport == "streamable-http" else args.sessions,
+        "sessions": args.sessions,
+        "calls": len(run.results),
+        "errors": sum(error for _, _, error in run.results),
+        "session_setup_s": round(setup, 3),
+        "wall_s": round(run.wall, 3),
+        "throughput_rps": round(len(run.results) / run.wall, 2),
+        "latency_ms": latency_stats(latencies),
+        "tools": {
+            tool: {"calls": len(values), **latency_stats(values)}
+            for tool, values in sorted(by_tool.items())
+        },
+        "upstream": {
+            "nws_requests": nws.request_count,
+            "nws_by_endpoint": dict(sorted(upstream.items())),
+            "nws_not_modified": nws.not_modified,
+            "nws_injected_errors": nws.errors,
+            "deepseek_requests": llm.request_count,
+            "deepseek_injected_errors": llm.errors
+        },
+        "memory_mb": {
+            "server_processes": len(server_rss),
+            "server_peak_rss_max": max(server_rss) if server_rss else None,
+            "server_peak_rss_total": round(sum(server_rss), 1) if server_rss else None,
+            "client_peak_rss": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        }
+    }
+
+async def _run_phases(run: LoadRun, tasks: List[asyncio.Task]) -> None:
+    """Start all sessions together, time the calls, sample memory, then close."""
+    try:
+        await _wait(run.ready, tasks)
+        run.started = time.perf_counter()
+        await _wait(run.finished, tasks)
+        run.wall = time.perf_counter() - run.started
+        run.server_rss = [_peak_rss_mb(pid) for pid in _server_pids()]
+    finally:
+        run.close.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+def print_report(report: Dict[str, Any]) -> None:
+    latency = report["latency_ms"]
+    print(f"{report['transport']}: {report['workers']} server processes, "
+          f"{report['sessions']} sessions, {report['calls']} calls, "
+          f"{report['errors']} errors (setup {report['session_setup_s']:.2f}s)")
+    print(f"  throughput {report['throughput_rps']:.1f} calls/s over {report['wall_s']:.2f}s")
+    print(f"  latency    p50 {latency['p50']:.1f}ms  p95 {latency['p95']:.1f}ms  "
+          f"p99 {latency['p99']:.1f}ms  max {latency['max']:.1f}ms")
+    for tool, stats in report["tools"].items():
+        print(f"  {tool:<18} {stats['calls']:>5} calls  p50 {stats['p50']:.1f}ms  p95 {stats['p95']:.1f}ms")
+    upstream = report["upstream"]
+    print(f"  upstream   NWS {upstream['nws_requests']} {upstream['nws_by_endpoint']}, "
+          f"Deepseek {upstream['deepseek_requests']}")
+    memory = report["memory_mb"]
+    print(f"  memory     server peak {memory['server_peak_rss_max']}MB "
+          f"(total {memory['server_peak_rss_total']}MB over {memory['server_processes']} processes), "
+          f"client {memory['client_peak_rss']}MB")
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print the change of key metrics relative to a baseline report."""
+    print("vs baseline:")
+    metrics = [
+        ("throughput_rps", report["throughput_rps"], baseline["throughput_rps"]),
+        ("latency p50", report["latency_ms"]["p50"], baseline["latency_ms"]["p50"]),
+        ("latency p95", report["latency_ms"]["p95"], baseline["latency_ms"]["p95"]),
+        ("latency p99", report["latency_ms"]["p99"], baseline["latency_ms"]["p99"]),
+        ("nws_requests", report["upstream"]["nws_requests"], baseline["upstream"]["nws_requests"]),
+        ("server_peak_rss_max", report["memory_mb"]["server_peak_rss_max"],
+         baseline["memory_mb"]["server_peak_rss_max"])
+    ]
+    for name, current, previous in metrics:
+        if current is None or not previous:
+            continue
+        print(f"  {name:<20} {previous:>10} -> {current:>10} ({(current - previous) / previous:+.1%})")
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP server load test")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http"], default="stdio")
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent MCP sessions")
+    parser.add_argument("--workers", type=int, default=1, help="Server worker processes (streamable-http only)")
+    parser.add_argument("--calls", type=int, default=400, help="Synthetic calls to run")
+    parser.add_argument("--replay", help="JSON Lines file of recorded tool calls to run instead")
+    parser.add_argument("--alerts-ratio", type=float, default=0.3, help="Share of get_alerts in the synthetic mix")
+    parser.add_argument("--locations", type=int, default=50, help="Distinct forecast locations in the synthetic mix")
+    parser.add_argument("--structured", action="store_true", help="Request structured output (no enhancement)")
+    parser.add_argument("--seed", type=int, default=1, help="Synthetic mix random seed")
+    parser.add_argument("--nws-latency", type=float, default=0.05, help="Stub NWS response delay in seconds")
+    parser.add_argument("--nws-error-rate", type=float, default=0.0, help="Fraction of NWS requests to fail")
+    parser.add_argument("--nws-rate-limit", type=float, default=0,
+                        help="Server's NWS rate limit (0 disables it, to load the server rather than the limiter)")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Stub Deepseek completion delay in seconds")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fraction of completions to fail")
+    parser.add_argument("--no-llm", action="store_true", help="Run the server without Deepseek enhancement")
+    parser.add_argument("--output", help="Write the report as JSON to this file ('-' for stdout)")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against")
+    args = parser.parse_args()
+
+    if args.replay:
+        calls = load_calls(Path(args.replay))
+    else:
+        calls = synthetic_calls(args.calls, args.alerts_ratio, args.locations, args.structured, args.seed)
+
+    report = asyncio.run(run_load(args, calls))
+    if args.output == "-":
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+        if args.output:
+            Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    if args.baseline:
+        compare(report, json.loads(Path(args.baseline).read_text()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: __slots__ domain models vs. raw NWS dicts.
+
+Measures the memory retained per cached entry and formatting throughput
+for forecasts and alert feeds, comparing the parsed models held in the
+cache now with the raw JSON dicts (and dict-probing formatters) used
+before. Payloads are padded with the fields real NWS responses carry
+(geometry, zone lists, quantitative values) that the server never reads.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from benchmarks.stub_nws import alerts_payload, forecast_payload
+from utils import formatters
+from utils.models import Alert, Forecast
+
+def nws_forecast() -> bytes:
+    """Build a 14-period forecast with the extra fields NWS sends."""
+    payload = forecast_payload()
+    payload["geometry"] = {"type": "Polygon", "coordinates": [[[-122.4, 37.7]] * 5]}
+    payload["properties"]["updateTime"] = "2025-01-01T06:00:00+00:00"
+    for period in payload["properties"]["periods"]:
+        period.update({
+            "startTime": "2025-01-01T06:00:00-08:00",
+            "endTime": "2025-01-01T18:00:00-08:00",
+            "temperatureTrend": None,
+            "probabilityOfPrecipitation": {"unitCode": "wmoUnit:percent", "value": 20},
+            "dewpoint": {"unitCode": "wmoUnit:degC", "value": 8.3},
+            "relativeHumidity": {"unitCode": "wmoUnit:percent", "value": 80},
+            "icon": "https://api.weather.gov/icons/land/day/sct?size=medium"
+        })
+    return json.dumps(payload).encode()
+
+def nws_alerts(count: int) -> bytes:
+    """Build an alerts feed with geometry, zone lists and parameters."""
+    payload = alerts_payload("CA", count)
+    for feature in payload["features"]:
+        feature["properties"].update({
+            "affectedZones": [f"https://api.weather.gov/zones/forecast/CAZ{j:03d}" for j in range(10)],
+            "geocode": {"SAME": [f"006{j:03d}" for j in range(10)], "UGC": [f"CAZ{j:03d}" for j in range(10)]},
+            "parameters": {"NWSheadline": ["WIND ADVISORY IN EFFECT"], "VTEC": ["/O.NEW.KMTR.WI.Y.0001/"]},
+            "senderName": "NWS San Francisco CA",
+            "sent": "2025-01-01T05:00:00+00:00",
+            "status": "Actual",
+            "messageType": "Alert"
+        })
+    return json.dumps(payload).encode()
+
+# The dict-probing formatters used before the models, kept for comparison
+def dict_format_forecast(data: Dict[str, Any], limit: int = 5) -> str:
+    location = data.get("properties", {}).get("location", {}).get("name", "the requested location")
+    periods = data.get("properties", {}).get("periods", [])[:limit]
+    texts = [
+        f"{p.get('name', 'Unknown Period')}\nTemperature: {p.get('temperature', '?')}°"
+        f"{p.get('temperatureUnit', 'F')}\nWind: {p.get('windSpeed', 'Unknown')} "
+        f"{p.get('windDirection', '')}\n{p.get('shortForecast', '')}\n\n"
+        f"{p.get('detailedForecast', 'No detailed forecast available')}"
+        for p in periods
+    ]
+    return f"Weather forecast for {location}:\n\n" + "\n\n" + "-" * 40 + "\n\n".join(texts)
+
+def dict_format_alerts(data: Dict[str, Any]) -> str:
+    texts = []
+    for feature in data.get("features", []):
+        props = feature.get("properties", {})
+        texts.append(
+            f"ALERT: {props.get('event', 'Unknown Event')}\n{props.get('headline', '')}\n\n"
+            f"AREA: {props.get('areaDesc', 'Unknown Area')}\nSEVERITY: {props.get('severity', 'Unknown')}\n"
+            f"URGENCY: {props.get('urgency', 'Unknown')}\nCERTAINTY: {props.get('certainty', 'Unknown')}\n\n"
+            f"DESCRIPTION:\n{props.get('description', 'No description available')}\n\n"
+            f"INSTRUCTIONS:\n{props.get('instruction', 'No specific instructions provided')}"
+        )
+    return f"Found {len(texts)} active weather alerts:\n\n" + "\n\n" + "-" * 40 + "\n\n".join(texts)
+
+def retained(build: Callable[[], Any], entries: int) -> float:
+    """Build entries the way the cache holds them and return bytes retained per entry."""
+    tracemalloc.start()
+    cache: List[Any] = [build() for _ in range(entries)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del cache
+    return current / entries
+
+def throughput(format_entry: Callable[[], str], iterations: int) -> float:
+    """Return formatted entries per second."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        format_entry()
+    return iterations / (time.perf_counter() - start)
+
+def report(name: str, dict_bytes: float, model_bytes: float, dict_rate: float, model_rate: float) -> None:
+    print(name)
+    print(f"  dict   {dict_bytes / 1024:8.1f}KB/entry  {dict_rate:10.0f} formats/s")
+    print(f"  model  {model_bytes / 1024:8.1f}KB/entry  {model_rate:10.0f} formats/s")
+    print(f"  memory {model_bytes / dict_bytes:.0%} of dict, formatting {model_rate / dict_rate:.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Domain model vs dict benchmark")
+    parser.add_argument("--entries", type=int, default=200, help="Cached entries to build")
+    parser.add_argument("--alerts", type=int, default=20, help="Alerts per feed")
+    parser.add_argument("--iterations", type=int, default=5000, help="Formatting iterations")
+    args = parser.parse_args()
+
+    forecast_body = nws_forecast()
+    alerts_body = nws_alerts(args.alerts)
+    format_forecast = formatters.format_forecast.__wrapped__
+    format_alerts = formatters.format_alerts_summary.__wrapped__
+
+    forecast_dict = json.loads(forecast_body)
+    forecast_model = Forecast.from_payload(forecast_dict)
+    report(
+        "forecast (14 periods)",
+        retained(lambda: json.loads(forecast_body), args.entries),
+        retained(lambda: Forecast.from_payload(json.loads(forecast_body)), args.entries),
+        throughput(lambda: dict_format_forecast(forecast_dict), args.iterations),
+        throughput(lambda: format_forecast(forecast_model), args.iterations)
+    )
+
+    alerts_dict = json.loads(alerts_body)
+    alerts_model = tuple(Alert.from_feature(feature) for feature in alerts_dict["features"])
+    report(
+        f"alerts ({args.alerts} per feed)",
+        retained(lambda: json.loads(alerts_body), args.entries),
+        retained(lambda: tuple(Alert.from_feature(f) for f in json.loads(alerts_body)["features"]), args.entries),
+        throughput(lambda: dict_format_alerts(alerts_dict), args.iterations // 10),
+        throughput(lambda: format_alerts(alerts_model), args.iterations // 10)
+    )
+
+if __name__ == "__main__":
+    main()
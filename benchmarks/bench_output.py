@@ -0,0 +1,74 @@
+"""
+Benchmark: text vs. structured (JSON) tool output.
+
+Compares the size of the get_forecast/get_alerts results and the time to
+build and serialize them, using stub NWS payloads. "payload" is the text a
+model reads; "wire" is the serialized result, which for structured output
+also carries the structuredContent copy. Memoization is bypassed so every
+iteration pays the full formatting cost.
+"""
+import argparse
+import time
+from typing import Any, Callable, Dict
+
+from mcp.types import CallToolResult, TextContent
+
+from benchmarks.stub_nws import alerts_payload, forecast_payload
+from utils import formatters
+from utils.models import Alert, Forecast
+import weather_server
+
+def text_result(text: str) -> CallToolResult:
+    """Wrap text the way FastMCP returns a plain string tool result."""
+    return CallToolResult(content=[TextContent(type="text", text=text)])
+
+def measure(build: Callable[[], CallToolResult], iterations: int) -> Dict[str, Any]:
+    """Build and serialize a result repeatedly, returning its sizes and mean time."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = build()
+        wire = result.model_dump_json(by_alias=True, exclude_none=True)
+    elapsed = time.perf_counter() - start
+    return {
+        "payload": len(result.content[0].text.encode("utf-8")),
+        "wire": len(wire.encode("utf-8")),
+        "us": elapsed / iterations * 1e6
+    }
+
+def report(name: str, text: Dict[str, Any], structured: Dict[str, Any]) -> None:
+    print(name)
+    for variant, stats in (("text", text), ("structured", structured)):
+        print(f"  {variant:<11} payload={stats['payload']:7d}B wire={stats['wire']:7d}B "
+              f"build+serialize={stats['us']:8.1f}us")
+    print(f"  structured payload is {structured['payload'] / text['payload']:.0%} of text")
+
+def main():
+    parser = argparse.ArgumentParser(description="Text vs structured tool output benchmark")
+    parser.add_argument("--iterations", type=int, default=2000, help="Iterations per variant")
+    parser.add_argument("--periods", type=int, default=5, help="Forecast periods to include")
+    parser.add_argument("--alerts", type=int, default=20, help="Alerts in the stub response")
+    args = parser.parse_args()
+
+    forecast = Forecast.from_payload(forecast_payload())
+    alerts = tuple(Alert.from_feature(feature) for feature in alerts_payload("CA", args.alerts)["features"])
+    format_forecast = formatters.format_forecast.__wrapped__
+    forecast_to_dict = formatters.forecast_to_dict.__wrapped__
+    format_alerts = formatters.format_alerts_summary.__wrapped__
+    alerts_to_dict = formatters.alerts_to_dict.__wrapped__
+    error = "Unable to fetch data."
+
+    report(
+        f"forecast ({args.periods} periods)",
+        measure(lambda: text_result(format_forecast(forecast, args.periods)), args.iterations),
+        measure(lambda: weather_server._structured_result(
+            forecast_to_dict(forecast, args.periods), error), args.iterations)
+    )
+    report(
+        f"alerts ({args.alerts} alerts)",
+        measure(lambda: text_result(format_alerts(alerts)), args.iterations),
+        measure(lambda: weather_server._structured_result(
+            alerts_to_dict(alerts, args.alerts), error), args.iterations)
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: conditional revalidation of expired cache entries.
+
+Fetches a forecast from the stub NWS server, expires the cached entry and
+fetches it again, and checks that the second fetch is answered with
+304 Not Modified and reuses the cached payload instead of downloading and
+parsing the body again. Then checks that a response marked no-store
+removes the expired entry, so its older body is not served as stale.
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import config
+from benchmarks.stub_nws import StubNWSServer
+from utils import weather_api
+from utils.shared_cache import SharedResponseCache
+
+async def main_async(args: argparse.Namespace) -> None:
+    server = StubNWSServer(latency=args.latency).start()
+    config.NWS_API_BASE = server.base_url
+    config.ENABLE_CACHE = True
+    config.CONDITIONAL_REQUESTS = True
+    weather_api._rate_limiter = None
+    url = f"{server.base_url}/gridpoints/TST/10,20/forecast"
+    await weather_api.open_client()
+
+    try:
+        start = time.perf_counter()
+        first = await weather_api.make_nws_request(url)
+        full_ms = (time.perf_counter() - start) * 1000
+        rate_before = weather_api.get_request_stats()["not_modified_rate"]
+
+        # Expire the entry; the validators and the parsed payload are kept
+        weather_api._response_cache.delete(url)
+        start = time.perf_counter()
+        second = await weather_api.make_nws_request(url)
+        revalidated_ms = (time.perf_counter() - start) * 1000
+        stats = weather_api.get_request_stats()
+        cached_again = weather_api._response_cache.get(url) is second
+        not_modified = server.not_modified
+
+        # Let the entry expire into its stale window, then get a no-store answer
+        weather_api._response_cache.set(url, second, 0.01)
+        await asyncio.sleep(0.02)
+        server.cache_control = "no-store"
+        await weather_api.make_nws_request(url)
+        stale_after_no_store = weather_api._response_cache.get_stale(url)
+    finally:
+        await weather_api.close_client()
+        server.stop()
+
+    print(f"Full fetch {full_ms:.1f}ms, revalidated fetch {revalidated_ms:.1f}ms")
+    print(f"Upstream requests: {server.request_count}, 304 responses: {not_modified}")
+    print(f"not_modified_rate: {rate_before} -> {stats['not_modified_rate']}")
+
+    errors = []
+    if first is None or second is None:
+        errors.append("a fetch failed")
+    if not_modified != 1:
+        errors.append(f"expected one 304 response, got {not_modified}")
+    if second is not first:
+        errors.append("the revalidated fetch did not reuse the cached payload")
+    if not stats["not_modified_rate"] > rate_before:
+        errors.append("not_modified_rate did not go up")
+    if not cached_again:
+        errors.append("the revalidated payload was not cached again")
+    if stale_after_no_store is not None:
+        errors.append("a no-store response left the older cached payload in place")
+    with tempfile.TemporaryDirectory() as directory:
+        shared = SharedResponseCache(Path(directory) / "shared.db")
+        shared.set(url, "old", 60)
+        shared.set(url, "new", 0)
+        if shared.get(url) is not None:
+            errors.append("a no-store response left the older shared payload in place")
+        shared.close()
+    if errors:
+        raise SystemExit("Revalidation check failed: " + "; ".join(errors))
+
+def main():
+    parser = argparse.ArgumentParser(description="Conditional revalidation benchmark")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub server delay in seconds")
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
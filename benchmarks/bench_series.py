@@ -0,0 +1,66 @@
+"""
+Benchmark: summarizing hourly forecasts and raw gridpoint data.
+
+Times the parse of a 7-day hourly forecast and gridpoint response into
+array columns and the summaries computed over them, compared with a
+per-hour loop over the forecast periods as dicts.
+"""
+import argparse
+import math
+import time
+from typing import Any, Callable, Dict
+
+from benchmarks.stub_nws import grid_data_payload, hourly_payload
+from utils import series
+from utils.models import GridData, HourlyForecast
+
+def loop_summary(data: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    """Per-hour Python loop over the period dicts, for comparison."""
+    low, high, total, count = math.inf, -math.inf, 0.0, 0
+    windows, run, wind = [], 0, 0.0
+    for period in data["properties"]["periods"]:
+        temperature = period["temperature"]
+        low, high, total, count = min(low, temperature), max(high, temperature), total + temperature, count + 1
+        chance = (period.get("probabilityOfPrecipitation") or {}).get("value") or 0
+        if chance >= threshold:
+            run += 1
+        elif run:
+            windows.append(run)
+            run = 0
+        wind = max(wind, float(period["windSpeed"].split()[0]))
+    if run:
+        windows.append(run)
+    return {"min": low, "max": high, "mean": total / count, "windows": windows, "wind": wind}
+
+def per_call(run: Callable[[], Any], iterations: int) -> float:
+    """Return microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        run()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Hourly series summary benchmark")
+    parser.add_argument("--hours", type=int, default=168, help="Hours of data (7 days by default)")
+    parser.add_argument("--threshold", type=float, default=30, help="Precipitation threshold (%%)")
+    parser.add_argument("--iterations", type=int, default=2000, help="Timed calls per variant")
+    args = parser.parse_args()
+
+    hourly_data = hourly_payload(args.hours)
+    grid_payload = grid_data_payload(args.hours)
+    hourly = HourlyForecast.from_payload(hourly_data)
+    grid = GridData.from_payload(grid_payload)
+
+    rows = [
+        ("parse hourly", lambda: HourlyForecast.from_payload(hourly_data)),
+        ("parse grid data", lambda: GridData.from_payload(grid_payload)),
+        ("summarize hourly (loop)", lambda: loop_summary(hourly_data, args.threshold)),
+        ("summarize hourly", lambda: series.summarize_hourly(hourly, args.hours, args.threshold)),
+        ("summarize grid data", lambda: series.summarize_grid_data(grid, args.hours, args.threshold))
+    ]
+    print(f"{args.hours} hours")
+    for name, run in rows:
+        print(f"  {name:<26} {per_call(run, args.iterations):8.1f}us/call")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: opening and reading an NWS response snapshot.
+
+Records a synthetic snapshot of points, forecast and alert responses,
+then times opening it with its memory-mapped index and without one (the
+whole data file scanned, as after a crash during recording), random
+lookups by URL, and lookups parsed into models as replay serves them.
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+from benchmarks.stub_nws import alerts_payload, forecast_payload, points_payload
+from utils.snapshot import SnapshotStore
+from utils.weather_api import _parse_payload
+
+BASE_URL = "https://api.weather.gov"
+
+def record(path: Path, locations: int) -> List[str]:
+    """Record points and forecast responses for locations, plus alerts for a few states."""
+    urls = []
+    store = SnapshotStore(path, writable=True)
+    forecast = json.dumps(forecast_payload()).encode()
+    for i in range(locations):
+        latitude, longitude = 30 + i % 170 / 10, -120 + i // 170 / 10
+        points = points_payload(BASE_URL, latitude, longitude)
+        url = f"{BASE_URL}/points/{latitude},{longitude}"
+        store.append(url, json.dumps(points).encode())
+        forecast_url = points["properties"]["forecast"]
+        store.append(forecast_url, forecast)
+        urls += [url, forecast_url]
+    for state in ("CA", "TX", "FL", "NY", "WA"):
+        url = f"{BASE_URL}/alerts/active/area/{state}"
+        store.append(url, json.dumps(alerts_payload(state, 50)).encode())
+        urls.append(url)
+    stats = store.stats()
+    store.close()
+    print(f"{stats['entries']} URLs, {path.stat().st_size / 1e6:.1f}MB "
+          f"(compression {stats['compression_ratio']}x)")
+    return urls
+
+def per_call(run: Callable[[], Any], iterations: int) -> float:
+    """Return microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        run()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot store benchmark")
+    parser.add_argument("--locations", type=int, default=10000, help="Locations recorded (two URLs each)")
+    parser.add_argument("--iterations", type=int, default=20000, help="Timed lookups per variant")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "nws"
+        urls = record(path, args.locations)
+        rng = random.Random(0)
+        sample = [rng.choice(urls) for _ in range(args.iterations)]
+
+        start = time.perf_counter()
+        store = SnapshotStore(path)
+        print(f"  open with index            {(time.perf_counter() - start) * 1000:8.2f}ms")
+        store.close()
+
+        store.index_path.unlink()
+        start = time.perf_counter()
+        scanned = SnapshotStore(path)
+        print(f"  open without index         {(time.perf_counter() - start) * 1000:8.2f}ms")
+        scanned.close()
+        # Closing a writable store writes the index again
+        SnapshotStore(path, writable=True).close()
+
+        store = SnapshotStore(path)
+        lookups = iter(sample * 2)
+        print(f"  get                        {per_call(lambda: store.get(next(lookups)), args.iterations):8.1f}us/call")
+        points = [url for url in sample if "/points/" in url]
+        lookups = iter(points)
+        print(f"  get + parse (points)       "
+              f"{per_call(lambda: (url := next(lookups), _parse_payload(url, json.loads(store.get(url)))), len(points)):8.1f}us/call")
+        misses = iter(f"{BASE_URL}/points/{i},0" for i in range(args.iterations))
+        print(f"  miss                       {per_call(lambda: store.get(next(misses)), args.iterations):8.1f}us/call")
+        store.close()
+
+if __name__ == "__main__":
+    main()
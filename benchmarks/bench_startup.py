@@ -0,0 +1,126 @@
+"""
+Benchmark: cold start of the stdio server.
+
+MCP hosts spawn weather_server.py once per session, so its startup is
+latency the user waits for. Launches the server repeatedly and times, from
+process spawn, the response to the initialize request and to the first
+tools/list request, speaking newline-delimited JSON-RPC over its stdio
+directly so no client library time is included. With --import-time, also
+lists the slowest imports (python -X importtime) of one launch.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-03-26",
+        "capabilities": {},
+        "clientInfo": {"name": "bench_startup", "version": "1.0"}
+    }
+}
+INITIALIZED = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+LIST_TOOLS = {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}
+
+def _send(process: subprocess.Popen, message: Dict) -> None:
+    process.stdin.write(json.dumps(message).encode() + b"\n")
+    process.stdin.flush()
+
+def _response(process: subprocess.Popen, request_id: int) -> Dict:
+    """Read messages until the response to request_id."""
+    while True:
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError("weather_server.py exited before responding")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+def launch(env: Dict[str, str], python_args: Tuple[str, ...] = ()) -> Tuple[float, float, str]:
+    """
+    Start the server and time its first responses.
+
+    Returns:
+        (seconds to the initialize response, seconds to the tools/list response, stderr)
+    """
+    # A file rather than a pipe, so a chatty server cannot block on a full pipe
+    errors = tempfile.TemporaryFile()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, *python_args, "weather_server.py"],
+        cwd=ROOT, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=errors
+    )
+    try:
+        _send(process, INITIALIZE)
+        _response(process, 1)
+        initialized = time.perf_counter() - start
+        _send(process, INITIALIZED)
+        _send(process, LIST_TOOLS)
+        _response(process, 2)
+        listed = time.perf_counter() - start
+    finally:
+        process.stdin.close()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        errors.seek(0)
+        stderr = errors.read().decode(errors="replace")
+        errors.close()
+    return initialized, listed, stderr
+
+def slowest_imports(stderr: str, count: int) -> List[Tuple[int, str]]:
+    """Parse python -X importtime output into the top-level imports with the largest cumulative time."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        # Top-level packages only (nested imports are indented)
+        if not name.startswith(" ") and "." not in name:
+            imports.append((int(cumulative), name))
+    return sorted(imports, reverse=True)[:count]
+
+def main():
+    parser = argparse.ArgumentParser(description="stdio server cold start benchmark")
+    parser.add_argument("--runs", type=int, default=10, help="Server launches to time")
+    parser.add_argument("--import-time", type=int, default=0, metavar="N",
+                        help="Also show the N slowest top-level imports of one launch")
+    args = parser.parse_args()
+
+    env = {**os.environ, "DEEPSEEK_API_KEY": os.environ.get("DEEPSEEK_API_KEY", "bench"),
+           "FASTMCP_LOG_LEVEL": "WARNING"}
+
+    # Warm the OS page cache and bytecode caches; the first launch is not timed
+    launch(env)
+    initialize, list_tools = [], []
+    for _ in range(args.runs):
+        initialized, listed, _ = launch(env)
+        initialize.append(initialized)
+        list_tools.append(listed)
+
+    for name, samples in (("initialize", initialize), ("tools/list", list_tools)):
+        print(f"{name:<11} median {statistics.median(samples) * 1000:7.1f}ms  "
+              f"min {min(samples) * 1000:7.1f}ms  max {max(samples) * 1000:7.1f}ms")
+
+    if args.import_time:
+        _, _, stderr = launch(env, ("-X", "importtime"))
+        print("slowest imports (cumulative):")
+        for microseconds, name in slowest_imports(stderr, args.import_time):
+            print(f"  {name:<24} {microseconds / 1000:7.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: time-to-first-byte of streamed vs. buffered enhancements.
+
+Runs get_forecast through an in-memory MCP client session against the
+stub NWS and Deepseek servers and reports when the first content (a
+progress notification or the final result) reached the client. Exits
+non-zero unless the streamed call delivered its progress notifications
+before the result, in order (the weather text, then the stub's
+completion in chunks with increasing progress), and the buffered call
+delivered none.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+
+import config
+from benchmarks.stub_deepseek import COMPLETION_TEXT, StubDeepseekServer
+from benchmarks.stub_nws import StubNWSServer
+from deepseek_client import DeepseekClient
+from mcp.shared.memory import create_connected_server_and_client_session
+import weather_server
+
+# (arrival time, progress, message) of each progress notification
+Notification = Tuple[float, float, str]
+
+async def timed_call(stream: bool) -> Tuple[List[Notification], str, float]:
+    """
+    Call get_forecast once and print time-to-first-byte and total time.
+
+    Returns:
+        Tuple of (progress notifications received, result text, time the result arrived)
+    """
+    notifications: List[Notification] = []
+
+    async def on_progress(progress: float, total: Optional[float], message: Optional[str]) -> None:
+        notifications.append((time.perf_counter(), progress, message or ""))
+
+    async with create_connected_server_and_client_session(weather_server.mcp._mcp_server) as session:
+        start = time.perf_counter()
+        result = await session.call_tool(
+            "get_forecast",
+            {"latitude": 37.7749, "longitude": -122.4194, "stream": stream},
+            progress_callback=on_progress
+        )
+        end = time.perf_counter()
+
+    ttfb = (notifications[0][0] if notifications else end) - start
+    print(f"stream={str(stream):<5} ttfb={ttfb * 1000:8.1f}ms total={(end - start) * 1000:8.1f}ms "
+          f"notifications={len(notifications)}")
+    text = "".join(getattr(block, "text", "") for block in result.content)
+    return notifications, text, end
+
+def check_stream(notifications: List[Notification], text: str, end: float) -> List[str]:
+    """Check the notifications of a streamed call, returning the problems found."""
+    if len(notifications) < 2:
+        return [f"expected the weather text and at least one enhancement chunk, got {len(notifications)} notifications"]
+    errors = []
+    if any(arrived > end for arrived, _, _ in notifications):
+        errors.append("a progress notification arrived after the result")
+    if notifications[0][1] != 0 or "Temperature:" not in notifications[0][2]:
+        errors.append("the first notification did not carry the weather text at progress 0")
+    progress = [value for _, value, _ in notifications[1:]]
+    if progress != sorted(set(progress)):
+        errors.append(f"progress did not increase: {progress}")
+    streamed = "".join(message for _, _, message in notifications[1:])
+    if streamed != COMPLETION_TEXT:
+        errors.append(f"streamed chunks do not add up to the completion: {streamed!r}")
+    if progress and progress[-1] != len(COMPLETION_TEXT):
+        errors.append(f"final progress {progress[-1]} is not the completion length {len(COMPLETION_TEXT)}")
+    if COMPLETION_TEXT not in text:
+        errors.append("the result does not contain the completion")
+    return errors
+
+async def main_async(args: argparse.Namespace) -> None:
+    nws = StubNWSServer().start()
+    llm = StubDeepseekServer(latency=args.llm_latency, token_latency=args.token_latency).start()
+    config.NWS_API_BASE = nws.base_url
+    config.GRIDPOINT_INDEX_ENABLED = False
+    # Identical prompts would otherwise be served from the enhancement cache
+    config.ENHANCEMENT_CACHE_ENABLED = False
+    weather_server.deepseek = DeepseekClient(api_key="stub", base_url=llm.base_url)
+
+    try:
+        buffered, _, _ = await timed_call(False)
+        streamed, text, end = await timed_call(True)
+    finally:
+        nws.stop()
+        llm.stop()
+
+    errors = check_stream(streamed, text, end)
+    if buffered:
+        errors.append(f"the buffered call sent {len(buffered)} progress notifications")
+    if errors:
+        raise SystemExit("Streaming check failed: " + "; ".join(errors))
+
+def main():
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    parser = argparse.ArgumentParser(description="Streaming enhancement benchmark")
+    parser.add_argument("--llm-latency", type=float, default=0.5,
+                        help="Stub delay before the first token in seconds")
+    parser.add_argument("--token-latency", type=float, default=0.05,
+                        help="Stub delay between tokens in seconds")
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Local stub of the OpenAI-compatible Deepseek chat completions API.
+
+Answers POST /chat/completions with a fixed completion after a
+configurable delay, either as one JSON response or, for "stream": true
+requests, as server-sent chunk events with a per-token delay, so
+enhancement paths can be benchmarked offline. A fraction of requests can
+be failed with a configurable status to exercise enhancement fallbacks.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+COMPLETION_TEXT = ("Expect mild temperatures and light northwest winds. "
+                   "No significant weather is expected; dress in layers for cool evenings.")
+
+def completion_payload(model: str, text: str = COMPLETION_TEXT) -> Dict[str, Any]:
+    """Build a non-streaming chat completion response."""
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": text},
+            "finish_reason": "stop"
+        }],
+        "usage": {"prompt_tokens": 200, "completion_tokens": 40, "total_tokens": 240}
+    }
+
+def chunk_payload(model: str, delta: Dict[str, str], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+    """Build a streaming chat completion chunk."""
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+
+class StubDeepseekHandler(BaseHTTPRequestHandler):
+    """Request handler serving stub chat completions."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Silence per-request logging."""
+
+    def do_POST(self) -> None:
+        stub: "StubDeepseekServer" = self.server.stub  # type: ignore[attr-defined]
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        stub.record()
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not Found"}})
+            return
+
+        if stub.latency:
+            time.sleep(stub.latency)
+        if stub.error_rate and random.random() < stub.error_rate:
+            stub.record_error()
+            self._send_json(stub.error_status, {"error": {"message": "Injected Error"}})
+            return
+        model = request.get("model", "stub")
+        if request.get("stream"):
+            include_usage = (request.get("stream_options") or {}).get("include_usage", False)
+            self._send_stream(model, stub.token_latency, include_usage)
+        else:
+            self._send_json(200, completion_payload(model))
+
+    def _send_stream(self, model: str, token_latency: float, include_usage: bool) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        # Words with their trailing space, so the deltas join to exactly COMPLETION_TEXT
+        words = COMPLETION_TEXT.split(" ")
+        tokens = [word + " " for word in words[:-1]] + words[-1:]
+        events = [chunk_payload(model, {"role": "assistant", "content": ""})]
+        events += [chunk_payload(model, {"content": token}) for token in tokens]
+        events.append(chunk_payload(model, {}, "stop"))
+        if include_usage:
+            usage_event = chunk_payload(model, {})
+            usage_event["choices"] = []
+            usage_event["usage"] = completion_payload(model)["usage"]
+            events.append(usage_event)
+        for index, event in enumerate(events):
+            if token_latency and 0 < index <= len(tokens):
+                time.sleep(token_latency)
+            self._write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class StubDeepseekServer:
+    """A stub Deepseek API server running on a background thread."""
+
+    def __init__(self, 
+                 host: str = "127.0.0.1", 
+                 port: int = 0, 
+                 latency: float = 0.0, 
+                 token_latency: float = 0.0, 
+                 error_rate: float = 0.0, 
+                 error_status: int = 500):
+        """
+        Initialize the stub server.
+        
+        Args:
+            host: Interface to bind to
+            port: Port to bind to (0 picks a free port)
+            latency: Delay before each completion in seconds
+            token_latency: Delay between streamed tokens in seconds
+            error_rate: Fraction of completions answered with error_status
+            error_status: HTTP status used for injected errors
+        """
+        self.latency = latency
+        self.token_latency = token_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.request_count = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), StubDeepseekHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self) -> None:
+        with self._lock:
+            self.request_count += 1
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def start(self) -> "StubDeepseekServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Deepseek API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=1.0, help="Completion delay in seconds")
+    parser.add_argument("--token-latency", type=float, default=0.05,
+                        help="Delay between streamed tokens in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of completions to fail")
+    parser.add_argument("--error-status", type=int, default=500, help="Status of injected errors")
+    args = parser.parse_args()
+
+    server = StubDeepseekServer(args.host, args.port, args.latency, args.token_latency,
+                                args.error_rate, args.error_status)
+    print(f"Stub Deepseek API listening on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+Local stub of the NWS API used by the benchmarks.
+
+Serves minimal /points, /gridpoints (forecast, hourly forecast and raw grid
+data) and /alerts/active/area responses over plain HTTP/1.1 with keep-alive, with configurable latency.
+State alerts can instead be served from a recorded feed.
+Responses carry ETag/Last-Modified validators and conditional requests
+are answered with 304 Not Modified. A fraction of requests can be failed
+with a configurable status to exercise retries and circuit breaking.
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+OFFICE = "TST"
+LAST_MODIFIED = "Wed, 01 Jan 2025 06:00:00 GMT"
+
+def _grid_for(latitude: float, longitude: float) -> Tuple[int, int]:
+    """Map a coordinate onto a fake 2.5km grid cell."""
+    return int(latitude * 40) % 1000, int(longitude * 40) % 1000
+
+def points_payload(base_url: str, latitude: float, longitude: float) -> Dict[str, Any]:
+    """Build a /points response for a coordinate."""
+    grid_x, grid_y = _grid_for(latitude, longitude)
+    grid_url = f"{base_url}/gridpoints/{OFFICE}/{grid_x},{grid_y}"
+    return {
+        "properties": {
+            "gridId": OFFICE,
+            "gridX": grid_x,
+            "gridY": grid_y,
+            "forecast": f"{grid_url}/forecast",
+            "forecastHourly": f"{grid_url}/forecast/hourly",
+            "forecastGridData": grid_url,
+            "relativeLocation": {"properties": {"city": "Stubville", "state": "ST"}}
+        }
+    }
+
+def forecast_payload(periods: int = 14) -> Dict[str, Any]:
+    """Build a 12-hour forecast response."""
+    return {
+        "properties": {
+            "periods": [
+                {
+                    "number": i + 1,
+                    "name": f"Period {i + 1}",
+                    "isDaytime": i % 2 == 0,
+                    "temperature": 60 + (i % 7),
+                    "temperatureUnit": "F",
+                    "windSpeed": "5 to 10 mph",
+                    "windDirection": "NW",
+                    "shortForecast": "Partly Cloudy",
+                    "detailedForecast": "Partly cloudy, with a high near 65. "
+                                        "Northwest wind 5 to 10 mph."
+                }
+                for i in range(periods)
+            ]
+        }
+    }
+
+def hourly_payload(hours: int = 156) -> Dict[str, Any]:
+    """Build an hourly forecast response with a daily temperature cycle and rain bands."""
+    start = datetime(2025, 1, 1, 6, tzinfo=timezone.utc)
+    return {
+        "properties": {
+            "updateTime": start.isoformat(),
+            "periods": [
+                {
+                    "number": i + 1,
+                    "startTime": (start + timedelta(hours=i)).isoformat(),
+                    "endTime": (start + timedelta(hours=i + 1)).isoformat(),
+                    "isDaytime": 14 <= (i + 6) % 24 or (i + 6) % 24 < 2,
+                    "temperature": 50 + abs(12 - (i + 6) % 24),
+                    "temperatureUnit": "F",
+                    "probabilityOfPrecipitation": {"unitCode": "wmoUnit:percent", "value": (i * 7) % 60},
+                    "windSpeed": f"{5 + i % 15} mph",
+                    "windDirection": "NW",
+                    "shortForecast": "Chance Rain Showers"
+                }
+                for i in range(hours)
+            ]
+        }
+    }
+
+def grid_data_payload(hours: int = 168) -> Dict[str, Any]:
+    """Build a raw gridpoint response whose layers use multi-hour validTime intervals."""
+    start = datetime(2025, 1, 1, 6, tzinfo=timezone.utc)
+
+    def layer(uom: str, step: int, value) -> Dict[str, Any]:
+        return {
+            "uom": f"wmoUnit:{uom}",
+            "values": [
+                {"validTime": f"{(start + timedelta(hours=i)).isoformat()}/PT{step}H", "value": value(i)}
+                for i in range(0, hours, step)
+            ]
+        }
+
+    return {
+        "properties": {
+            "updateTime": start.isoformat(),
+            "temperature": layer("degC", 1, lambda i: 10 + abs(12 - i % 24) / 2),
+            "probabilityOfPrecipitation": layer("percent", 3, lambda i: (i * 7) % 60),
+            "quantitativePrecipitation": layer("mm", 6, lambda i: (i % 4) * 1.5),
+            "windSpeed": layer("km_h-1", 2, lambda i: 8 + i % 20),
+            "windGust": layer("km_h-1", 2, lambda i: 15 + i % 30)
+        }
+    }
+
+def alerts_payload(state: str, count: int = 5) -> Dict[str, Any]:
+    """Build an active alerts response for a state."""
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "id": f"urn:oid:stub.{state}.{i}",
+                "type": "Feature",
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [[[-120.0 + j * 0.01, 37.0 + j * 0.01] for j in range(50)]]
+                },
+                "properties": {
+                    "id": f"urn:oid:stub.{state}.{i}",
+                    "event": "Wind Advisory",
+                    "headline": f"Wind Advisory issued for {state}",
+                    "areaDesc": f"Zone {i}, {state}",
+                    "severity": "Moderate",
+                    "certainty": "Likely",
+                    "urgency": "Expected",
+                    "description": "Southwest winds 25 to 35 mph with gusts up to 55 mph.",
+                    "instruction": "Use extra caution when driving.",
+                    "effective": "2025-01-01T06:00:00+00:00",
+                    "onset": f"2025-01-01T{6 + i % 12:02d}:00:00+00:00",
+                    "ends": "2025-01-02T06:00:00+00:00",
+                    "expires": "2025-01-02T06:00:00+00:00"
+                }
+            }
+            for i in range(count)
+        ]
+    }
+
+class StubNWSHandler(BaseHTTPRequestHandler):
+    """Request handler serving stub NWS responses."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Silence per-request logging."""
+
+    def do_GET(self) -> None:
+        stub: "StubNWSServer" = self.server.stub  # type: ignore[attr-defined]
+        path, _, query = self.path.partition("?")
+        stub.record(path)
+        if stub.latency:
+            time.sleep(stub.latency)
+
+        if stub.error_rate and random.random() < stub.error_rate:
+            stub.record_error()
+            headers = {"Retry-After": str(stub.retry_after)} if stub.retry_after is not None else None
+            self._send(stub.error_status, {"title": "Injected Error", "status": stub.error_status}, headers)
+            return
+
+        if stub.alerts_feed is not None and path.startswith("/alerts/active/area/"):
+            payload, body = None, stub.alerts_feed
+        else:
+            payload = stub.payload_for(path, parse_qs(query))
+            if payload is None:
+                self._send(404, {"title": "Not Found", "status": 404})
+                return
+            body = json.dumps(payload).encode()
+
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        headers = {"ETag": etag, "Last-Modified": LAST_MODIFIED}
+        if stub.cache_control is not None:
+            headers["Cache-Control"] = stub.cache_control
+        if self.headers.get("If-None-Match") == etag:
+            stub.record_not_modified()
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send(200, payload, headers, body)
+
+    def _send(self, 
+              status: int, 
+              payload: Optional[Dict[str, Any]], 
+              headers: Optional[Dict[str, str]] = None, 
+              body: Optional[bytes] = None) -> None:
+        body = body if body is not None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/geo+json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading early (e.g. a streamed alert feed hit its limit)
+            self.close_connection = True
+
+class StubNWSServer:
+    """A stub NWS API server running on a background thread."""
+
+    def __init__(self, 
+                 host: str = "127.0.0.1", 
+                 port: int = 0, 
+                 latency: float = 0.0, 
+                 error_rate: float = 0.0, 
+                 error_status: int = 503, 
+                 retry_after: Optional[float] = None, 
+                 alerts_feed: Optional[bytes] = None,
+                 cache_control: Optional[str] = None):
+        """
+        Initialize the stub server.
+        
+        Args:
+            host: Interface to bind to
+            port: Port to bind to (0 picks a free port)
+            latency: Artificial delay added to every response in seconds
+            error_rate: Fraction of requests answered with error_status
+            error_status: HTTP status used for injected errors
+            retry_after: Retry-After value sent with injected errors
+            alerts_feed: Body served for every state alerts request (e.g. a recorded feed)
+            cache_control: Cache-Control header sent with 200 and 304 responses
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.alerts_feed = alerts_feed
+        self.cache_control = cache_control
+        self.errors = 0
+        self.requests: Counter = Counter()
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), StubNWSHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def record(self, path: str) -> None:
+        with self._lock:
+            self.requests[path] += 1
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def payload_for(self, path: str, query: Optional[Dict[str, List[str]]] = None) -> Optional[Dict[str, Any]]:
+        """Return the response payload for a request path, or None for 404."""
+        query = query or {}
+        parts = path.strip("/").split("/")
+        if len(parts) == 2 and parts[0] == "points":
+            latitude, longitude = (float(v) for v in parts[1].split(","))
+            return points_payload(self.base_url, latitude, longitude)
+        if parts[:1] == ["gridpoints"] and parts[3:] == ["forecast"]:
+            return forecast_payload()
+        if parts[:1] == ["gridpoints"] and parts[3:] == ["forecast", "hourly"]:
+            return hourly_payload()
+        if len(parts) == 3 and parts[0] == "gridpoints":
+            return grid_data_payload()
+        if len(parts) == 4 and parts[:3] == ["alerts", "active", "area"]:
+            return alerts_payload(parts[3])
+        if parts == ["alerts", "active"]:
+            areas = ",".join(query.get("area", []) + query.get("zone", [])) or "XX"
+            features = [
+                feature
+                for area in areas.split(",")
+                for feature in alerts_payload(area)["features"]
+            ]
+            return {"type": "FeatureCollection", "features": features}
+        return None
+
+    def start(self) -> "StubNWSServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub NWS API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Response delay in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests to fail")
+    parser.add_argument("--error-status", type=int, default=503, help="Status of injected errors")
+    args = parser.parse_args()
+
+    server = StubNWSServer(args.host, args.port, args.latency, args.error_rate, args.error_status)
+    print(f"Stub NWS API listening on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
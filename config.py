@@ -3,32 +3,105 @@ Configuration settings for the Weather MCP server.
 """
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
+# Load environment variables from .env file (python-dotenv is only imported if there is one)
 dotenv_path = Path(__file__).parent / '.env'
-load_dotenv(dotenv_path)
+if dotenv_path.is_file():
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path)
 
 # API Keys
 DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY')
 NWS_API_KEY = os.getenv('NWS_API_KEY')  # Currently NWS doesn't require an API key, but including for future-proofing
 
 # Weather API configuration
-NWS_API_BASE = "https://api.weather.gov"
+NWS_API_BASE = os.getenv('NWS_API_BASE', "https://api.weather.gov")
 USER_AGENT = "weather-mcp-server/1.0 (your-email@example.com)"  # Replace with your contact info
 
 # Request settings
 REQUEST_TIMEOUT = 30.0  # Timeout for API requests in seconds
 MAX_RETRIES = 3  # Maximum number of retries for failed requests
+REQUEST_DEADLINE = 45.0  # Overall time budget for a request including retries, in seconds
+RETRY_BASE_DELAY = 0.5  # Minimum backoff between retries in seconds
+RETRY_MAX_DELAY = 8.0  # Maximum backoff between retries in seconds
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failures before requests to a host fail fast
+CIRCUIT_RESET_TIMEOUT = 30.0  # Seconds before a trial request is sent to an unhealthy host
+NWS_RATE_LIMIT = float(os.getenv('NWS_RATE_LIMIT', 5.0))  # Maximum sustained requests per second to api.weather.gov (0 disables)
+NWS_RATE_BURST = 10  # Requests allowed back to back before rate limiting applies
+NWS_RATE_LIMIT_FILE = os.getenv('NWS_RATE_LIMIT_FILE')  # Optional file shared by processes on one host
+ALERTS_STREAM_PARSE = True  # Parse alert feeds incrementally, dropping geometry and unused properties
+
+# HTTP connection pool settings (shared client for all NWS requests)
+HTTP_MAX_CONNECTIONS = 20  # Maximum number of concurrent connections
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 10  # Idle connections kept open for reuse
+HTTP_KEEPALIVE_EXPIRY = 30.0  # Seconds an idle connection is kept alive
+HTTP2_ENABLED = True  # Use HTTP/2 when the optional 'h2' package is installed
 
 # Deepseek API configuration
-DEEPSEEK_API_BASE = "https://api.deepseek.com"
+DEEPSEEK_API_BASE = os.getenv('DEEPSEEK_API_BASE', "https://api.deepseek.com")
 DEEPSEEK_MODEL = "deepseek-chat"  # Default model
+DEEPSEEK_MAX_TOKENS = 500  # Maximum tokens generated per enhancement
+DEEPSEEK_TIMEOUT = 30.0  # Timeout for a single enhancement in seconds
+DEEPSEEK_MAX_CONCURRENCY = 8  # Maximum concurrent Deepseek requests
+DEEPSEEK_STREAM = False  # Stream enhancements as MCP progress notifications by default
+DEEPSEEK_STREAM_CHUNK_CHARS = 64  # Minimum characters per streamed progress notification
+
+# Batch forecast settings
+BATCH_MAX_LOCATIONS = 100  # Maximum locations accepted by get_forecasts_batch
+BATCH_MAX_CONCURRENCY = 8  # Maximum concurrent upstream requests per batch
 
 # MCP Server settings
 SERVER_NAME = "weather"
-DEFAULT_TRANSPORT = "stdio"  # Default transport protocol (stdio, sse, streamable-http)
+DEFAULT_TRANSPORT = os.getenv('MCP_TRANSPORT', "stdio")  # Default transport protocol (stdio, sse, streamable-http)
+SERVER_HOST = os.getenv('MCP_HOST', "127.0.0.1")  # Interface the sse/streamable-http transports listen on
+SERVER_PORT = int(os.getenv('MCP_PORT', 8000))  # Port the sse/streamable-http transports listen on
+SERVER_WORKERS = int(os.getenv('MCP_WORKERS', 1))  # streamable-http worker processes (>1 runs stateless workers sharing caches)
+SERVER_WORKER_MAX_REQUESTS = int(os.getenv('MCP_WORKER_MAX_REQUESTS', 0))  # Recycle a worker after this many requests (0 never)
+SERVER_GRACEFUL_TIMEOUT = 30.0  # Seconds workers get to finish in-flight requests on shutdown
+METRICS_ENABLED = True  # Record per-stage latency histograms and per-tool gauges (weather://metrics, /metrics)
 
 # Cache settings
 ENABLE_CACHE = True
-CACHE_TTL = 300  # Time-to-live for cached data in seconds (5 minutes)
\ No newline at end of file
+CACHE_TTL = 300  # Time-to-live for cached data in seconds (5 minutes)
+CACHE_MAX_ENTRIES = 1024  # Maximum number of cached responses (LRU eviction)
+CACHE_TTL_ALERTS = 60  # Active alerts change often (1 minute)
+CACHE_TTL_POINTS = 7 * 24 * 3600  # Points-to-grid mappings almost never change (1 week)
+CACHE_TTL_FORECAST = CACHE_TTL  # Gridpoint forecasts
+CONDITIONAL_REQUESTS = True  # Revalidate expired responses with ETag/If-Modified-Since
+CONDITIONAL_VALIDATOR_TTL = 24 * 3600  # Seconds validators and payloads are kept for revalidation
+CACHE_STALE_GRACE = 60  # Seconds an expired response may be served while it is refreshed
+CACHE_DIR = Path(os.getenv('WEATHER_CACHE_DIR', Path(__file__).parent / '.cache'))  # On-disk caches
+SHARED_CACHE_ENABLED = os.getenv('WEATHER_SHARED_CACHE') == '1'  # Share responses between processes (set by worker mode)
+SHARED_CACHE_PATH = CACHE_DIR / 'responses.sqlite3'
+SHARED_CACHE_LEASE = 10.0  # Seconds a process waits for another process's fetch of the same URL
+
+# Snapshot settings (recorded NWS responses for offline replay and outage fallback)
+SNAPSHOT_MODE = os.getenv('NWS_SNAPSHOT_MODE', "off")  # off, record, replay (never contact NWS) or fallback (when NWS fails)
+SNAPSHOT_PATH = Path(os.getenv('NWS_SNAPSHOT_PATH', CACHE_DIR / 'nws_snapshot'))  # Data file; its index is kept next to it (.idx)
+
+# Background prefetch settings (keeps hot alerts/forecasts fresh)
+PREFETCH_ENABLED = True
+PREFETCH_MAX_HOT = 50  # Number of most-requested URLs kept fresh
+PREFETCH_REFRESH_AHEAD = 10.0  # Refresh this many seconds before the cached copy expires
+PREFETCH_BUDGET_PER_MINUTE = 30  # Maximum background requests per minute to api.weather.gov
+PREFETCH_INTERVAL = 1.0  # Seconds between scheduling passes
+
+# Alert subscription settings (weather://alerts/{state} change feed)
+ALERT_FEED_INTERVAL = 60.0  # Seconds between polls of the subscribed states (through the response cache)
+ALERT_FEED_HISTORY = 1024  # Changes kept per state; subscribers further behind get a full snapshot
+
+# Gridpoint index settings (persistent lat/lon -> forecast URL mapping)
+GRIDPOINT_INDEX_ENABLED = True
+GRIDPOINT_INDEX_PATH = CACHE_DIR / 'gridpoints.sqlite3'
+GRIDPOINT_PRECISION = 3  # Decimal places coordinates are snapped to (~110m)
+GRIDPOINT_IMPORT_FILE = os.getenv('GRIDPOINT_IMPORT_FILE')  # Optional JSON Lines file to warm the index from
+
+# Gazetteer settings (offline place-name and ZIP code geocoding)
+GAZETTEER_PATH = Path(os.getenv('GAZETTEER_PATH', Path(__file__).parent / 'data' / 'gazetteer.tsv'))
+GAZETTEER_FUZZY_CUTOFF = 0.8  # Minimum similarity (0-1) of a misspelled name to its match
+
+# Enhancement cache settings (reuses Deepseek output for identical prompts)
+ENHANCEMENT_CACHE_ENABLED = True
+ENHANCEMENT_CACHE_MAX_ENTRIES = 256  # In-memory entries (LRU eviction)
+ENHANCEMENT_CACHE_DISK = SHARED_CACHE_ENABLED  # Also persist enhancements to disk (shared by worker processes)
+ENHANCEMENT_CACHE_PATH = CACHE_DIR / 'enhancements.sqlite3'
\ No newline at end of file
@@ -1,47 +1,90 @@
 """
 Client for Deepseek AI API integration.
 """
+import asyncio
 import sys
-from typing import Dict, List, Optional
-from openai import OpenAI
-from pathlib import Path
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple
 
-# Add parent directory to path to import config
-sys.path.append(str(Path(__file__).parent))
 import config
+from utils.enhancement_cache import EnhancementCache
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
 
 class DeepseekClient:
     """A client for interacting with the Deepseek AI API."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         """
         Initialize the Deepseek API client.
         
+        The openai SDK and its HTTP connection pool are only loaded when
+        the first completion is requested, keeping them off the server's
+        startup path.
+        
         Args:
             api_key: Deepseek API key (defaults to config.DEEPSEEK_API_KEY)
+            base_url: API base URL (defaults to config.DEEPSEEK_API_BASE)
         """
         self.api_key = api_key or config.DEEPSEEK_API_KEY
+        self.base_url = base_url or config.DEEPSEEK_API_BASE
+        self._client: Optional["AsyncOpenAI"] = None
+        # Bounds the number of concurrent completions across all tool calls
+        self._semaphore = asyncio.Semaphore(config.DEEPSEEK_MAX_CONCURRENCY)
+        self.cache = None
+        if config.ENHANCEMENT_CACHE_ENABLED:
+            self.cache = EnhancementCache(
+                config.ENHANCEMENT_CACHE_MAX_ENTRIES,
+                config.ENHANCEMENT_CACHE_PATH if config.ENHANCEMENT_CACHE_DISK else None
+            )
         if not self.api_key:
             print("WARNING: No Deepseek API key provided. LLM features will be unavailable.", 
                   file=sys.stderr)
-            self.client = None
-        else:
-            self.client = OpenAI(api_key=self.api_key, base_url=config.DEEPSEEK_API_BASE)
+
+    @property
+    def client(self) -> Optional["AsyncOpenAI"]:
+        """The OpenAI-compatible API client, created on first use (None without an API key)."""
+        if self._client is None and self.api_key:
+            import httpx
+            from openai import AsyncOpenAI
+            
+            # Pooled async HTTP client so completions never block the event loop
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=config.DEEPSEEK_MAX_CONCURRENCY,
+                    max_keepalive_connections=config.DEEPSEEK_MAX_CONCURRENCY
+                ),
+                timeout=config.DEEPSEEK_TIMEOUT
+            )
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=http_client
+            )
+        return self._client
 
     def is_available(self) -> bool:
         """Check if the Deepseek API client is available."""
-        return self.client is not None
+        return bool(self.api_key)
 
     async def enhance_weather_interpretation(self, 
                                        weather_data: str, 
-                                       query: Optional[str] = None) -> str:
+                                       query: Optional[str] = None,
+                                       ttl: Optional[float] = None) -> str:
         """
         Use Deepseek to enhance weather data with interpretations and advice.
         
+        At most config.DEEPSEEK_MAX_CONCURRENCY completions run at once, and
+        each is bounded by config.DEEPSEEK_TIMEOUT (including time spent
+        waiting for a slot). Cancelling the calling task cancels the request.
+        
         Args:
             weather_data: Raw or formatted weather data
             query: Optional user query for more specific interpretation
+            ttl: How long the enhancement may be reused, normally the
+                freshness of the weather data (defaults to config.CACHE_TTL)
             
         Returns:
             Enhanced interpretation of the weather data
@@ -50,20 +93,153 @@ class DeepseekClient:
             return weather_data
         
         prompt = self._build_enhancement_prompt(weather_data, query)
+        cache_key = self._cache_key(prompt)
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached
         
         try:
-            response = self.client.chat.completions.create(
-                model=config.DEEPSEEK_MODEL,
-                messages=prompt,
-                max_tokens=500
+            start = time.perf_counter()
+            content, tokens = await asyncio.wait_for(
+                self._complete(prompt),
+                timeout=config.DEEPSEEK_TIMEOUT
             )
-            
-            return response.choices[0].message.content
+            if cache_key:
+                await self.cache.set(cache_key, content, self._cache_ttl(ttl), tokens, 
+                                     time.perf_counter() - start)
+            return content
+        except asyncio.TimeoutError:
+            print(f"Deepseek enhancement timed out after {config.DEEPSEEK_TIMEOUT}s", 
+                  file=sys.stderr)
+            return weather_data
         except Exception as e:
             print(f"Error enhancing weather data with Deepseek: {e}", file=sys.stderr)
             # Fall back to returning original data
             return weather_data
     
+    async def stream_weather_interpretation(self, 
+                                            weather_data: str, 
+                                            query: Optional[str] = None,
+                                            ttl: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        Stream a Deepseek enhancement of weather data as it is generated.
+        
+        Uses the same concurrency limit, overall timeout and cache as
+        enhance_weather_interpretation(); a cached enhancement is yielded
+        as a single delta. Errors end the stream early.
+        
+        Args:
+            weather_data: Raw or formatted weather data
+            query: Optional user query for more specific interpretation
+            ttl: How long the enhancement may be reused (defaults to config.CACHE_TTL)
+            
+        Yields:
+            Text deltas of the enhanced interpretation
+        """
+        if not self.is_available():
+            return
+        
+        prompt = self._build_enhancement_prompt(weather_data, query)
+        cache_key = self._cache_key(prompt)
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + config.DEEPSEEK_TIMEOUT
+        
+        try:
+            async with self._semaphore:
+                stream = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=config.DEEPSEEK_MODEL,
+                        messages=prompt,
+                        max_tokens=config.DEEPSEEK_MAX_TOKENS,
+                        stream=True,
+                        stream_options={"include_usage": True}
+                    ),
+                    timeout=deadline - loop.time()
+                )
+                chunks = stream.__aiter__()
+                parts = []
+                tokens = 0
+                try:
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(
+                                chunks.__anext__(), 
+                                timeout=deadline - loop.time()
+                            )
+                        except StopAsyncIteration:
+                            break
+                        if chunk.usage:
+                            tokens = chunk.usage.total_tokens
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            parts.append(chunk.choices[0].delta.content)
+                            yield parts[-1]
+                finally:
+                    await stream.close()
+                
+                if cache_key and parts:
+                    await self.cache.set(cache_key, "".join(parts), self._cache_ttl(ttl), tokens, 
+                                         loop.time() - start)
+        except asyncio.TimeoutError:
+            print(f"Deepseek enhancement timed out after {config.DEEPSEEK_TIMEOUT}s", 
+                  file=sys.stderr)
+        except Exception as e:
+            print(f"Error streaming Deepseek enhancement: {e}", file=sys.stderr)
+    
+    async def _complete(self, messages: List[Dict[str, str]]) -> Tuple[str, int]:
+        """
+        Run a chat completion once a concurrency slot is free.
+        
+        Args:
+            messages: Chat messages to send
+            
+        Returns:
+            Tuple of (completion content, total tokens used)
+            
+        Raises:
+            ValueError: If the completion has no content (e.g. it was filtered)
+        """
+        async with self._semaphore:
+            response = await self.client.chat.completions.create(
+                model=config.DEEPSEEK_MODEL,
+                messages=messages,
+                max_tokens=config.DEEPSEEK_MAX_TOKENS
+            )
+        tokens = response.usage.total_tokens if response.usage else 0
+        content = response.choices[0].message.content if response.choices else None
+        if not content:
+            finish_reason = response.choices[0].finish_reason if response.choices else None
+            raise ValueError(f"Deepseek returned an empty completion (finish reason: {finish_reason})")
+        return content, tokens
+    
+    def _cache_key(self, messages: List[Dict[str, str]]) -> Optional[str]:
+        """Get the enhancement cache key for a prompt, or None if caching is disabled."""
+        if self.cache is None:
+            return None
+        return EnhancementCache.key(config.DEEPSEEK_MODEL, messages, config.DEEPSEEK_MAX_TOKENS)
+    
+    @staticmethod
+    def _cache_ttl(ttl: Optional[float]) -> float:
+        """Get the TTL for a cached enhancement."""
+        return config.CACHE_TTL if ttl is None else ttl
+    
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Get enhancement cache statistics.
+        
+        Returns:
+            Dict with hit/miss counters and tokens/seconds saved, or None if
+            the cache is disabled
+        """
+        return self.cache.stats() if self.cache else None
+    
     def _build_enhancement_prompt(self, 
                                  weather_data: str, 
                                  query: Optional[str] = None) -> List[Dict[str, str]]:
@@ -1,5 +1,9 @@
 import asyncio
+import json
+import shlex
+import statistics
 import sys
+import time
 import argparse
 import traceback
 from contextlib import AsyncExitStack
@@ -20,92 +24,114 @@ def format_content(content):
     # Return content directly if it's not a list
     return content
 
+async def connect(exit_stack):
+    """Start the weather server and return an initialized client session."""
+    # Start the server process as a subprocess
+    server_params = StdioServerParameters(
+        command=sys.executable,
+        args=["weather_server.py"],
+        env=None
+    )
+    
+    print("Connecting to weather server...")
+    
+    # Connect to the server using stdio transport
+    stdio_transport = await exit_stack.enter_async_context(stdio_client(server_params))
+    stdio_reader, stdio_writer = stdio_transport
+    
+    print("Creating client session...")
+    
+    # Create and initialize the client session
+    session = await exit_stack.enter_async_context(ClientSession(stdio_reader, stdio_writer))
+    
+    print("Initializing session...")
+    await session.initialize()
+    
+    # Get available tools to confirm connection is working
+    print("Getting available tools...")
+    tools_response = await session.list_tools()
+    print(f"Connected to server with {len(tools_response.tools)} available tools\n")
+    return session
+
+async def execute(session, command, args):
+    """Execute one command on an initialized session and return its output."""
+    if command == "alerts":
+        state = args.state.upper()
+        result = await session.call_tool("get_alerts", {"state": state})
+        # Format the TextContent objects in the list
+        return format_content(result.content)
+        
+    elif command == "forecast":
+        lat, lon = float(args.latitude), float(args.longitude)
+        result = await session.call_tool("get_forecast", {
+            "latitude": lat,
+            "longitude": lon
+        })
+        # Format the TextContent objects in the list
+        return format_content(result.content)
+    
+    elif command == "call":
+        arguments = json.loads(args.arguments) if args.arguments else {}
+        result = await session.call_tool(args.tool, arguments)
+        return format_content(result.content)
+        
+    elif command == "help":
+        resources_response = await session.list_resources()
+        
+        # Use uri attribute instead of path
+        for resource in resources_response.resources:
+            if str(resource.uri) == "weather://help":
+                # Use read_resource with the URI
+                response = await session.read_resource(str(resource.uri))
+                # Format the content which might be a list
+                return f"Found help resource: {resource.name}\n\n" + format_content(response.contents)
+        
+        lines = ["Help resource not found. Available resources:"]
+        for resource in resources_response.resources:
+            lines.append(f"- {resource.name} (URI: {resource.uri})")
+        return "\n".join(lines)
+                
+    elif command == "list":
+        lines = ["Available tools:"]
+        tools_response = await session.list_tools()
+        for tool in tools_response.tools:
+            lines.append(f"- {tool.name}: {tool.description}")
+        
+        lines.append("\nAvailable resources:")
+        resources_response = await session.list_resources()
+        if not resources_response.resources:
+            lines.append("No resources available.")
+        else:
+            for resource in resources_response.resources:
+                # Display name and URI
+                lines.append(f"- {resource.name} (URI: {resource.uri})")
+        return "\n".join(lines)
+    
+    raise ValueError(f"Unknown command: {command}")
+
+async def timed_execute(session, command, args):
+    """Execute a command, returning (output, latency in seconds)."""
+    start = time.perf_counter()
+    try:
+        output = await execute(session, command, args)
+    except Exception as e:
+        output = f"Error: {type(e).__name__}: {e}"
+    return output, time.perf_counter() - start
+
 async def run_client(command, args):
     """Run the MCP client with the specified command and arguments."""
     # Set up an async exit stack for managing resources
     try:
         async with AsyncExitStack() as exit_stack:
-            # Start the server process as a subprocess
-            server_params = StdioServerParameters(
-                command=sys.executable,
-                args=["weather_server.py"],
-                env=None
-            )
-            
-            print("Connecting to weather server...")
-            
-            # Connect to the server using stdio transport
-            stdio_transport = await exit_stack.enter_async_context(stdio_client(server_params))
-            stdio_reader, stdio_writer = stdio_transport
-            
-            print("Creating client session...")
-            
-            # Create and initialize the client session
-            session = await exit_stack.enter_async_context(ClientSession(stdio_reader, stdio_writer))
+            session = await connect(exit_stack)
             
-            print("Initializing session...")
-            await session.initialize()
-            
-            # Get available tools to confirm connection is working
-            print("Getting available tools...")
-            tools_response = await session.list_tools()
-            print(f"Connected to server with {len(tools_response.tools)} available tools\n")
-            
-            # Execute the requested command
-            if command == "alerts":
-                state = args.state.upper()
-                print(f"Getting weather alerts for {state}...")
-                result = await session.call_tool("get_alerts", {"state": state})
-                # Format the TextContent objects in the list
-                formatted_content = format_content(result.content)
-                print("\n" + formatted_content)
-                
-            elif command == "forecast":
-                lat, lon = float(args.latitude), float(args.longitude)
-                print(f"Getting weather forecast for coordinates ({lat}, {lon})...")
-                result = await session.call_tool("get_forecast", {
-                    "latitude": lat,
-                    "longitude": lon
-                })
-                # Format the TextContent objects in the list
-                formatted_content = format_content(result.content)
-                print("\n" + formatted_content)
-                
-            elif command == "help":
-                resources_response = await session.list_resources()
-                help_found = False
-                
-                # Use uri attribute instead of path
-                for resource in resources_response.resources:
-                    if str(resource.uri) == "weather://help":
-                        print(f"Found help resource: {resource.name}")
-                        # Use read_resource with the URI
-                        response = await session.read_resource(str(resource.uri))
-                        # Format the content which might be a list
-                        formatted_content = format_content(response.contents)
-                        print("\n" + formatted_content)
-                        help_found = True
-                        break
-                
-                if not help_found:
-                    print("Help resource not found. Available resources:")
-                    for resource in resources_response.resources:
-                        print(f"- {resource.name} (URI: {resource.uri})")
-                        
-            elif command == "list":
-                print("Available tools:")
-                tools_response = await session.list_tools()
-                for tool in tools_response.tools:
-                    print(f"- {tool.name}: {tool.description}")
-                
-                print("\nAvailable resources:")
-                resources_response = await session.list_resources()
-                if not resources_response.resources:
-                    print("No resources available.")
-                else:
-                    for resource in resources_response.resources:
-                        # Display name and URI
-                        print(f"- {resource.name} (URI: {resource.uri})")
+            if command == "repl":
+                await run_repl(session, args)
+            elif command == "batch":
+                await run_batch(session, args)
+            else:
+                # Execute the requested command
+                print("\n" + await execute(session, command, args))
                     
     except Exception as e:
         print(f"\nDetailed error information:")
@@ -114,7 +140,112 @@ async def run_client(command, args):
         print("\nTraceback:")
         traceback.print_exc()
 
-def main():
+def parse_line(parser, line):
+    """
+    Parse one session command line (e.g. "forecast 37.77 -122.41").
+    
+    Returns:
+        The parsed arguments, or None for blank lines, comments and invalid commands
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    try:
+        args = parser.parse_args(shlex.split(line))
+    except (SystemExit, ValueError):
+        # argparse has already printed the usage error
+        return None
+    if args.command in SESSION_COMMANDS:
+        print(f"'{args.command}' cannot be used inside a session", file=sys.stderr)
+        return None
+    return args
+
+async def run_repl(session, args):
+    """
+    Read commands interactively and run them on the shared session.
+    
+    Each command is sent as soon as it is entered, so slow calls do not
+    block the prompt; results are printed as they complete, tagged with
+    the command number and latency. Enter "wait" to wait for pending
+    calls, "quit" or end-of-file to exit once they finish.
+    """
+    parser = build_parser()
+    pending = set()
+    count = 0
+    
+    async def run(number, line, parsed):
+        output, latency = await timed_execute(session, parsed.command, parsed)
+        print(f"\n[{number}] {line} ({latency * 1000:.0f}ms)\n{output}\n")
+    
+    print("Enter commands (e.g. alerts CA, forecast 37.77 -122.41); 'wait' or 'quit'.")
+    while True:
+        line = await asyncio.to_thread(sys.stdin.readline)
+        if not line or line.strip() in ("quit", "exit"):
+            break
+        if line.strip() == "wait":
+            if pending:
+                await asyncio.wait(pending)
+            continue
+        parsed = parse_line(parser, line)
+        if parsed is None:
+            continue
+        count += 1
+        task = asyncio.create_task(run(count, line.strip(), parsed))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    
+    if pending:
+        await asyncio.wait(pending)
+
+async def run_batch(session, args):
+    """
+    Run the commands in a file (or stdin) concurrently on the shared session.
+    
+    Results are printed in input order with per-call latency, followed by
+    a summary of wall time and latency percentiles.
+    """
+    parser = build_parser()
+    source = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+    with source:
+        lines = [line.strip() for line in source]
+    commands = [(line, parsed) for line in lines if (parsed := parse_line(parser, line))]
+    if not commands:
+        print("No commands to run.")
+        return
+    
+    semaphore = asyncio.Semaphore(args.concurrency)
+    
+    async def run(parsed):
+        async with semaphore:
+            return await timed_execute(session, parsed.command, parsed)
+    
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run(parsed) for _, parsed in commands))
+    wall = time.perf_counter() - start
+    
+    for i, ((line, _), (output, latency)) in enumerate(zip(commands, results), 1):
+        print(f"[{i}] {line} ({latency * 1000:.0f}ms)")
+        if not args.quiet:
+            print(f"{output}\n")
+    
+    latencies = sorted(latency for _, latency in results)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"\n{len(results)} calls in {wall * 1000:.0f}ms "
+          f"(median {statistics.median(latencies) * 1000:.0f}ms, "
+          f"p95 {p95 * 1000:.0f}ms, max {latencies[-1] * 1000:.0f}ms, "
+          f"concurrency {args.concurrency})")
+
+# Commands that open a session rather than running inside one
+SESSION_COMMANDS = ("repl", "batch")
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+def build_parser():
     parser = argparse.ArgumentParser(description="Weather MCP Client")
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
     subparsers.required = True  # Make command argument required
@@ -128,13 +259,28 @@ def main():
     forecast_parser.add_argument("latitude", help="Latitude coordinate")
     forecast_parser.add_argument("longitude", help="Longitude coordinate")
     
+    # Generic tool call
+    call_parser = subparsers.add_parser("call", help="Call any tool with JSON arguments")
+    call_parser.add_argument("tool", help="Tool name (e.g. get_hourly_forecast)")
+    call_parser.add_argument("arguments", nargs="?", help='JSON object of arguments (e.g. \'{"latitude": 37.77}\')')
+    
     # Help command
     subparsers.add_parser("help", help="Show help information")
     
     # List command
     subparsers.add_parser("list", help="List available tools and resources")
     
-    args = parser.parse_args()
+    # Session modes: one server process and session for many commands
+    subparsers.add_parser("repl", help="Interactive session; commands run concurrently as entered")
+    batch_parser = subparsers.add_parser("batch", help="Run commands from a file concurrently")
+    batch_parser.add_argument("file", nargs="?", default="-", help="Command file, one command per line ('-' for stdin)")
+    batch_parser.add_argument("--concurrency", type=positive_int, default=8, help="Maximum calls in flight")
+    batch_parser.add_argument("--quiet", action="store_true", help="Only print latencies and the summary")
+    
+    return parser
+
+def main():
+    args = build_parser().parse_args()
     
     try:
         asyncio.run(run_client(args.command, args))
@@ -145,4 +291,4 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
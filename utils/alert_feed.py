@@ -0,0 +1,250 @@
+"""
+Change feed of active alerts for subscribed states.
+
+Subscribed states are polled together on one schedule, however many
+sessions watch them. Each poll is diffed against the previous one by
+alert ID into a bounded log of new, updated and expired alerts, and
+subscribers are notified only when something changed. A subscriber's
+read returns the changes since its previous read, so its work scales
+with the amount of change rather than with the number of active alerts.
+"""
+import asyncio
+import sys
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional, Set, Tuple
+
+from utils.models import Alert
+
+# Change kinds recorded in the log
+NEW = "new"
+UPDATED = "updated"
+EXPIRED = "expired"
+
+class AlertFeed:
+    """Polls alerts for subscribed states and serves them as incremental changes."""
+
+    def __init__(self,
+                 fetch: Callable[[str], Awaitable[Optional[Tuple[Alert, ...]]]],
+                 notify: Callable[[Hashable, str], Awaitable[None]],
+                 interval: float = 60.0,
+                 history: int = 1024):
+        """
+        Initialize the feed.
+
+        Args:
+            fetch: Coroutine function returning a state's active alerts, or None on failure
+            notify: Coroutine function telling a subscriber that a state's alerts changed;
+                subscribers whose notification raises are dropped
+            interval: Seconds between polls of the subscribed states
+            history: Changes kept per state; subscribers further behind get a full snapshot
+        """
+        self._fetch = fetch
+        self._notify = notify
+        self.interval = interval
+        self.history = history
+
+        self._alerts: Dict[str, Dict[str, Alert]] = {}
+        self._log: Dict[str, Deque[Tuple[int, str, str]]] = {}
+        self._seq: Dict[str, int] = {}
+        self._subscribers: Dict[str, Set[Hashable]] = {}
+        # Sequence number of the last change each subscriber has read, per state
+        self._cursors: Dict[Tuple[Hashable, str], int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.polls = 0
+        self.failures = 0
+        self.changes = {NEW: 0, UPDATED: 0, EXPIRED: 0}
+        self.notifications = 0
+        self.full_reads = 0
+        self.delta_reads = 0
+
+    async def subscribe(self, subscriber: Hashable, state: str) -> None:
+        """
+        Subscribe to changes of a state's alerts, starting the poll loop if needed.
+
+        The state is polled right away if it is not tracked yet, so the
+        subscriber's first read is a snapshot the later changes apply to.
+
+        Args:
+            subscriber: Opaque, hashable subscriber (e.g. an MCP session)
+            state: Two-letter state code
+        """
+        self._subscribers.setdefault(state, set()).add(subscriber)
+        self._cursors.pop((subscriber, state), None)
+        if state not in self._alerts:
+            await self.poll([state])
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def unsubscribe(self, subscriber: Hashable, state: str) -> None:
+        """Stop sending a subscriber changes of a state; polling stops with the last subscriber."""
+        self._drop(subscriber, [state])
+        if not self._subscribers:
+            await self.stop()
+
+    def _drop(self, subscriber: Hashable, states: Any) -> None:
+        """Remove a subscriber from states, forgetting states nobody watches any more."""
+        for state in list(states):
+            subscribers = self._subscribers.get(state)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscriber)
+            self._cursors.pop((subscriber, state), None)
+            if not subscribers:
+                del self._subscribers[state]
+                self._alerts.pop(state, None)
+                self._log.pop(state, None)
+
+    async def poll(self, states: Optional[Any] = None) -> None:
+        """
+        Poll states (default: every subscribed state) and notify subscribers of changes.
+
+        Each state is fetched in its own task, so the fetches run concurrently
+        and anything they set in their context (e.g. request priority) does
+        not leak into the caller's.
+        """
+        states = list(self._subscribers if states is None else states)
+        await asyncio.gather(*(self._poll_state(state) for state in states))
+
+    async def _poll_state(self, state: str) -> None:
+        self.polls += 1
+        try:
+            alerts = await self._fetch(state)
+        except Exception as e:
+            alerts = None
+            print(f"Alert feed poll of {state} failed: {e}", file=sys.stderr)
+        if alerts is None:
+            # Keep the last known alerts rather than reporting them all expired
+            self.failures += 1
+            return
+        if state not in self._subscribers:
+            # The last subscriber left while the poll was in flight
+            return
+        if not self._apply(state, alerts):
+            return
+        for subscriber in list(self._subscribers.get(state, ())):
+            try:
+                await self._notify(subscriber, state)
+                self.notifications += 1
+            except Exception:
+                # The session has gone away
+                self._drop(subscriber, list(self._subscribers))
+
+    def _apply(self, state: str, alerts: Tuple[Alert, ...]) -> bool:
+        """Diff a poll against the tracked alerts by ID and log the changes; return whether any."""
+        current = {alert.id: alert for alert in alerts if alert.id}
+        previous = self._alerts.get(state)
+        self._alerts[state] = current
+        if previous is None:
+            # First poll of the state is the baseline
+            self._log[state] = deque(maxlen=self.history)
+            self._seq.setdefault(state, 0)
+            return False
+
+        changes = [(alert_id, NEW if alert_id not in previous else UPDATED)
+                   for alert_id, alert in current.items() if previous.get(alert_id) != alert]
+        changes += [(alert_id, EXPIRED) for alert_id in previous if alert_id not in current]
+        log = self._log[state]
+        for alert_id, kind in changes:
+            self._seq[state] += 1
+            log.append((self._seq[state], alert_id, kind))
+            self.changes[kind] += 1
+        return bool(changes)
+
+    async def read(self, state: str, subscriber: Optional[Hashable] = None) -> Dict[str, Any]:
+        """
+        Read a state's alerts as changes since the subscriber's previous read.
+
+        The first read of a subscription, reads by non-subscribers and reads
+        by subscribers that fell more than `history` changes behind get a
+        full snapshot of the active alerts instead. Changes to one alert
+        are coalesced (e.g. an alert that appeared and expired between two
+        reads is not reported at all).
+
+        Args:
+            state: Two-letter state code
+            subscriber: The reading subscriber, if any
+
+        Returns:
+            Dict with the state, the cursor (sequence number of the last
+            change included) and either "alerts" (full snapshot, "full" true)
+            or "new", "updated" and "expired" (alert IDs) lists
+
+        Raises:
+            RuntimeError: If the state's alerts could not be fetched
+        """
+        if subscriber is None or subscriber not in self._subscribers.get(state, ()):
+            # Not subscribed: nothing to diff against, and nothing kept
+            alerts = await asyncio.ensure_future(self._fetch(state))
+            if alerts is None:
+                raise RuntimeError(f"Unable to fetch alerts for {state}")
+            self.full_reads += 1
+            return {"state": state, "cursor": None, "full": True,
+                    "alerts": [alert.to_dict() for alert in alerts]}
+
+        if state not in self._alerts:
+            # The poll made when subscribing failed
+            await self.poll([state])
+            if state not in self._alerts:
+                raise RuntimeError(f"Unable to fetch alerts for {state}")
+        alerts = self._alerts[state]
+        log = self._log[state]
+        seq = self._seq[state]
+        cursor = self._cursors.get((subscriber, state))
+        self._cursors[(subscriber, state)] = seq
+
+        if cursor is None or (log and cursor < log[0][0] - 1):
+            self.full_reads += 1
+            return {"state": state, "cursor": seq, "full": True,
+                    "alerts": [alert.to_dict() for alert in alerts.values()]}
+
+        # The first change to an alert since the cursor tells whether the reader knew it
+        known: Dict[str, bool] = {}
+        for change_seq, alert_id, kind in log:
+            if change_seq > cursor and alert_id not in known:
+                known[alert_id] = kind != NEW
+        delta: Dict[str, Any] = {"state": state, "cursor": seq, "full": False,
+                                 NEW: [], UPDATED: [], EXPIRED: []}
+        for alert_id, was_known in known.items():
+            alert = alerts.get(alert_id)
+            if alert is not None:
+                delta[UPDATED if was_known else NEW].append(alert.to_dict())
+            elif was_known:
+                delta[EXPIRED].append(alert_id)
+        self.delta_reads += 1
+        return delta
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(self.interval)
+            await self.poll()
+
+    async def stop(self) -> None:
+        """Stop the poll loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get feed statistics.
+
+        Returns:
+            Dict with subscription counts, polls, changes by kind,
+            notifications sent and full versus incremental reads
+        """
+        return {
+            "states": len(self._subscribers),
+            "subscriptions": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "tracked_alerts": sum(len(alerts) for alerts in self._alerts.values()),
+            "polls": self.polls,
+            "poll_failures": self.failures,
+            "changes": dict(self.changes),
+            "notifications": self.notifications,
+            "full_reads": self.full_reads,
+            "delta_reads": self.delta_reads
+        }
@@ -0,0 +1,140 @@
+"""
+In-memory LRU cache with per-entry time-to-live.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+class TTLCache:
+    """
+    A bounded LRU cache whose entries expire after a per-entry TTL.
+
+    All operations are synchronous and never await, so they are atomic with
+    respect to other asyncio tasks and the cache can be shared freely between
+    concurrent tool calls running on the same event loop.
+    """
+
+    def __init__(self, max_entries: int = 1024, default_ttl: float = 300.0, stale_ttl: float = 0.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries before LRU eviction
+            default_ttl: TTL in seconds used when set() is called without one
+            stale_ttl: Seconds an expired entry stays available through get_stale()
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a fresh value from the cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            if expires_at + self.stale_ttl <= now:
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get_stale(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a value that may have expired less than stale_ttl seconds ago.
+
+        Does not update the hit/miss counters.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None if missing or past the stale window
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] + self.stale_ttl <= time.monotonic():
+            return None
+        return entry[1]
+
+    def expires_at(self, key: Hashable) -> Optional[float]:
+        """
+        Get when an entry expires.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Expiry time on the time.monotonic() clock, or None if not cached
+        """
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value in the cache.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds (defaults to default_ttl); 0 or
+                less removes any entry already stored under the key
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            # E.g. a no-store response must not leave an older body to be served
+            self._entries.pop(key, None)
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a key from the cache if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with the current size and hit/miss/eviction/expiration counters
+        """
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
@@ -0,0 +1,158 @@
+"""
+Content-hash cache for Deepseek enhancements.
+
+Identical prompts (same model, messages and max_tokens) produce the same
+enhancement for as long as the underlying weather data is fresh, so the
+completion is stored under a hash of the request and reused. The SQLite
+tier is read and written in a worker thread so it never blocks the event
+loop.
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.cache import TTLCache
+
+class EnhancementCache:
+    """An in-memory LRU+TTL cache of enhancements with an optional SQLite tier."""
+
+    def __init__(self, max_entries: int = 256, disk_path: Optional[Path] = None):
+        """
+        Initialize the enhancement cache.
+
+        Args:
+            max_entries: Maximum number of in-memory entries
+            disk_path: SQLite file for the persistent tier (None keeps it in memory only)
+        """
+        self._memory = TTLCache(max_entries)
+        self.disk_path = Path(disk_path) if disk_path else None
+        self._conn: Optional[sqlite3.Connection] = None
+        # Serializes the worker threads sharing the connection
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.tokens_saved = 0
+        self.latency_saved = 0.0
+
+    @staticmethod
+    def key(model: str, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        """
+        Build the cache key for a completion request.
+
+        Args:
+            model: Model name
+            messages: Chat messages sent to the model
+            max_tokens: Maximum tokens requested
+
+        Returns:
+            Hex SHA-256 digest of the request
+        """
+        payload = json.dumps([model, messages, max_tokens], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def conn(self) -> Optional[sqlite3.Connection]:
+        """Open the disk tier on first use (called with the lock held)."""
+        if self._conn is None and self.disk_path is not None:
+            self.disk_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.disk_path), timeout=5.0, check_same_thread=False)
+            # WAL lets worker processes read while another one writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS enhancements (
+                    key TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    tokens INTEGER NOT NULL,
+                    latency REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Get a cached enhancement, promoting entries found on disk to memory.
+
+        Args:
+            key: Key from EnhancementCache.key()
+
+        Returns:
+            The enhancement text, or None if missing or expired
+        """
+        entry = self._memory.get(key)
+        if entry is None and self.disk_path is not None:
+            found = await asyncio.to_thread(self._get_from_disk, key)
+            if found is not None:
+                entry, remaining = found
+                self._memory.set(key, entry, remaining)
+                self.disk_hits += 1
+        if entry is None:
+            return None
+
+        content, tokens, latency = entry
+        self.tokens_saved += tokens
+        self.latency_saved += latency
+        return content
+
+    def _get_from_disk(self, key: str) -> Optional[Tuple[Tuple[str, int, float], float]]:
+        """Look up an entry in the disk tier, returning it with its remaining TTL."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT content, tokens, latency, expires_at FROM enhancements WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            content, tokens, latency, expires_at = row
+            remaining = expires_at - time.time()
+            if remaining <= 0:
+                self.conn.execute("DELETE FROM enhancements WHERE key = ?", (key,))
+                self.conn.commit()
+                return None
+        return (content, tokens, latency), remaining
+
+    def _set_on_disk(self, key: str, content: str, tokens: int, latency: float, expires_at: float) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO enhancements VALUES (?, ?, ?, ?, ?)",
+                (key, content, tokens, latency, expires_at)
+            )
+            self.conn.commit()
+
+    async def set(self, key: str, content: str, ttl: float, tokens: int = 0, latency: float = 0.0) -> None:
+        """
+        Store an enhancement.
+
+        Args:
+            key: Key from EnhancementCache.key()
+            content: Enhancement text
+            ttl: Time-to-live in seconds, normally the freshness of the weather data
+            tokens: Tokens the completion consumed
+            latency: Seconds the completion took
+        """
+        if ttl <= 0:
+            return
+
+        self._memory.set(key, (content, tokens, latency), ttl)
+        if self.disk_path is not None:
+            await asyncio.to_thread(self._set_on_disk, key, content, tokens, latency, time.time() + ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with the in-memory cache counters, disk hits and the tokens
+            and seconds of generation saved by cache hits
+        """
+        return {
+            **self._memory.stats(),
+            "disk_hits": self.disk_hits,
+            "tokens_saved": self.tokens_saved,
+            "latency_saved": round(self.latency_saved, 3)
+        }
@@ -1,136 +1,278 @@
 """
-Utility functions to format weather data into human-readable text.
+Utility functions to format weather data into human-readable text or
+compact structured data.
 """
-from typing import Any, Dict
+import functools
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
-def format_alert(feature: Dict[str, Any]) -> str:
+from utils.models import Alert, Forecast, ForecastPeriod
+
+# Maximum number of payloads whose formatted text is remembered
+FORMAT_CACHE_SIZE = 64
+
+def _memoize_by_payload(func: Optional[Callable[..., Any]] = None, *,
+                        copy: Optional[Callable[[Any], Any]] = None) -> Any:
+    """
+    Remember formatted output per payload object.
+    
+    The NWS client returns the same parsed payload object for cache hits and
+    304 Not Modified responses, so formatting it again can be skipped. Entries
+    keep a reference to their payload, which keeps its id() from being reused.
+    Mutable output is passed through copy on every call, so callers never
+    share (and cannot corrupt) the remembered object.
+    """
+    if func is None:
+        return functools.partial(_memoize_by_payload, copy=copy)
+    memo: "OrderedDict[Any, Any]" = OrderedDict()
+    
+    @functools.wraps(func)
+    def wrapper(data: Any, *args: Any, **kwargs: Any) -> Any:
+        key = (id(data), args, tuple(sorted(kwargs.items())))
+        entry = memo.get(key)
+        if entry is not None and entry[0] is data:
+            memo.move_to_end(key)
+            text = entry[1]
+        else:
+            text = func(data, *args, **kwargs)
+            if data:
+                memo[key] = (data, text)
+                if len(memo) > FORMAT_CACHE_SIZE:
+                    memo.popitem(last=False)
+        return copy(text) if copy is not None and text is not None else text
+    
+    return wrapper
+
+def _copy_structured(value: Any) -> Any:
+    """Copy the dicts and lists of structured output (its other values are immutable)."""
+    if isinstance(value, dict):
+        return {key: _copy_structured(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_structured(item) for item in value]
+    return value
+
+def format_alert(alert: Alert) -> str:
     """
-    Format a single weather alert feature into a readable string.
+    Format a single weather alert into a readable string.
     
     Args:
-        feature: Alert feature from NWS API
+        alert: Alert from weather_api
         
     Returns:
         Formatted alert text
     """
-    try:
-        props = feature.get("properties", {})
-        
-        # Extract key information
-        event = props.get("event", "Unknown Event")
-        headline = props.get("headline", "")
-        area_desc = props.get("areaDesc", "Unknown Area")
-        severity = props.get("severity", "Unknown")
-        certainty = props.get("certainty", "Unknown")
-        urgency = props.get("urgency", "Unknown")
-        description = props.get("description", "No description available")
-        instruction = props.get("instruction", "No specific instructions provided")
-        
-        # Format the alert with the most important information first
-        formatted_alert = f"""
-ALERT: {event}
-{headline}
+    # Format the alert with the most important information first
+    formatted_alert = f"""
+ALERT: {alert.event or "Unknown Event"}
+{alert.headline or ""}
 
-AREA: {area_desc}
-SEVERITY: {severity}
-URGENCY: {urgency}
-CERTAINTY: {certainty}
+AREA: {alert.area_desc or "Unknown Area"}
+SEVERITY: {alert.severity or "Unknown"}
+URGENCY: {alert.urgency or "Unknown"}
+CERTAINTY: {alert.certainty or "Unknown"}
 
 DESCRIPTION:
-{description}
+{alert.description or "No description available"}
 
 INSTRUCTIONS:
-{instruction}
+{alert.instruction or "No specific instructions provided"}
 """
-        return formatted_alert.strip()
-    except Exception as e:
-        return f"Error formatting alert: {e}"
+    return formatted_alert.strip()
 
-def format_alerts_summary(data: Dict[str, Any]) -> str:
+@_memoize_by_payload
+def format_alerts_summary(alerts: Optional[Sequence[Alert]]) -> str:
     """
     Format all weather alerts into a readable summary.
     
     Args:
-        data: Full alerts response from NWS API
+        alerts: Alerts from weather_api, or None if they could not be fetched
         
     Returns:
         Formatted alerts summary text
     """
-    if not data or "features" not in data:
+    if alerts is None:
         return "Unable to fetch alerts or no alerts found."
     
-    features = data.get("features", [])
-    if not features:
+    if not alerts:
         return "No active alerts for this area."
     
-    alert_count = len(features)
-    alerts_text = [format_alert(feature) for feature in features]
+    return join_alert_texts([format_alert(alert) for alert in alerts])
+
+def join_alert_texts(alerts_text: List[str], truncated: bool = False) -> str:
+    """
+    Combine formatted alerts into a summary.
     
-    summary = f"Found {alert_count} active weather alert{'s' if alert_count != 1 else ''}:\n\n"
+    Args:
+        alerts_text: Alerts formatted with format_alert()
+        truncated: Whether more alerts exist than were formatted
+        
+    Returns:
+        Formatted alerts summary text
+    """
+    alert_count = len(alerts_text)
+    if truncated:
+        summary = f"Showing the first {alert_count} active weather alerts:\n\n"
+    else:
+        summary = f"Found {alert_count} active weather alert{'s' if alert_count != 1 else ''}:\n\n"
     summary += "\n\n" + "-" * 40 + "\n\n".join(alerts_text)
     
     return summary
 
-def format_forecast_period(period: Dict[str, Any]) -> str:
+def format_alert_compact(alert: Alert) -> str:
+    """
+    Format a single weather alert as one line.
+    
+    Args:
+        alert: Alert from weather_api
+        
+    Returns:
+        Compact alert text without description or instructions
+    """
+    onset = alert.onset or alert.effective or "?"
+    ends = alert.ends or alert.expires or "?"
+    return (f"{alert.event or 'Unknown Event'} "
+            f"[{alert.severity or 'Unknown'}/{alert.urgency or 'Unknown'}] "
+            f"{alert.area_desc or 'Unknown Area'} ({onset} to {ends})")
+
+@_memoize_by_payload
+def format_alerts_compact(alerts: Optional[Sequence[Alert]], limit: int = 50) -> str:
+    """
+    Format weather alerts as a compact list, one line per alert.
+    
+    Args:
+        alerts: Alerts from weather_api, or None if they could not be fetched
+        limit: Maximum number of alerts to include
+        
+    Returns:
+        Compact alerts summary text
+    """
+    if alerts is None:
+        return "Unable to fetch alerts or no alerts found."
+    
+    if not alerts:
+        return "No active alerts match the query."
+    
+    lines = [f"- {format_alert_compact(alert)}" for alert in alerts[:limit]]
+    summary = f"{len(alerts)} matching alert{'s' if len(alerts) != 1 else ''}:\n" + "\n".join(lines)
+    if len(alerts) > limit:
+        summary += f"\n... and {len(alerts) - limit} more"
+    return summary
+
+def format_forecast_period(period: ForecastPeriod) -> str:
     """
     Format a single forecast period into a readable string.
     
     Args:
-        period: Forecast period data from NWS API
+        period: Forecast period from weather_api
         
     Returns:
         Formatted forecast period text
     """
-    try:
-        name = period.get("name", "Unknown Period")
-        temp = period.get("temperature", "?")
-        temp_unit = period.get("temperatureUnit", "F")
-        wind_speed = period.get("windSpeed", "Unknown")
-        wind_direction = period.get("windDirection", "")
-        short_forecast = period.get("shortForecast", "")
-        detailed_forecast = period.get("detailedForecast", "No detailed forecast available")
-        
-        formatted_period = f"""
-{name}
-Temperature: {temp}°{temp_unit}
-Wind: {wind_speed} {wind_direction}
-{short_forecast}
+    temp = period.temperature if period.temperature is not None else "?"
+    formatted_period = f"""
+{period.name or "Unknown Period"}
+Temperature: {temp}°{period.temperature_unit or "F"}
+Wind: {period.wind_speed or "Unknown"} {period.wind_direction or ""}
+{period.short_forecast or ""}
 
-{detailed_forecast}
+{period.detailed_forecast or "No detailed forecast available"}
 """
-        return formatted_period.strip()
-    except Exception as e:
-        return f"Error formatting forecast period: {e}"
+    return formatted_period.strip()
 
-def format_forecast(data: Dict[str, Any], limit: int = 5) -> str:
+@_memoize_by_payload
+def format_forecast(forecast: Optional[Forecast], limit: int = 5) -> str:
     """
-    Format weather forecast data into a readable summary.
+    Format a weather forecast into a readable summary.
     
     Args:
-        data: Full forecast response from NWS API
+        forecast: Forecast from weather_api, or None if it could not be fetched
         limit: Maximum number of periods to include
         
     Returns:
         Formatted forecast text
     """
-    if not data or "properties" not in data or "periods" not in data["properties"]:
+    if forecast is None:
         return "Unable to fetch forecast data."
     
-    try:
-        location = data.get("properties", {}).get("location", {}).get("name", "the requested location")
-        periods = data.get("properties", {}).get("periods", [])
-        
-        if not periods:
-            return f"No forecast data available for {location}."
-        
-        # Limit the number of periods
-        periods = periods[:limit]
-        
-        forecast_periods = [format_forecast_period(period) for period in periods]
+    location = forecast.location or "the requested location"
+    if not forecast.periods:
+        return f"No forecast data available for {location}."
+    
+    forecast_periods = [format_forecast_period(period) for period in forecast.periods[:limit]]
+    
+    summary = f"Weather forecast for {location}:\n\n"
+    summary += "\n\n" + "-" * 40 + "\n\n".join(forecast_periods)
+    
+    return summary
+
+# Fields available in structured output, and those returned when none are selected
+FORECAST_FIELDS = tuple(ForecastPeriod.FIELDS)
+DEFAULT_FORECAST_FIELDS = (
+    "name", "temperature", "precipitation", "windSpeed", "windDirection", "shortForecast"
+)
+ALERT_FIELDS = tuple(Alert.FIELDS)
+DEFAULT_ALERT_FIELDS = (
+    "id", "event", "areaDesc", "severity", "certainty", "urgency", "onset", "ends"
+)
+
+def _without_nulls(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop fields without a value from structured output."""
+    return {name: value for name, value in values.items() if value is not None}
+
+@_memoize_by_payload(copy=_copy_structured)
+def forecast_to_dict(forecast: Optional[Forecast], 
+                     limit: int = 5, 
+                     fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Convert a weather forecast into a compact structured summary.
+    
+    Fields without a value are omitted. Unless temperatureUnit is selected,
+    the unit of the first period is given once for the whole forecast.
+    
+    Args:
+        forecast: Forecast from weather_api
+        limit: Maximum number of periods to include
+        fields: Period fields to include (defaults to DEFAULT_FORECAST_FIELDS)
         
-        summary = f"Weather forecast for {location}:\n\n"
-        summary += "\n\n" + "-" * 40 + "\n\n".join(forecast_periods)
+    Returns:
+        Dict with the forecast update time and the selected period fields,
+        or None if there is no forecast
+    """
+    if forecast is None:
+        return None
+    
+    fields = tuple(fields or DEFAULT_FORECAST_FIELDS)
+    periods = forecast.periods[:limit]
+    summary = {"updated": forecast.updated}
+    if "temperatureUnit" not in fields and "temperature" in fields and periods:
+        summary["temperatureUnit"] = periods[0].temperature_unit
+    summary = _without_nulls(summary)
+    summary["periods"] = [_without_nulls(period.to_dict(fields)) for period in periods]
+    return summary
+
+@_memoize_by_payload(copy=_copy_structured)
+def alerts_to_dict(alerts: Optional[Sequence[Alert]], 
+                   limit: int = 50, 
+                   fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Convert weather alerts into a compact structured summary.
+    
+    Fields without a value are omitted.
+    
+    Args:
+        alerts: Alerts from weather_api
+        limit: Maximum number of alerts to include
+        fields: Alert fields to include (defaults to DEFAULT_ALERT_FIELDS)
         
-        return summary
-    except Exception as e:
-        return f"Error formatting forecast: {e}"
\ No newline at end of file
+    Returns:
+        Dict with the total alert count and the selected fields of up to
+        limit alerts, or None if there are no alerts to convert
+    """
+    if alerts is None:
+        return None
+    
+    fields = tuple(fields or DEFAULT_ALERT_FIELDS)
+    return {
+        "count": len(alerts),
+        "alerts": [_without_nulls(alert.to_dict(fields)) for alert in alerts[:limit]]
+    }
@@ -0,0 +1,399 @@
+"""
+Offline place-name index for geocoding.
+
+The gazetteer is a tab-separated file of US places and ZIP code centroids,
+one per line, sorted by a normalized key ("san francisco ca", "94103").
+It is memory-mapped on first use, with only an array of line offsets
+kept in memory, and searched by binary search over those offsets, so
+resolving a name takes a few dozen key comparisons: an exact key (name and
+state, or a ZIP code), the most populous place whose name starts with the
+query, and finally a fuzzy (difflib) match among keys sharing the query's
+first letter. ZIP codes only match exactly.
+
+Lines starting with "#" are comments. Columns:
+
+    key  name  state  latitude  longitude  population
+
+A sample covering large US cities, state capitals and downtown ZIP codes
+is bundled in data/gazetteer.tsv. Build a full one from the Census
+Gazetteer files (places and ZCTAs, optionally merged with an existing
+gazetteer to keep its populations for ranking):
+
+    python -m utils.gazetteer build 2023_Gaz_place_national.txt \\
+        2023_Gaz_zcta_national.txt data/gazetteer.tsv --output gazetteer.tsv
+    python -m utils.gazetteer lookup "Portland, ME"
+"""
+import argparse
+import difflib
+import mmap
+import re
+import sys
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.models import Place
+
+STATES = {
+    "AL": "alabama", "AK": "alaska", "AZ": "arizona", "AR": "arkansas", "CA": "california",
+    "CO": "colorado", "CT": "connecticut", "DE": "delaware", "DC": "district of columbia",
+    "FL": "florida", "GA": "georgia", "HI": "hawaii", "ID": "idaho", "IL": "illinois",
+    "IN": "indiana", "IA": "iowa", "KS": "kansas", "KY": "kentucky", "LA": "louisiana",
+    "ME": "maine", "MD": "maryland", "MA": "massachusetts", "MI": "michigan", "MN": "minnesota",
+    "MS": "mississippi", "MO": "missouri", "MT": "montana", "NE": "nebraska", "NV": "nevada",
+    "NH": "new hampshire", "NJ": "new jersey", "NM": "new mexico", "NY": "new york",
+    "NC": "north carolina", "ND": "north dakota", "OH": "ohio", "OK": "oklahoma", "OR": "oregon",
+    "PA": "pennsylvania", "RI": "rhode island", "SC": "south carolina", "SD": "south dakota",
+    "TN": "tennessee", "TX": "texas", "UT": "utah", "VT": "vermont", "VA": "virginia",
+    "WA": "washington", "WV": "west virginia", "WI": "wisconsin", "WY": "wyoming", "PR": "puerto rico"
+}
+# Normalized state name -> code, longest names first so "west virginia" wins over "virginia"
+_STATE_NAMES = dict(sorted(((name, code.lower()) for code, name in STATES.items()), key=lambda item: -len(item[0])))
+
+# Spelled-out words normalized to the abbreviation used in keys
+_ABBREVIATIONS = {"saint": "st", "sainte": "ste", "fort": "ft", "mount": "mt"}
+
+# Census place name suffixes (legal/statistical area descriptions) that are not part of the name
+_PLACE_SUFFIX = re.compile(
+    r"\s+(city and borough|consolidated government|metropolitan government|unified government|"
+    r"city|town|village|borough|township|CDP|municipality|comunidad|zona urbana)(\s*\(.*\))?$"
+)
+
+_ZIP = re.compile(r"^(\d{5})(?:-\d{4})?$")
+
+# Candidate places considered per prefix search
+PREFIX_LIMIT = 200
+
+def normalize(text: str) -> str:
+    """
+    Normalize a place name for lookup.
+
+    Args:
+        text: Place name as written (any case, accents, punctuation)
+
+    Returns:
+        Lowercase ASCII words separated by single spaces, with "saint",
+        "fort" and "mount" abbreviated
+    """
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    return " ".join(_ABBREVIATIONS.get(word, word) for word in re.findall(r"[a-z0-9]+", text.replace("'", "")))
+
+def place_key(name: str, state: str) -> str:
+    """Get the gazetteer key of a place ("san francisco ca"), or of a ZIP code."""
+    return name if _ZIP.match(name) else f"{normalize(name)} {state.lower()}".rstrip()
+
+def parse_query(query: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a place query into a normalized name and state code.
+
+    Args:
+        query: E.g. "Portland, OR", "portland oregon", "Portland" or "97204"
+
+    Returns:
+        (normalized name, lowercase state code or None); for a ZIP code the
+        name is its five digits
+    """
+    zip_code = _ZIP.match(query.strip())
+    if zip_code:
+        return zip_code.group(1), None
+
+    name = normalize(query)
+    head, _, last = name.rpartition(" ")
+    if head and last.upper() in STATES:
+        return head, last
+    for state_name, code in _STATE_NAMES.items():
+        if name.endswith(" " + state_name):
+            return name[:-len(state_name) - 1], code
+    return name, None
+
+class _Keys:
+    """Sequence view of the keys of gazetteer lines, for bisect."""
+
+    __slots__ = ("data", "offsets")
+
+    def __init__(self, data: mmap.mmap, offsets: array):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, i: int) -> bytes:
+        start = self.offsets[i]
+        return self.data[start:self.data.find(b"\t", start)]
+
+class Gazetteer:
+    """A memory-mapped, sorted gazetteer searched by binary search."""
+
+    def __init__(self, path: Path, fuzzy_cutoff: float = 0.8):
+        """
+        Initialize the gazetteer (the file is opened on first lookup).
+
+        Args:
+            path: Path of the gazetteer TSV file
+            fuzzy_cutoff: Minimum difflib similarity (0-1) of a fuzzy match
+        """
+        self.path = Path(path)
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        self.load_time = 0.0
+        self._data: Optional[mmap.mmap] = None
+        self._keys: Optional[_Keys] = None
+
+    @property
+    def keys(self) -> _Keys:
+        """Map the file and index its line offsets on first use."""
+        if self._keys is None:
+            start = time.perf_counter()
+            with open(self.path, "rb") as f:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            lines = self._data[:].split(b"\n")
+            starts = accumulate((len(line) + 1 for line in lines), initial=0)
+            offsets = array("Q", (start for start, line in zip(starts, lines) if line and not line.startswith(b"#")))
+            self._keys = _Keys(self._data, offsets)
+            self.load_time = time.perf_counter() - start
+        return self._keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _place(self, i: int) -> Place:
+        """Parse the line at an index into a Place."""
+        keys = self.keys
+        start = keys.offsets[i]
+        end = keys.data.find(b"\n", start)
+        fields = keys.data[start:end if end >= 0 else len(keys.data)].decode("utf-8").rstrip("\r").split("\t")
+        _, name, state, latitude, longitude, population = fields
+        return Place(name, state, float(latitude), float(longitude), int(population or 0))
+
+    def _range(self, prefix: str) -> Iterator[int]:
+        """Yield the indexes of keys starting with a prefix, in key order."""
+        keys = self.keys
+        encoded = prefix.encode("ascii")
+        i = bisect_left(keys, encoded)
+        while i < len(keys) and keys[i].startswith(encoded):
+            yield i
+            i += 1
+
+    def _prefix_matches(self, prefix: str, state: Optional[str]) -> List[Place]:
+        """Places whose key starts with prefix (and that are in state), most populous first."""
+        places = []
+        for count, i in enumerate(self._range(prefix)):
+            if count >= PREFIX_LIMIT:
+                break
+            place = self._place(i)
+            if state is None or place.state.lower() == state:
+                places.append(place)
+        places.sort(key=lambda place: -place.population)
+        return places
+
+    def _fuzzy_matches(self, name: str, state: Optional[str], limit: int) -> List[Place]:
+        """Places whose name is close to name, among keys sharing its first letter."""
+        keys = self.keys
+        first = name[0].encode("ascii")
+        start = bisect_left(keys, first)
+        end = bisect_left(keys, bytes([first[0] + 1]))
+        if start == end:
+            return []
+
+        # Slice the whole range at once rather than reading keys one by one
+        last = keys.data.find(b"\n", keys.offsets[end - 1])
+        lines = keys.data[keys.offsets[start]:last if last >= 0 else len(keys.data)].split(b"\n")
+        names: Dict[str, List[int]] = {}
+        i = start
+        for line in lines:
+            if not line or line.startswith(b"#"):
+                continue
+            key = line[:line.find(b"\t")].decode("ascii")
+            # The key without its state code
+            key_name, _, key_state = key.rpartition(" ")
+            if state is None or key_state == state:
+                names.setdefault(key_name, []).append(i)
+            i += 1
+        matches = difflib.get_close_matches(name, names, n=limit, cutoff=self.fuzzy_cutoff)
+        places = [self._place(i) for match in matches for i in names[match]]
+        # Closest name first, then most populous
+        rank = {match: position for position, match in enumerate(matches)}
+        places.sort(key=lambda place: (rank.get(normalize(place.name), len(rank)), -place.population))
+        return places
+
+    def search(self, query: str, limit: int = 5) -> List[Place]:
+        """
+        Find the places matching a query.
+
+        Args:
+            query: Place name with optional state ("Portland, OR", "portland
+                oregon", "Portland"), a name prefix ("san fran") or a ZIP code
+            limit: Maximum number of places returned
+
+        Returns:
+            Matching places, best match first (empty if nothing matches)
+        """
+        name, state = parse_query(query)
+        if not name:
+            return []
+        if name.isdigit():
+            # ZIP codes match exactly or not at all
+            places = self._prefix_matches(name, None)[:1] if len(name) == 5 else []
+            if places:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return places
+
+        if state is not None:
+            places = self._prefix_matches(f"{name} {state}", state)
+            # "springfield mo" also matches "springfield mountain ..."; prefer the exact name
+            places.sort(key=lambda place: normalize(place.name) != name)
+        else:
+            # Whole-word matches first ("portland" before "portlandville")
+            places = self._prefix_matches(name + " ", None) or self._prefix_matches(name, None)
+        if not places and state is not None:
+            places = self._prefix_matches(name, state)
+
+        fuzzy = not places
+        if fuzzy:
+            places = self._fuzzy_matches(name, state, limit)
+
+        if not places:
+            self.misses += 1
+        elif fuzzy:
+            self.fuzzy_hits += 1
+        else:
+            self.hits += 1
+        return places[:limit]
+
+    def resolve(self, query: str) -> Optional[Place]:
+        """
+        Resolve a query to its best matching place.
+
+        Args:
+            query: Place name, name prefix or ZIP code (see search())
+
+        Returns:
+            The best match, or None if nothing matches
+        """
+        places = self.search(query, 1)
+        return places[0] if places else None
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get gazetteer statistics.
+
+        Returns:
+            Dict with the number of places, load time and exact/fuzzy
+            hit and miss counters
+        """
+        return {
+            "places": len(self._keys) if self._keys is not None else 0,
+            "load_ms": round(self.load_time * 1000, 3),
+            "hits": self.hits,
+            "fuzzy_hits": self.fuzzy_hits,
+            "misses": self.misses
+        }
+
+    def close(self) -> None:
+        """Unmap the file."""
+        if self._data is not None:
+            self._data.close()
+        self._data = self._keys = None
+
+def _read_source(path: Path) -> Iterator[Tuple[str, str, float, float, int]]:
+    """
+    Read places from a gazetteer TSV or a Census Gazetteer places/ZCTA file.
+
+    Yields:
+        (name, state, latitude, longitude, population) tuples
+    """
+    with open(path, encoding="utf-8", errors="replace") as f:
+        header = [column.strip() for column in f.readline().lstrip("#").strip().split("\t")]
+        columns = {column: i for i, column in enumerate(header)}
+        for line in f:
+            fields = line.rstrip("\r\n").split("\t")
+            if not line.strip() or line.startswith("#"):
+                continue
+            if "key" in columns:
+                _, name, state, latitude, longitude, population = fields
+                yield name, state, float(latitude), float(longitude), int(population or 0)
+            elif "USPS" in columns:
+                name = _PLACE_SUFFIX.sub("", fields[columns["NAME"]].strip())
+                yield (name, fields[columns["USPS"]].strip(), float(fields[columns["INTPTLAT"]]),
+                       float(fields[columns["INTPTLONG"]]), 0)
+            elif "GEOID" in columns:
+                yield (fields[columns["GEOID"]].strip(), "", float(fields[columns["INTPTLAT"]]),
+                       float(fields[columns["INTPTLONG"]]), 0)
+            else:
+                raise ValueError(f"{path}: unrecognized gazetteer columns {header}")
+
+def build(sources: Iterable[Path], output: Path) -> int:
+    """
+    Build a sorted gazetteer from source files.
+
+    Places with the same key are merged, keeping the coordinates of the
+    first source that has them and the largest known population.
+
+    Args:
+        sources: Gazetteer TSVs and Census Gazetteer places/ZCTA files
+        output: Path of the gazetteer to write
+
+    Returns:
+        The number of places written
+    """
+    places: Dict[str, List] = {}
+    for source in sources:
+        for name, state, latitude, longitude, population in _read_source(source):
+            key = place_key(name, state)
+            if key in places:
+                places[key][4] = max(places[key][4], population)
+            else:
+                places[key] = [name, state, latitude, longitude, population]
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8", newline="\n") as f:
+        f.write("# key\tname\tstate\tlatitude\tlongitude\tpopulation\n")
+        for key in sorted(places, key=lambda key: key.encode("ascii")):
+            name, state, latitude, longitude, population = places[key]
+            f.write(f"{key}\t{name}\t{state}\t{latitude:.4f}\t{longitude:.4f}\t{population}\n")
+    return len(places)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build and query the place-name gazetteer")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Build a gazetteer from source files")
+    build_parser.add_argument("sources", type=Path, nargs="+",
+                              help="Gazetteer TSVs and Census Gazetteer places/ZCTA files")
+    build_parser.add_argument("--output", type=Path, required=True, help="Gazetteer file to write")
+
+    lookup_parser = subparsers.add_parser("lookup", help="Resolve place names")
+    lookup_parser.add_argument("queries", nargs="+", help='Place names or ZIP codes (e.g. "Portland, ME")')
+    lookup_parser.add_argument("--path", type=Path, help="Gazetteer file (defaults to config.GAZETTEER_PATH)")
+    lookup_parser.add_argument("--limit", type=int, default=5, help="Matches shown per query")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        print(f"{args.output}: {build(args.sources, args.output)} places")
+        return
+
+    import config
+    gazetteer = Gazetteer(args.path or config.GAZETTEER_PATH, config.GAZETTEER_FUZZY_CUTOFF)
+    for query in args.queries:
+        start = time.perf_counter()
+        places = gazetteer.search(query, args.limit)
+        elapsed = (time.perf_counter() - start) * 1e6
+        print(f"{query!r} ({elapsed:.0f}us):")
+        for place in places:
+            print(f"  {place.label:<32} {place.latitude:9.4f} {place.longitude:10.4f}  pop {place.population}")
+        if not places:
+            print("  no match")
+    print(f"loaded {gazetteer.stats()['places']} places in {gazetteer.stats()['load_ms']}ms", file=sys.stderr)
+    gazetteer.close()
+
+if __name__ == "__main__":
+    main()
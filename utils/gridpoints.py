@@ -0,0 +1,187 @@
+"""
+Persistent index of resolved NWS gridpoints.
+
+Maps snapped latitude/longitude pairs to the forecast office, grid cell and
+forecast URLs returned by the /points endpoint, so forecasts for known
+locations can skip the /points request entirely.
+"""
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from utils.models import Gridpoint
+
+# Properties from a /points response that are stored in the index
+INDEXED_PROPERTIES = tuple(Gridpoint.FIELDS)
+
+class GridpointIndex:
+    """An SQLite-backed index of lat/lon -> gridpoint mappings."""
+
+    def __init__(self, path: Path, precision: int = 3):
+        """
+        Initialize the gridpoint index.
+
+        Args:
+            path: Path of the SQLite database file
+            precision: Number of decimal places coordinates are snapped to
+        """
+        self.path = Path(path)
+        self.precision = precision
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open the database on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=5.0)
+            # WAL lets worker processes read while another one writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS gridpoints (
+                    lat_key INTEGER NOT NULL,
+                    lon_key INTEGER NOT NULL,
+                    properties TEXT NOT NULL,
+                    forecast_url TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (lat_key, lon_key)
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS gridpoints_forecast_url ON gridpoints (forecast_url)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def snap(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        """
+        Snap a coordinate to the index precision.
+
+        Args:
+            latitude: Latitude of the location
+            longitude: Longitude of the location
+
+        Returns:
+            Tuple of integer (lat_key, lon_key)
+        """
+        scale = 10 ** self.precision
+        return round(latitude * scale), round(longitude * scale)
+
+    def lookup(self, latitude: float, longitude: float) -> Optional[Gridpoint]:
+        """
+        Look up the gridpoint for a coordinate.
+
+        Args:
+            latitude: Latitude of the location
+            longitude: Longitude of the location
+
+        Returns:
+            The Gridpoint, or None if not indexed
+        """
+        row = self.conn.execute(
+            "SELECT properties FROM gridpoints WHERE lat_key = ? AND lon_key = ?",
+            self.snap(latitude, longitude)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return Gridpoint.from_points(json.loads(row[0]))
+
+    def store(self, latitude: float, longitude: float, gridpoint: Gridpoint) -> bool:
+        """
+        Store the gridpoint of a location.
+
+        Args:
+            latitude: Latitude of the location
+            longitude: Longitude of the location
+            gridpoint: Gridpoint resolved through the /points endpoint
+
+        Returns:
+            True if the entry was stored, False if it has no forecast URL
+        """
+        if not self._insert(latitude, longitude, gridpoint):
+            return False
+        self.conn.commit()
+        return True
+
+    def _insert(self, latitude: float, longitude: float, gridpoint: Gridpoint) -> bool:
+        """Insert an entry without committing."""
+        if not gridpoint.forecast_url:
+            return False
+
+        lat_key, lon_key = self.snap(latitude, longitude)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO gridpoints VALUES (?, ?, ?, ?, ?)",
+            (lat_key, lon_key, json.dumps(gridpoint.to_dict()), gridpoint.forecast_url, time.time())
+        )
+        return True
+
+    def invalidate_forecast_url(self, forecast_url: str) -> int:
+        """
+        Remove every entry that points at a stale forecast URL.
+
+        Args:
+            forecast_url: Forecast URL that NWS no longer serves
+
+        Returns:
+            Number of entries removed
+        """
+        cursor = self.conn.execute(
+            "DELETE FROM gridpoints WHERE forecast_url = ?", (forecast_url,)
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def import_file(self, path: Path) -> int:
+        """
+        Warm the index from a JSON Lines file.
+
+        Each line holds "latitude" and "longitude" plus either the gridpoint
+        properties (gridId, gridX, gridY, forecast, ...) or a full /points
+        response under "properties".
+
+        Args:
+            path: Path of the JSON Lines file
+
+        Returns:
+            Number of entries imported
+        """
+        imported = 0
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    gridpoint = Gridpoint.from_points(record)
+                    if self._insert(float(record["latitude"]), float(record["longitude"]), gridpoint):
+                        imported += 1
+                except (AttributeError, KeyError, TypeError, ValueError) as e:
+                    print(f"Skipping invalid gridpoint record on line {line_number}: {e}",
+                          file=sys.stderr)
+        self.conn.commit()
+        return imported
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get index statistics.
+
+        Returns:
+            Dict with the number of entries and lookup hit/miss counters
+        """
+        size = self.conn.execute("SELECT COUNT(*) FROM gridpoints").fetchone()[0]
+        return {"size": size, "hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
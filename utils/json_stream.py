@@ -0,0 +1,180 @@
+"""
+Incremental parsing of large JSON documents.
+
+NWS alert feeds are FeatureCollections whose "features" array can run to
+megabytes, mostly geometry. ArrayItemParser pulls the items of one
+top-level array out of the document as bytes arrive, so each item can be
+trimmed and handed on before the rest of the body has been downloaded.
+"""
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+class ArrayItemParser:
+    """Extracts the items of a top-level array from a JSON object fed in chunks."""
+
+    # Parser states
+    _OBJECT_START = "object_start"
+    _KEY = "key"
+    _COLON = "colon"
+    _VALUE = "value"
+    _AFTER_VALUE = "after_value"
+    _ARRAY_START = "array_start"
+    _ITEM = "item"
+    _AFTER_ITEM = "after_item"
+    _DONE = "done"
+
+    def __init__(self, key: str, transform: Optional[Callable[[Any], Any]] = None):
+        """
+        Initialize the parser.
+
+        Args:
+            key: Top-level key of the array to extract (e.g. "features")
+            transform: Applied to each item before it is returned, e.g. to drop
+                unused fields so the full item is not kept alive
+        """
+        self.key = key
+        self.transform = transform
+        self.members: Dict[str, Any] = {}
+        self.items_parsed = 0
+        # Whether the key was seen, telling an empty array from a missing one
+        self.found = False
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = self._OBJECT_START
+        self._current_key: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the closing brace of the document has been parsed."""
+        return self._state == self._DONE
+
+    def feed(self, data: bytes, final: bool = False) -> List[Any]:
+        """
+        Parse another chunk of the document.
+
+        Args:
+            data: The next bytes of the document
+            final: Whether this is the last chunk
+
+        Returns:
+            Array items completed by this chunk, in document order
+
+        Raises:
+            ValueError: If the document is malformed, or incomplete when final
+        """
+        self._buffer = self._buffer[self._pos:] + self._decoder.decode(data, final)
+        self._pos = 0
+        items = []
+        while self._step(items, final):
+            pass
+        if final and not self.done:
+            raise ValueError("Incomplete JSON document")
+        return items
+
+    def _skip_whitespace(self) -> bool:
+        """Advance past whitespace, returning False if the buffer is exhausted."""
+        self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+        return self._pos < len(self._buffer)
+
+    def _expect(self, *chars: str) -> str:
+        char = self._buffer[self._pos]
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self._pos}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def _decode_value(self, final: bool) -> Any:
+        """
+        Decode the JSON value at the current position.
+
+        Returns:
+            The value, or the parser itself as a sentinel if more data is needed
+        """
+        try:
+            value, end = _decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return self
+        # A number at the end of the buffer may continue in the next chunk
+        if end == len(self._buffer) and not final:
+            return self
+        self._pos = end
+        return value
+
+    def _step(self, items: List[Any], final: bool) -> bool:
+        """Parse one token, returning False when more data is needed."""
+        if self._state == self._DONE or not self._skip_whitespace():
+            return False
+
+        state = self._state
+        if state == self._OBJECT_START:
+            self._expect("{")
+            self._state = self._KEY
+        elif state == self._KEY:
+            if self._buffer[self._pos] == "}":
+                self._pos += 1
+                self._state = self._DONE
+                return True
+            key = self._decode_value(final)
+            if key is self:
+                return False
+            if not isinstance(key, str):
+                raise ValueError(f"Expected an object key at offset {self._pos}")
+            self._current_key = key
+            self._state = self._COLON
+        elif state == self._COLON:
+            self._expect(":")
+            if self._current_key == self.key:
+                self.found = True
+                self._state = self._ARRAY_START
+            else:
+                self._state = self._VALUE
+        elif state == self._VALUE:
+            value = self._decode_value(final)
+            if value is self:
+                return False
+            self.members[self._current_key] = value
+            self._state = self._AFTER_VALUE
+        elif state == self._AFTER_VALUE:
+            self._state = self._KEY if self._expect(",", "}") == "," else self._DONE
+        elif state == self._ARRAY_START:
+            self._expect("[")
+            self._state = self._ITEM
+        elif state == self._ITEM:
+            if self._buffer[self._pos] == "]":
+                self._pos += 1
+                self._state = self._AFTER_VALUE
+                return True
+            item = self._decode_value(final)
+            if item is self:
+                return False
+            self.items_parsed += 1
+            items.append(self.transform(item) if self.transform else item)
+            self._state = self._AFTER_ITEM
+        elif state == self._AFTER_ITEM:
+            self._state = self._ITEM if self._expect(",", "]") == "," else self._AFTER_VALUE
+        return True
+
+async def iter_array_items(chunks: AsyncIterator[bytes], parser: ArrayItemParser) -> AsyncIterator[Any]:
+    """
+    Yield array items as the chunks of a JSON document arrive.
+
+    Args:
+        chunks: The document's bytes, e.g. httpx Response.aiter_bytes()
+        parser: Parser for the array to extract
+
+    Yields:
+        Each (transformed) array item
+    """
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+    for item in parser.feed(b"", final=True):
+        yield item
@@ -0,0 +1,307 @@
+"""
+In-process latency and concurrency metrics for the weather server.
+
+Stages of a tool call (upstream fetches, rate limiter waits, parsing,
+formatting, Deepseek enhancement) are timed with span() into fixed-bucket
+histograms keyed by name and labels; tools wrapped with instrument_tool()
+also get call counts and in-flight gauges. Counters kept elsewhere (cache,
+coalescing, retries) are read through registered collectors only when
+metrics are exported, so they add nothing to the hot path.
+
+When config.METRICS_ENABLED is off, span() returns a shared no-op context
+manager and instrument_tool() leaves functions unwrapped.
+"""
+import contextlib
+import functools
+import math
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import config
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" values)
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+Key = Tuple[str, Labels]
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+class Histogram:
+    """Counts of observed durations per bucket, with their sum and maximum."""
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket that contains it."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.5) * 1000, 3),
+            "p95_ms": round(self.quantile(0.95) * 1000, 3),
+            "p99_ms": round(self.quantile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3)
+        }
+
+_histograms: Dict[Key, Histogram] = {}
+_counters: Dict[Key, float] = {}
+_gauges: Dict[Key, float] = {}
+_collectors: Dict[str, Callable[[], Optional[Dict[str, Any]]]] = {}
+# Per collector, stats keys whose entries are exported as label values
+_collector_labels: Dict[str, Dict[str, str]] = {}
+
+_NOOP = contextlib.nullcontext()
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items())) if labels else ()
+
+def observe(name: str, seconds: float, **labels: str) -> None:
+    """
+    Record a duration in a histogram.
+
+    Args:
+        name: Histogram name (e.g. "nws.fetch")
+        seconds: Observed duration
+        **labels: Label values distinguishing series of the histogram
+    """
+    if not config.METRICS_ENABLED:
+        return
+    key = (name, _labels(labels))
+    histogram = _histograms.get(key)
+    if histogram is None:
+        histogram = _histograms[key] = Histogram()
+    histogram.observe(seconds)
+
+def inc(name: str, value: float = 1, **labels: str) -> None:
+    """Increment a counter."""
+    if not config.METRICS_ENABLED:
+        return
+    key = (name, _labels(labels))
+    _counters[key] = _counters.get(key, 0) + value
+
+class _Span:
+    """Context manager timing a block into a histogram."""
+
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name: str, labels: Dict[str, str]):
+        self.name = name
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+def span(name: str, **labels: str) -> contextlib.AbstractContextManager:
+    """
+    Time a block of code.
+
+    Example:
+        with metrics.span("nws.parse", endpoint="points"):
+            ...
+
+    Args:
+        name: Histogram name for the stage
+        **labels: Label values distinguishing series of the histogram
+
+    Returns:
+        A context manager (a shared no-op one when metrics are disabled)
+    """
+    if not config.METRICS_ENABLED:
+        return _NOOP
+    return _Span(name, labels)
+
+def instrument_tool(fn: F) -> F:
+    """
+    Record call counts, errors, durations and concurrency of an async tool.
+
+    Apply below @mcp.tool() so FastMCP registers the wrapper; the wrapper
+    keeps the tool's signature and docstring.
+
+    Args:
+        fn: The tool coroutine function
+
+    Returns:
+        The wrapped function, or fn itself when metrics are disabled
+    """
+    if not config.METRICS_ENABLED:
+        return fn
+
+    labels = (("tool", fn.__name__),)
+    in_flight = ("tool.in_flight", labels)
+    in_flight_max = ("tool.in_flight_max", labels)
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        current = _gauges.get(in_flight, 0) + 1
+        _gauges[in_flight] = current
+        if current > _gauges.get(in_flight_max, 0):
+            _gauges[in_flight_max] = current
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        except Exception:
+            inc("tool.errors", tool=fn.__name__)
+            raise
+        finally:
+            _gauges[in_flight] = _gauges.get(in_flight, 1) - 1
+            inc("tool.calls", tool=fn.__name__)
+            observe("tool.duration", time.perf_counter() - start, tool=fn.__name__)
+
+    return wrapper  # type: ignore[return-value]
+
+def register_collector(name: str, collect: Callable[[], Optional[Dict[str, Any]]],
+                       labels: Optional[Dict[str, str]] = None) -> None:
+    """
+    Register a function whose stats are exported with the metrics.
+
+    Args:
+        name: Prefix for the collected values (e.g. "cache")
+        collect: Returns a dict of stats (nested dicts allowed), or None
+        labels: Stats keys whose nested dicts are keyed by data rather than
+            by stat name, mapped to the Prometheus label their keys go in
+            (e.g. {"circuits": "host"})
+    """
+    _collectors[name] = collect
+    _collector_labels[name] = labels or {}
+
+def _collect() -> Dict[str, Any]:
+    collected = {}
+    for name, collect in _collectors.items():
+        try:
+            collected[name] = collect()
+        except Exception as e:
+            collected[name] = {"error": str(e)}
+    return collected
+
+def _series(values: Dict[Key, Any]) -> List[Dict[str, Any]]:
+    return [{"name": name, **dict(labels), "value": value} for (name, labels), value in sorted(values.items())]
+
+def snapshot() -> Dict[str, Any]:
+    """
+    Get all metrics as JSON-serializable data.
+
+    Returns:
+        Dict with stage and tool histograms (count, mean and bucket-estimated
+        percentiles in milliseconds), counters, gauges and collected stats
+    """
+    return {
+        "enabled": config.METRICS_ENABLED,
+        "histograms": [
+            {"name": name, **dict(labels), **histogram.to_dict()}
+            for (name, labels), histogram in sorted(_histograms.items())
+        ],
+        "counters": _series(_counters),
+        "gauges": _series(_gauges),
+        "collected": _collect()
+    }
+
+def _metric_name(name: str) -> str:
+    return "weather_" + "".join(c if c.isalnum() else "_" for c in name)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs) + "}"
+
+def _flatten(prefix: str, value: Any, out: List[Tuple[str, Labels, float]],
+             label_keys: Dict[str, str], labels: Labels = ()) -> None:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            label = label_keys.get(key)
+            if label is not None and isinstance(item, dict):
+                # One metric per stat, with the entry's key as a label value
+                for entry, stats in item.items():
+                    _flatten(f"{prefix}_{key}", stats, out, label_keys, labels + ((label, str(entry)),))
+            else:
+                _flatten(f"{prefix}_{key}", item, out, label_keys, labels)
+    elif isinstance(value, bool):
+        out.append((prefix, labels, float(value)))
+    elif isinstance(value, (int, float)) and math.isfinite(value):
+        out.append((prefix, labels, value))
+
+def prometheus() -> str:
+    """
+    Render all metrics in the Prometheus text exposition format.
+
+    Returns:
+        The metrics text (histograms in seconds; collected stats as gauges)
+    """
+    lines = []
+    typed = set()
+
+    def declare(name: str, kind: str) -> None:
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), histogram in sorted(_histograms.items()):
+        metric = _metric_name(name) + "_seconds"
+        declare(metric, "histogram")
+        cumulative = 0
+        for bound, count in zip(BUCKETS, histogram.counts):
+            cumulative += count
+            lines.append(f"{metric}_bucket{_format_labels(labels, ('le', repr(bound)))} {cumulative}")
+        lines.append(f"{metric}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}")
+        lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum}")
+        lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+
+    for (name, labels), value in sorted(_counters.items()):
+        metric = _metric_name(name) + "_total"
+        declare(metric, "counter")
+        lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+    for (name, labels), value in sorted(_gauges.items()):
+        metric = _metric_name(name)
+        declare(metric, "gauge")
+        lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+    flat: List[Tuple[str, Labels, float]] = []
+    for name, stats in _collect().items():
+        _flatten(name, stats, flat, _collector_labels.get(name, {}))
+    # Samples of a metric must be contiguous; labelled ones come out interleaved
+    families: Dict[str, List[str]] = {}
+    for name, labels, value in flat:
+        metric = _metric_name(name)
+        families.setdefault(metric, []).append(f"{metric}{_format_labels(labels)} {value}")
+    for metric, samples in families.items():
+        declare(metric, "gauge")
+        lines.extend(samples)
+
+    return "\n".join(lines) + "\n"
+
+def reset() -> None:
+    """Clear recorded histograms, counters and gauges (collectors are kept)."""
+    _histograms.clear()
+    _counters.clear()
+    _gauges.clear()
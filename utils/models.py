@@ -0,0 +1,352 @@
+"""
+Compact domain models for NWS data.
+
+Responses are parsed into these classes once, when they arrive from the
+API, so cached entries keep only the fields the server uses (in __slots__
+instead of per-object dicts) and formatters read plain attributes instead
+of probing nested dicts. Each model maps NWS property names to attribute
+names in FIELDS, which is also the field vocabulary of structured output.
+Time series (hourly forecasts, raw grid data) are held as parallel
+array("d") columns so they can be summarized without per-hour objects.
+"""
+import math
+import re
+import sys
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+class _Model:
+    """Base class for the __slots__ models, built from values in FIELDS order."""
+
+    __slots__ = ()
+
+    # NWS property name -> attribute name
+    FIELDS: Dict[str, str] = {}
+    # Attributes holding repetitive categorical strings, interned to share memory
+    INTERNED: Tuple[str, ...] = ()
+
+    def __init__(self, *values: Any):
+        for attr, value in zip(self.__slots__, values):
+            if attr in self.INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, attr, value)
+
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Convert the model to a dict keyed by NWS property names.
+
+        Args:
+            fields: Property names to include (defaults to all of FIELDS)
+
+        Returns:
+            Dict of the selected properties
+        """
+        return {name: getattr(self, self.FIELDS[name]) for name in (fields or self.FIELDS)}
+
+    def __eq__(self, other: Any) -> bool:
+        return type(self) is type(other) and all(
+            getattr(self, attr) == getattr(other, attr) for attr in self.__slots__
+        )
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{attr}={getattr(self, attr)!r}" for attr in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+class Alert(_Model):
+    """An active weather alert, without geometry or zone lists."""
+
+    FIELDS = {
+        "id": "id",
+        "event": "event",
+        "headline": "headline",
+        "areaDesc": "area_desc",
+        "severity": "severity",
+        "certainty": "certainty",
+        "urgency": "urgency",
+        "description": "description",
+        "instruction": "instruction",
+        "senderName": "sender_name",
+        "sent": "sent",
+        "effective": "effective",
+        "onset": "onset",
+        "expires": "expires",
+        "ends": "ends",
+        "status": "status",
+        "messageType": "message_type"
+    }
+    INTERNED = ("event", "severity", "certainty", "urgency", "sender_name", "status", "message_type")
+    __slots__ = tuple(FIELDS.values())
+
+    @classmethod
+    def from_feature(cls, feature: Dict[str, Any]) -> "Alert":
+        """
+        Build an alert from a GeoJSON feature of an NWS alerts response.
+
+        Args:
+            feature: Alert feature from NWS API
+
+        Returns:
+            The alert
+        """
+        props = feature.get("properties") or {}
+        alert = cls(*(props.get(name) for name in cls.FIELDS))
+        if alert.id is None:
+            alert.id = feature.get("id")
+        return alert
+
+class ForecastPeriod(_Model):
+    """One period (e.g. "Tonight") of a gridpoint forecast."""
+
+    FIELDS = {
+        "number": "number",
+        "name": "name",
+        "startTime": "start_time",
+        "endTime": "end_time",
+        "isDaytime": "is_daytime",
+        "temperature": "temperature",
+        "temperatureUnit": "temperature_unit",
+        "temperatureTrend": "temperature_trend",
+        "precipitation": "precipitation",
+        "windSpeed": "wind_speed",
+        "windDirection": "wind_direction",
+        "shortForecast": "short_forecast",
+        "detailedForecast": "detailed_forecast"
+    }
+    INTERNED = ("temperature_unit", "temperature_trend", "wind_speed", "wind_direction", "short_forecast")
+    __slots__ = tuple(FIELDS.values())
+
+    @classmethod
+    def from_period(cls, period: Dict[str, Any]) -> "ForecastPeriod":
+        """
+        Build a forecast period from an NWS forecast period.
+
+        The probabilityOfPrecipitation quantity is flattened to its value.
+
+        Args:
+            period: Forecast period data from NWS API
+
+        Returns:
+            The forecast period
+        """
+        values = []
+        for name in cls.FIELDS:
+            if name == "precipitation":
+                values.append((period.get("probabilityOfPrecipitation") or {}).get("value"))
+            else:
+                values.append(period.get(name))
+        return cls(*values)
+
+class Forecast(_Model):
+    """A gridpoint forecast: its periods and when it was issued."""
+
+    FIELDS = {"updated": "updated", "location": "location", "periods": "periods"}
+    __slots__ = tuple(FIELDS.values())
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any]) -> "Forecast":
+        """
+        Build a forecast from an NWS forecast response.
+
+        Args:
+            data: Full forecast response from NWS API
+
+        Returns:
+            The forecast
+
+        Raises:
+            ValueError: If the response has no list of periods, or a malformed period
+        """
+        props = (data or {}).get("properties") or {}
+        periods = props.get("periods")
+        if not isinstance(periods, list):
+            raise ValueError("Forecast response has no periods")
+        try:
+            return cls(
+                props.get("updateTime") or props.get("updated"),
+                (props.get("location") or {}).get("name"),
+                tuple(ForecastPeriod.from_period(period) for period in periods)
+            )
+        except (AttributeError, TypeError) as e:
+            raise ValueError(f"Malformed forecast period: {e!r}") from e
+
+class Gridpoint(_Model):
+    """The forecast office, grid cell and forecast URLs of a location."""
+
+    FIELDS = {
+        "gridId": "grid_id",
+        "gridX": "grid_x",
+        "gridY": "grid_y",
+        "forecast": "forecast_url",
+        "forecastHourly": "forecast_hourly_url",
+        "forecastGridData": "forecast_grid_data_url"
+    }
+    INTERNED = ("grid_id",)
+    __slots__ = tuple(FIELDS.values())
+
+    @classmethod
+    def from_points(cls, data: Dict[str, Any]) -> "Gridpoint":
+        """
+        Build a gridpoint from a /points response or its properties.
+
+        Args:
+            data: Response from the /points endpoint, or a dict of its properties
+
+        Returns:
+            The gridpoint (forecast_url is None if the response had none)
+        """
+        props = data.get("properties", data) or {}
+        return cls(*(props.get(name) for name in cls.FIELDS))
+
+class Place(_Model):
+    """A named place from the gazetteer (a city, or a ZIP code centroid)."""
+
+    FIELDS = {
+        "name": "name",
+        "state": "state",
+        "latitude": "latitude",
+        "longitude": "longitude",
+        "population": "population"
+    }
+    INTERNED = ("state",)
+    __slots__ = tuple(FIELDS.values())
+
+    @property
+    def label(self) -> str:
+        """Display name, e.g. "Portland, OR"."""
+        return f"{self.name}, {self.state}" if self.state else self.name
+
+# ISO 8601 durations used in NWS gridpoint validTime intervals (e.g. PT3H, P1DT6H)
+_DURATION = re.compile(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?$")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+def _timestamp(value: str) -> float:
+    """Parse an ISO 8601 time to a POSIX timestamp."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+def _number(value: Any) -> float:
+    """Get a float from a number, an NWS quantity or a "5 to 10 mph" string (NaN if missing)."""
+    if isinstance(value, dict):
+        value = value.get("value")
+    if isinstance(value, str):
+        numbers = _NUMBER.findall(value)
+        return max(float(n) for n in numbers) if numbers else math.nan
+    return math.nan if value is None else float(value)
+
+def _interval(valid_time: str) -> Tuple[float, int]:
+    """Parse a "start/duration" validTime into (start timestamp, whole hours)."""
+    start, _, duration = valid_time.partition("/")
+    match = _DURATION.match(duration)
+    if not match:
+        return _timestamp(start), 1
+    days, hours, minutes = (int(part or 0) for part in match.groups())
+    return _timestamp(start), max(1, days * 24 + hours + (minutes + 59) // 60)
+
+class HourlyForecast(_Model):
+    """An hourly forecast as parallel arrays (POSIX start times and values)."""
+
+    FIELDS = {
+        "updated": "updated",
+        "temperatureUnit": "temperature_unit",
+        "times": "times",
+        "temperature": "temperature",
+        "precipitation": "precipitation",
+        "windSpeed": "wind_speed"
+    }
+    __slots__ = tuple(FIELDS.values())
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any]) -> "HourlyForecast":
+        """
+        Build an hourly forecast from an NWS forecast/hourly response.
+
+        Missing values are stored as NaN; wind speed ranges use their upper bound.
+
+        Args:
+            data: Full hourly forecast response from NWS API
+
+        Returns:
+            The hourly forecast
+
+        Raises:
+            ValueError: If the response has no list of periods, or a period
+                without a valid startTime
+        """
+        props = (data or {}).get("properties") or {}
+        periods = props.get("periods")
+        if not isinstance(periods, list):
+            raise ValueError("Hourly forecast response has no periods")
+        try:
+            return cls(
+                props.get("updateTime") or props.get("updated"),
+                periods[0].get("temperatureUnit", "F") if periods else "F",
+                array("d", (_timestamp(period["startTime"]) for period in periods)),
+                array("d", (_number(period.get("temperature")) for period in periods)),
+                array("d", (_number(period.get("probabilityOfPrecipitation")) for period in periods)),
+                array("d", (_number(period.get("windSpeed")) for period in periods))
+            )
+        except (AttributeError, KeyError, TypeError) as e:
+            raise ValueError(f"Malformed hourly forecast period: {e!r}") from e
+
+class GridData(_Model):
+    """Raw gridpoint forecast layers resampled to a shared hourly timeline."""
+
+    # NWS layer name -> attribute name
+    LAYERS = {
+        "temperature": "temperature",
+        "probabilityOfPrecipitation": "precipitation",
+        "quantitativePrecipitation": "precipitation_amount",
+        "windSpeed": "wind_speed",
+        "windGust": "wind_gust"
+    }
+    FIELDS = {"updated": "updated", "units": "units", "times": "times", **LAYERS}
+    __slots__ = tuple(FIELDS.values())
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any]) -> "GridData":
+        """
+        Build grid data from an NWS forecastGridData response.
+
+        Each layer's validTime intervals are expanded to hourly values;
+        accumulated quantities (precipitation amounts) are spread evenly over
+        their interval. Hours a layer does not cover are NaN.
+
+        Args:
+            data: Full gridpoint response from NWS API
+
+        Returns:
+            The grid data
+
+        Raises:
+            ValueError: If the response has no forecast layers, or a value
+                without a valid validTime
+        """
+        props = (data or {}).get("properties") or {}
+        hourly: Dict[str, Dict[int, float]] = {}
+        units: Dict[str, Optional[str]] = {}
+        for name, attr in cls.LAYERS.items():
+            layer = props.get(name) or {}
+            units[name] = (layer.get("uom") or "").rpartition(":")[2] or None
+            values = hourly[attr] = {}
+            try:
+                for entry in layer.get("values") or ():
+                    start, hours = _interval(entry["validTime"])
+                    value = _number(entry.get("value"))
+                    if attr == "precipitation_amount":
+                        value /= hours
+                    first = int(start // 3600)
+                    for hour in range(first, first + hours):
+                        values[hour] = value
+            except (AttributeError, KeyError, TypeError) as e:
+                raise ValueError(f"Malformed {name} value in gridpoint response: {e!r}") from e
+
+        hours = [hour for values in hourly.values() for hour in values]
+        if not hours:
+            raise ValueError("Gridpoint response has no forecast layers")
+        timeline = range(min(hours), max(hours) + 1)
+        return cls(
+            props.get("updateTime"),
+            units,
+            array("d", (hour * 3600.0 for hour in timeline)),
+            *(array("d", (hourly[attr].get(hour, math.nan) for hour in timeline)) for attr in cls.LAYERS.values())
+        )
@@ -0,0 +1,176 @@
+"""
+Background refresh of frequently requested NWS resources.
+
+Tracks how often each URL is requested and refreshes the hottest ones
+shortly before their cached copy expires, within a per-minute request
+budget, so popular states and gridpoints rarely pay upstream latency.
+"""
+import asyncio
+import heapq
+import sys
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+class PrefetchScheduler:
+    """Refreshes hot cache entries ahead of expiry (stale-while-revalidate)."""
+
+    def __init__(self,
+                 refresh: Callable[[str], Awaitable[Any]],
+                 expires_at: Callable[[str], Optional[float]],
+                 max_hot: int = 50,
+                 refresh_ahead: float = 10.0,
+                 budget_per_minute: int = 30,
+                 interval: float = 1.0):
+        """
+        Initialize the scheduler.
+
+        Args:
+            refresh: Coroutine function that re-fetches a URL into the cache
+            expires_at: Returns a URL's cache expiry (time.monotonic() clock) or None
+            max_hot: Number of most-requested URLs kept fresh
+            refresh_ahead: Seconds before expiry at which a URL is refreshed
+            budget_per_minute: Maximum refresh requests per minute
+            interval: Seconds between scheduling passes
+        """
+        self._refresh = refresh
+        self._expires_at = expires_at
+        self.max_hot = max_hot
+        self.refresh_ahead = refresh_ahead
+        self.budget_per_minute = budget_per_minute
+        self.interval = interval
+
+        self._counts: Counter = Counter()
+        self._last_decay = time.monotonic()
+        self._urgent: Dict[str, float] = {}
+        self._queue: List[str] = []
+        self._refreshing: Set[str] = set()
+        self._tokens = float(budget_per_minute)
+        self._last_refill = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+        self.refreshes = 0
+        self.failures = 0
+        self.stale_served = 0
+        self.budget_deferred = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._total_lag = 0.0
+
+    def record(self, url: str) -> None:
+        """Count a request for a URL."""
+        self._counts[url] += 1
+
+    def mark_stale_served(self, url: str) -> None:
+        """Record that a stale copy of a URL was served and refresh it next pass."""
+        self.stale_served += 1
+        self._urgent.setdefault(url, time.monotonic())
+
+    def hot_urls(self) -> List[str]:
+        """Get the most-requested URLs, most popular first."""
+        return [url for url, _ in heapq.nlargest(self.max_hot, self._counts.items(), key=lambda item: item[1])]
+
+    def _decay(self, now: float) -> None:
+        """Halve request counts every minute so popularity tracks recent traffic."""
+        if now - self._last_decay < 60:
+            return
+        self._last_decay = now
+        for url in list(self._counts):
+            self._counts[url] //= 2
+            if self._counts[url] == 0:
+                del self._counts[url]
+
+    def _refill(self, now: float) -> None:
+        """Add request budget for the time elapsed since the last pass."""
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(float(self.budget_per_minute),
+                           self._tokens + elapsed * self.budget_per_minute / 60)
+
+    def _due(self, now: float) -> Dict[str, float]:
+        """Get URLs that need refreshing, mapped to when they became due."""
+        due = dict(self._urgent)
+        for url in self.hot_urls():
+            expires_at = self._expires_at(url)
+            if expires_at is None or url in due:
+                continue
+            due_at = expires_at - self.refresh_ahead
+            if due_at <= now:
+                due[url] = due_at
+        return due
+
+    async def run_once(self) -> None:
+        """Run one scheduling pass, starting refreshes the budget allows."""
+        now = time.monotonic()
+        self._decay(now)
+        self._refill(now)
+
+        due = self._due(now)
+        self._queue = sorted((url for url in due if url not in self._refreshing), key=due.get)
+        while self._queue and self._tokens >= 1:
+            url = self._queue.pop(0)
+            self._tokens -= 1
+            self._urgent.pop(url, None)
+            self._record_lag(now - due[url])
+            self._refreshing.add(url)
+            asyncio.ensure_future(self._run_refresh(url))
+        self.budget_deferred += len(self._queue)
+
+    def _record_lag(self, lag: float) -> None:
+        """Track how late a refresh started relative to when it became due."""
+        lag = max(0.0, lag)
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self._total_lag += lag
+
+    async def _run_refresh(self, url: str) -> None:
+        try:
+            await self._refresh(url)
+            self.refreshes += 1
+        except Exception as e:
+            self.failures += 1
+            print(f"Background refresh of {url} failed: {e}", file=sys.stderr)
+        finally:
+            self._refreshing.discard(url)
+
+    async def _run(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the scheduling loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stop the scheduling loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler statistics.
+
+        Returns:
+            Dict with queue depth, refresh counts, refresh lag and how often
+            stale data was served
+        """
+        started = self.refreshes + self.failures + len(self._refreshing)
+        return {
+            "tracked_urls": len(self._counts),
+            "queue_depth": len(self._queue),
+            "refreshing": len(self._refreshing),
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "budget_deferred": self.budget_deferred,
+            "stale_served": self.stale_served,
+            "refresh_lag_last": round(self.last_lag, 3),
+            "refresh_lag_max": round(self.max_lag, 3),
+            "refresh_lag_avg": round(self._total_lag / started, 3) if started else 0.0
+        }
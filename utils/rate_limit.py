@@ -0,0 +1,175 @@
+"""
+Async token-bucket rate limiting for upstream requests.
+
+Waiting requests are served in priority order, so interactive tool calls
+go ahead of background refreshes. Optionally, the bucket state is kept in
+a lock-protected file so several server processes on one host share a
+single request budget.
+"""
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+# Priority classes, lower values are served first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+class TokenBucket:
+    """A token bucket with a priority queue of waiting requests."""
+
+    def __init__(self, rate: float, burst: int, state_file: Optional[Path] = None):
+        """
+        Initialize the token bucket.
+
+        Args:
+            rate: Tokens added per second
+            burst: Maximum number of tokens (requests allowed back to back)
+            state_file: File used to share the bucket between processes
+        """
+        self.rate = rate
+        self.burst = burst
+        self.state_file = Path(state_file) if state_file else None
+        if self.state_file is not None and fcntl is None:
+            print("File locking is unavailable; rate limiting is per process only.", file=sys.stderr)
+            self.state_file = None
+
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        self.acquired = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.queue_time = {name: 0.0 for name in PRIORITY_NAMES.values()}
+        self.max_queue_time = {name: 0.0 for name in PRIORITY_NAMES.values()}
+
+    async def acquire(self, priority: int = INTERACTIVE) -> float:
+        """
+        Wait for a token.
+
+        Args:
+            priority: INTERACTIVE or BACKGROUND
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        start = time.monotonic()
+        if not self._waiters and await self._take() == 0:
+            self._record(priority, 0.0)
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+        await future
+        waited = time.monotonic() - start
+        self._record(priority, waited)
+        return waited
+
+    async def _dispatch(self) -> None:
+        """Hand out tokens to waiters in priority order as they become available."""
+        while self._waiters:
+            # Drop waiters that were cancelled (e.g. by a deadline) while queued
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+                continue
+            wait = await self._take()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+
+    async def _take(self) -> float:
+        """
+        Try to take a token.
+
+        The shared bucket is locked and read in a worker thread, so waiting
+        for another process to release the lock does not block the event loop.
+
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        if self.state_file is not None:
+            return await asyncio.to_thread(self._take_shared)
+
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _take_shared(self) -> float:
+        """Take a token from the bucket state shared through the state file."""
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.state_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = time.time()
+            try:
+                state = json.loads(os.read(fd, 256) or b"{}")
+                tokens, last_refill = float(state["tokens"]), float(state["last_refill"])
+            except (KeyError, TypeError, ValueError):
+                tokens, last_refill = float(self.burst), now
+
+            tokens = min(float(self.burst), tokens + max(0.0, now - last_refill) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps({"tokens": tokens, "last_refill": now}).encode())
+            return wait
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _record(self, priority: int, waited: float) -> None:
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        self.acquired[name] = self.acquired.get(name, 0) + 1
+        self.queue_time[name] = self.queue_time.get(name, 0.0) + waited
+        self.max_queue_time[name] = max(self.max_queue_time.get(name, 0.0), waited)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get rate limiter statistics.
+
+        Returns:
+            Dict with the current queue depth and, per priority class, the
+            number of tokens acquired and average/maximum queue time
+        """
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "shared": self.state_file is not None,
+            "queue_depth": sum(1 for _, _, future in self._waiters if not future.done()),
+            "priorities": {
+                name: {
+                    "acquired": count,
+                    "avg_queue_time": round(self.queue_time[name] / count, 4) if count else 0.0,
+                    "max_queue_time": round(self.max_queue_time[name], 4)
+                }
+                for name, count in self.acquired.items()
+            }
+        }
@@ -0,0 +1,143 @@
+"""
+Retry classification, backoff and circuit breaking for upstream requests.
+"""
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+# Statuses worth retrying: timeouts, rate limiting and server-side failures
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+def is_retryable_status(status_code: int) -> bool:
+    """Check whether an HTTP status indicates a transient failure."""
+    return status_code in RETRYABLE_STATUSES
+
+def is_retryable_exception(error: Exception) -> bool:
+    """Check whether a request exception (timeout, connection error) is transient."""
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+
+    Args:
+        response: The HTTP response
+
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def decorrelated_jitter(previous: float, base: float, cap: float) -> float:
+    """
+    Compute the next backoff delay using decorrelated jitter.
+
+    Args:
+        previous: The previous delay (use base for the first retry)
+        base: Minimum delay in seconds
+        cap: Maximum delay in seconds
+
+    Returns:
+        Delay in seconds, randomly chosen between base and 3x the previous delay
+    """
+    return min(cap, random.uniform(base, previous * 3))
+
+class CircuitBreaker:
+    """
+    A per-host circuit breaker.
+
+    After failure_threshold consecutive failures the circuit opens and
+    requests fail fast. After reset_timeout seconds a single trial request
+    is let through (half-open); its outcome closes or re-opens the circuit.
+    A trial that never reports back is replaced after another reset_timeout.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._state = self.CLOSED
+        self._trial_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_started = None
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        Check whether a request may be sent.
+
+        Returns:
+            True if the request may proceed, False if it should fail fast
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN:
+            now = time.monotonic()
+            if self._trial_started is None or now - self._trial_started >= self.reset_timeout:
+                self._trial_started = now
+                return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful request, closing the circuit."""
+        self.failures = 0
+        self._state = self.CLOSED
+        self._trial_started = None
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit past the threshold."""
+        self.failures += 1
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.times_opened += 1
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._trial_started = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get circuit breaker statistics.
+
+        Returns:
+            Dict with the current state, consecutive failures, how often the
+            circuit opened and how many requests were rejected
+        """
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected
+        }
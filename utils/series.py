@@ -0,0 +1,168 @@
+"""
+Summaries of hourly forecast time series.
+
+The series are array("d") columns from utils.models, summarized with
+single-pass loops over the columns (NaN marks a missing hour); a 7-day
+hourly series summarizes in well under a millisecond.
+"""
+import math
+from array import array
+from datetime import datetime, timezone
+from itertools import compress
+from typing import Any, Dict, List, Optional
+
+from utils.models import GridData, HourlyForecast
+
+def _iso(timestamp: float) -> str:
+    """Format a POSIX timestamp as an ISO 8601 UTC time."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+def _round(value: float) -> float:
+    return round(value, 1)
+
+def value_stats(times: array, values: array) -> Optional[Dict[str, Any]]:
+    """
+    Compute min/max/mean of a series and when the extremes occur.
+
+    Args:
+        times: POSIX timestamps
+        values: Values aligned with times (NaN where missing)
+
+    Returns:
+        Dict with min, max, mean, min_at and max_at, or None if every value is missing
+    """
+    low = high = math.nan
+    low_at = high_at = 0.0
+    total, count = 0.0, 0
+    for timestamp, value in zip(times, values):
+        if value != value:
+            continue
+        if count == 0 or value < low:
+            low, low_at = value, timestamp
+        if count == 0 or value > high:
+            high, high_at = value, timestamp
+        total += value
+        count += 1
+    if count == 0:
+        return None
+    return {
+        "min": _round(low),
+        "max": _round(high),
+        "mean": _round(total / count),
+        "min_at": _iso(low_at),
+        "max_at": _iso(high_at)
+    }
+
+def peak(times: array, values: array) -> Optional[Dict[str, Any]]:
+    """
+    Find the highest value of a series.
+
+    Args:
+        times: POSIX timestamps
+        values: Values aligned with times (NaN where missing)
+
+    Returns:
+        Dict with the peak value and when it occurs, or None if every value is missing
+    """
+    high, high_at = -math.inf, None
+    for timestamp, value in zip(times, values):
+        if value > high:
+            high, high_at = value, timestamp
+    if high_at is None:
+        return None
+    return {"value": _round(high), "at": _iso(high_at)}
+
+def windows(times: array, values: array, threshold: float) -> List[Dict[str, Any]]:
+    """
+    Find runs of consecutive hours at or above a threshold.
+
+    Args:
+        times: POSIX timestamps, one per hour
+        values: Values aligned with times (NaN counts as below the threshold)
+        threshold: Minimum value for an hour to be part of a window
+
+    Returns:
+        List of windows with start, end (exclusive), hours and peak value
+    """
+    result = []
+    start = None
+    high = 0.0
+    # A trailing NaN closes a window that runs to the end of the series
+    for index, value in enumerate(values.tolist() + [math.nan]):
+        if value >= threshold:
+            if start is None:
+                start, high = index, value
+            elif value > high:
+                high = value
+        elif start is not None:
+            result.append({
+                "start": _iso(times[start]),
+                "end": _iso(times[index - 1] + 3600),
+                "hours": index - start,
+                "peak": _round(high)
+            })
+            start = None
+    return result
+
+def _total(values: array) -> Optional[float]:
+    total, count = 0.0, 0
+    for value in values:
+        if value == value:
+            total += value
+            count += 1
+    return _round(total) if count else None
+
+def summarize_hourly(forecast: HourlyForecast, hours: int, precipitation_threshold: float) -> Dict[str, Any]:
+    """
+    Summarize the first hours of an hourly forecast.
+
+    Args:
+        forecast: Hourly forecast from weather_api
+        hours: Number of hours to summarize
+        precipitation_threshold: Chance of precipitation (%) that starts a wet window
+
+    Returns:
+        Dict with temperature statistics, precipitation windows and peak wind speed
+    """
+    times = forecast.times[:hours]
+    temperature = forecast.temperature[:hours]
+    precipitation = forecast.precipitation[:hours]
+    wind_speed = forecast.wind_speed[:hours]
+    return {
+        "updated": forecast.updated,
+        "start": _iso(times[0]) if times else None,
+        "hours": len(times),
+        "temperature": value_stats(times, temperature),
+        "temperatureUnit": forecast.temperature_unit,
+        "precipitationWindows": windows(times, precipitation, precipitation_threshold),
+        "windSpeedPeak": peak(times, wind_speed)
+    }
+
+def summarize_grid_data(grid: GridData, hours: int, precipitation_threshold: float) -> Dict[str, Any]:
+    """
+    Summarize the first hours of raw gridpoint data.
+
+    Args:
+        grid: Grid data from weather_api
+        hours: Number of hours to summarize
+        precipitation_threshold: Chance of precipitation (%) that starts a wet window
+
+    Returns:
+        Dict with temperature statistics, precipitation windows and total
+        amount, and peak wind speed and gust, with the NWS units
+    """
+    # Skip hours before the first temperature value (layers start at different times)
+    start = next(compress(range(len(grid.times)), map(math.isfinite, grid.temperature)), 0)
+    end = start + hours
+    times = grid.times[start:end]
+    return {
+        "updated": grid.updated,
+        "start": _iso(times[0]) if times else None,
+        "hours": len(times),
+        "units": grid.units,
+        "temperature": value_stats(times, grid.temperature[start:end]),
+        "precipitationWindows": windows(times, grid.precipitation[start:end], precipitation_threshold),
+        "precipitationTotal": _total(grid.precipitation_amount[start:end]),
+        "windSpeedPeak": peak(times, grid.wind_speed[start:end]),
+        "windGustPeak": peak(times, grid.wind_gust[start:end])
+    }
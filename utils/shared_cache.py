@@ -0,0 +1,161 @@
+"""
+Response cache shared by server processes on one host.
+
+When several worker processes serve the HTTP transport, each keeps its own
+in-memory TTLCache; this SQLite tier (in WAL mode, so readers never block
+the writer) lets a response fetched by one worker be served by the others.
+Fetch leases coordinate workers that miss at the same time: the first one
+fetches while the others wait briefly for its result, so adding workers
+does not multiply upstream requests.
+"""
+import os
+import pickle
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+class SharedResponseCache:
+    """An SQLite-backed cache of parsed responses with per-URL fetch leases."""
+
+    # Writes between purges of expired rows
+    PURGE_INTERVAL = 200
+
+    def __init__(self, path: Path):
+        """
+        Initialize the shared cache.
+
+        Args:
+            path: Path of the SQLite database file, shared by all processes
+        """
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.leases_won = 0
+        self.leases_lost = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open the database on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit mode; every statement is its own short transaction
+            self._conn = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    payload BLOB NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS leases (
+                    url TEXT PRIMARY KEY,
+                    owner INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+        return self._conn
+
+    def get(self, url: str) -> Optional[Tuple[Any, float]]:
+        """
+        Get a fresh response.
+
+        Args:
+            url: The requested URL
+
+        Returns:
+            (payload, remaining TTL in seconds), or None if missing or expired
+        """
+        row = self.conn.execute(
+            "SELECT payload, expires_at FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+        remaining = row[1] - time.time() if row else 0
+        if remaining <= 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(row[0]), remaining
+
+    def set(self, url: str, payload: Any, ttl: float) -> None:
+        """
+        Store a response.
+
+        Args:
+            url: The requested URL
+            payload: The parsed response
+            ttl: Time-to-live in seconds; 0 or less removes any stored response
+        """
+        if ttl <= 0:
+            self.conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+            (url, pickle.dumps(payload, pickle.HIGHEST_PROTOCOL), time.time() + ttl)
+        )
+        self.writes += 1
+        if self.writes % self.PURGE_INTERVAL == 0:
+            self.conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+
+    def claim(self, url: str, lease: float) -> bool:
+        """
+        Try to become the process that fetches a URL.
+
+        Args:
+            url: The URL about to be fetched
+            lease: Seconds after which the claim lapses if never released
+
+        Returns:
+            True if this process holds the lease, False if another process does
+        """
+        now = time.time()
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM leases WHERE url = ? AND expires_at <= ?", (url, now))
+            claimed = conn.execute(
+                "INSERT OR IGNORE INTO leases VALUES (?, ?, ?)", (url, os.getpid(), now + lease)
+            ).rowcount == 1
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        if claimed:
+            self.leases_won += 1
+        else:
+            self.leases_lost += 1
+        return claimed
+
+    def release(self, url: str) -> None:
+        """Release this process's lease on a URL."""
+        self.conn.execute("DELETE FROM leases WHERE url = ? AND owner = ?", (url, os.getpid()))
+
+    def clear(self) -> None:
+        """Remove all shared responses and leases."""
+        self.conn.execute("DELETE FROM responses")
+        self.conn.execute("DELETE FROM leases")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics for this process.
+
+        Returns:
+            Dict with hit/miss/write counters and fetch leases won and lost
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "leases_won": self.leases_won,
+            "leases_lost": self.leases_lost
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
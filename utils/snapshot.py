@@ -0,0 +1,483 @@
+"""
+Snapshot store of recorded NWS responses.
+
+Response bodies are appended to a data file as zlib-compressed records, so
+recording never rewrites earlier data and a later record of a URL simply
+supersedes the earlier one. A hash index written next to the data file
+(open addressing, fixed-size slots) maps each URL to the offset of its
+latest record; both files are memory-mapped, so opening a snapshot costs
+no parsing and a lookup is one probe sequence plus one decompression.
+Records appended after the index was written are found by scanning the
+tail of the data file, and the index is rewritten when the store is closed.
+
+URLs are keyed by path and query only, so a snapshot recorded against
+api.weather.gov replays against any NWS_API_BASE.
+
+Build a snapshot from recorded tool calls (the benchmarks' JSON Lines
+format, {"tool": ..., "arguments": {...}} per line) or {"url": ...} lines:
+
+    python -m utils.snapshot build calls.jsonl --output snapshots/nws
+    python -m utils.snapshot info snapshots/nws
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+# Values of config.SNAPSHOT_MODE
+MODES = ("off", "record", "replay", "fallback")
+
+DATA_MAGIC = b"NWSSNAP\x01"
+INDEX_MAGIC = b"NWSIDX\x00\x01"
+
+# Record header: recorded_at, URL key length, compressed body length
+RECORD = struct.Struct("<dHI")
+# Index header: magic, data file size covered by the index, slot count, entry count
+INDEX_HEADER = struct.Struct("<8sQQQ")
+# Index slot: key hash (0 marks an empty slot), record offset
+SLOT = struct.Struct("<QQ")
+
+def snapshot_key(url: str) -> str:
+    """
+    Get the key a URL is stored under.
+
+    Args:
+        url: Full or path-only NWS URL
+
+    Returns:
+        The URL's path and query
+    """
+    parts = urlsplit(url)
+    return parts.path + ("?" + parts.query if parts.query else "")
+
+def _hash(key: str) -> int:
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    # The low bit is always set so no key hashes to the empty-slot marker
+    return int.from_bytes(digest, "little") | 1
+
+def _map(path: Path) -> Optional[mmap.mmap]:
+    """Memory-map a file read-only (None if it is missing or empty)."""
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+
+class SnapshotStore:
+    """An append-only, compressed store of response bodies with a memory-mapped hash index."""
+
+    def __init__(self, path: Path, writable: bool = False, level: int = 6):
+        """
+        Open a snapshot.
+
+        Args:
+            path: Path of the data file; the index is kept at the same path with an .idx suffix
+            writable: Whether records may be appended
+            level: zlib compression level of appended records
+        """
+        self.path = Path(path)
+        self.index_path = self.path.with_suffix(self.path.suffix + ".idx")
+        self.writable = writable
+        self.level = level
+        self.hits = 0
+        self.misses = 0
+        self.records = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+        self._fd: Optional[int] = None
+        self._data: Optional[mmap.mmap] = None
+        self._index: Optional[mmap.mmap] = None
+        self._slots = 0
+        self._indexed = 0
+        # Offsets of records newer than the index, by key hash
+        self._tail: Dict[int, int] = {}
+        self._scanned = len(DATA_MAGIC)
+
+        if writable:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+            if os.fstat(self._fd).st_size == 0:
+                os.write(self._fd, DATA_MAGIC)
+        self._open_index()
+        self._data = _map(self.path)
+        if self._data is not None and self._data[:len(DATA_MAGIC)] != DATA_MAGIC:
+            raise ValueError(f"{self.path} is not a snapshot data file")
+        self._scan_tail()
+
+    def _open_index(self) -> None:
+        """Map the index file, ignoring it if it is missing or unreadable."""
+        index = _map(self.index_path)
+        if index is None or len(index) < INDEX_HEADER.size:
+            return
+        magic, covered, slots, entries = INDEX_HEADER.unpack_from(index)
+        if magic != INDEX_MAGIC or len(index) != INDEX_HEADER.size + slots * SLOT.size:
+            print(f"Ignoring invalid snapshot index {self.index_path}", file=sys.stderr)
+            index.close()
+            return
+        self._index = index
+        self._slots = slots
+        self._indexed = entries
+        self._scanned = covered
+
+    def _remap(self) -> None:
+        """Map the data file again after it has grown."""
+        if self._data is not None:
+            self._data.close()
+        self._data = _map(self.path)
+
+    def _scan_tail(self) -> None:
+        """Add records appended after the index (or the last scan) to the in-memory tail."""
+        if self._data is None or len(self._data) <= self._scanned:
+            return
+        for offset, end, key, _ in self._iter_records(self._scanned):
+            self._tail[_hash(key)] = offset
+            self._scanned = end
+
+    def _iter_records(self, start: int) -> Iterator[Tuple[int, int, str, float]]:
+        """Yield (offset, end, key, recorded_at) of complete records from an offset on."""
+        data = self._data
+        offset = start
+        size = len(data) if data is not None else 0
+        while offset + RECORD.size <= size:
+            recorded_at, key_length, body_length = RECORD.unpack_from(data, offset)
+            end = offset + RECORD.size + key_length + body_length
+            if end > size:
+                # A record still being written by another process
+                break
+            key = data[offset + RECORD.size:offset + RECORD.size + key_length].decode("utf-8")
+            yield offset, end, key, recorded_at
+            offset = end
+
+    def _lookup(self, digest: int) -> Optional[int]:
+        """Find the offset of a key hash's latest record."""
+        offset = self._tail.get(digest)
+        return offset if offset is not None else self._probe(digest)
+
+    def _probe(self, digest: int) -> Optional[int]:
+        """Find a key hash in the index."""
+        if self._index is None:
+            return None
+        mask = self._slots - 1
+        slot = digest & mask
+        while True:
+            found, offset = SLOT.unpack_from(self._index, INDEX_HEADER.size + slot * SLOT.size)
+            if found == digest:
+                return offset
+            if found == 0:
+                return None
+            slot = (slot + 1) & mask
+
+    def _read(self, offset: int, key: str) -> Optional[bytes]:
+        """Decompress the body of the record at an offset if it belongs to key."""
+        if self._data is None or offset + RECORD.size > len(self._data):
+            self._remap()
+        if self._data is None or offset + RECORD.size > len(self._data):
+            # The data file is gone or shorter than the index says
+            return None
+        _, key_length, body_length = RECORD.unpack_from(self._data, offset)
+        start = offset + RECORD.size
+        end = start + key_length + body_length
+        if end > len(self._data):
+            # Appended by this process after the data file was mapped
+            self._remap()
+            if self._data is None or end > len(self._data):
+                return None
+        data = self._data
+        if data[start:start + key_length] != key.encode("utf-8"):
+            # A hash collision with another key
+            return None
+        start += key_length
+        return zlib.decompress(data[start:start + body_length])
+
+    def get(self, url: str) -> Optional[bytes]:
+        """
+        Get the latest recorded body of a URL.
+
+        Args:
+            url: Full or path-only NWS URL
+
+        Returns:
+            The response body, or None if the URL was never recorded
+        """
+        key = snapshot_key(url)
+        digest = _hash(key)
+        offset = self._lookup(digest)
+        if offset is None and self._refresh():
+            # Another process may have recorded it since
+            offset = self._lookup(digest)
+        body = self._read(offset, key) if offset is not None else None
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return body
+
+    def _refresh(self) -> bool:
+        """Pick up records appended by other processes; True if there were any."""
+        try:
+            size = os.stat(self.path).st_size
+        except FileNotFoundError:
+            return False
+        if size <= self._scanned:
+            return False
+        self._remap()
+        before = self._scanned
+        self._scan_tail()
+        return self._scanned > before
+
+    def append(self, url: str, body: bytes) -> None:
+        """
+        Record a response body, superseding earlier records of the URL.
+
+        Args:
+            url: Full or path-only NWS URL
+            body: The raw response body
+
+        Raises:
+            PermissionError: If the store was opened read-only
+        """
+        if self._fd is None:
+            raise PermissionError(f"{self.path} was opened read-only")
+        key = snapshot_key(url).encode("utf-8")
+        compressed = zlib.compress(body, self.level)
+        record = RECORD.pack(time.time(), len(key), len(compressed)) + key + compressed
+
+        # Lock so records of concurrent processes are not interleaved and the offset is ours
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            offset = os.lseek(self._fd, 0, os.SEEK_END)
+            os.write(self._fd, record)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        self._tail[_hash(key.decode("utf-8"))] = offset
+        if offset == self._scanned:
+            self._scanned = offset + len(record)
+        self.records += 1
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+
+    def _entries(self) -> Dict[int, int]:
+        """Latest record offset of every key hash, from the index and the tail."""
+        entries = {}
+        if self._index is not None:
+            for slot in range(self._slots):
+                digest, offset = SLOT.unpack_from(self._index, INDEX_HEADER.size + slot * SLOT.size)
+                if digest:
+                    entries[digest] = offset
+        entries.update(self._tail)
+        return entries
+
+    def __len__(self) -> int:
+        return self._indexed + sum(1 for digest in self._tail if self._probe(digest) is None)
+
+    def write_index(self) -> None:
+        """Write an index covering every record, replacing the index file atomically."""
+        self._refresh()
+        entries = self._entries()
+        slots = 8
+        while slots < len(entries) * 2:
+            slots *= 2
+        mask = slots - 1
+        table = bytearray(INDEX_HEADER.size + slots * SLOT.size)
+        INDEX_HEADER.pack_into(table, 0, INDEX_MAGIC, self._scanned, slots, len(entries))
+        for digest, offset in entries.items():
+            slot = digest & mask
+            while SLOT.unpack_from(table, INDEX_HEADER.size + slot * SLOT.size)[0]:
+                slot = (slot + 1) & mask
+            SLOT.pack_into(table, INDEX_HEADER.size + slot * SLOT.size, digest, offset)
+
+        temporary = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        temporary.write_bytes(table)
+        os.replace(temporary, self.index_path)
+
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        self._indexed = 0
+        self._tail.clear()
+        self._open_index()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get snapshot statistics.
+
+        Returns:
+            Dict with the number of indexed URLs, records not yet in the index,
+            lookup hits/misses, and records appended by this process with their
+            compression ratio
+        """
+        return {
+            "entries": len(self),
+            "unindexed": len(self._tail),
+            "data_bytes": len(self._data) if self._data is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "records": self.records,
+            "compression_ratio": round(self.bytes_in / self.bytes_out, 2) if self.bytes_out else 0.0
+        }
+
+    def close(self) -> None:
+        """Write the index if records were appended, and close the files."""
+        if self.writable and self._tail:
+            self.write_index()
+        for mapped in (self._data, self._index):
+            if mapped is not None:
+                mapped.close()
+        self._data = self._index = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+def _tool_requests(tool: str, arguments: Dict[str, Any]) -> Optional[Awaitable[Any]]:
+    """Map a recorded tool call to the weather_api call that fetches its data."""
+    from utils import weather_api
+
+    location = (arguments.get("latitude"), arguments.get("longitude"))
+    if tool == "get_alerts":
+        return weather_api.get_alerts_for_state(arguments["state"])
+    if tool == "search_alerts":
+        return weather_api.get_active_alerts(
+            states=arguments.get("states"),
+            zones=arguments.get("zones"),
+            point=location if None not in location else None,
+            severity=arguments.get("severity"),
+            urgency=arguments.get("urgency"),
+            event=arguments.get("event")
+        )
+    if tool == "get_forecast":
+        return weather_api.get_forecast_for_location(*location)
+    if tool == "get_forecast_by_place":
+        places = weather_api.search_places(arguments["place"], 1)
+        return weather_api.get_forecast_for_location(places[0].latitude, places[0].longitude) if places else None
+    if tool == "get_hourly_forecast":
+        return weather_api.get_hourly_forecast_for_location(*location)
+    if tool == "get_gridpoint_summary":
+        return weather_api.get_grid_data_for_location(*location)
+    if tool == "get_forecasts_batch":
+        return weather_api.get_forecasts_for_locations(
+            [(item["latitude"], item["longitude"]) for item in arguments["locations"]]
+        )
+    return None
+
+def _load_requests(paths: List[Path]) -> List[Dict[str, Any]]:
+    """Read {"tool": ..., "arguments": ...} and {"url": ...} lines from JSON Lines files."""
+    requests = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip() and not line.lstrip().startswith("#"):
+                    requests.append(json.loads(line))
+    return requests
+
+async def build(paths: List[Path], output: Path, concurrency: int) -> Dict[str, Any]:
+    """
+    Record the upstream responses needed to serve a list of requests.
+
+    Args:
+        paths: JSON Lines files of tool calls or URLs
+        output: Snapshot data file to append to
+        concurrency: Maximum requests run at once
+
+    Returns:
+        The snapshot statistics after the build
+    """
+    import config
+    from utils import weather_api
+
+    config.SNAPSHOT_MODE = "record"
+    config.SNAPSHOT_PATH = Path(output)
+    # Resolve every location through /points, so the snapshot holds those responses too
+    config.GRIDPOINT_INDEX_ENABLED = False
+
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = 0
+
+    async def run(request: Dict[str, Any]) -> None:
+        nonlocal failed
+        if "url" in request:
+            url = request["url"]
+            call = weather_api.make_nws_request(url if "://" in url else config.NWS_API_BASE + url)
+        else:
+            try:
+                call = _tool_requests(request["tool"], request.get("arguments") or {})
+            except (KeyError, TypeError) as e:
+                print(f"Skipping malformed request {request}: {e}", file=sys.stderr)
+                failed += 1
+                return
+            if call is None:
+                print(f"Skipping {request['tool']}: no NWS requests to record", file=sys.stderr)
+                return
+        async with semaphore:
+            if await call is None:
+                failed += 1
+
+    await weather_api.open_client()
+    try:
+        await asyncio.gather(*(run(request) for request in _load_requests(paths)))
+        stats = weather_api.get_snapshot_stats() or {}
+    finally:
+        # Also writes the snapshot index
+        await weather_api.close_client()
+    return {**stats, "failed_requests": failed}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build and inspect NWS response snapshots")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Record the responses needed by recorded requests")
+    build_parser.add_argument("requests", type=Path, nargs="+",
+                              help='JSON Lines files of {"tool": ..., "arguments": {...}} or {"url": ...}')
+    build_parser.add_argument("--output", type=Path, help="Snapshot data file (defaults to config.SNAPSHOT_PATH)")
+    build_parser.add_argument("--concurrency", type=int, default=4, help="Requests run at once")
+
+    info_parser = subparsers.add_parser("info", help="Show the contents of a snapshot")
+    info_parser.add_argument("path", type=Path, nargs="?", help="Snapshot data file (defaults to config.SNAPSHOT_PATH)")
+    info_parser.add_argument("--list", action="store_true", help="List the recorded URLs")
+
+    args = parser.parse_args()
+    import config
+
+    if args.command == "build":
+        output = args.output or config.SNAPSHOT_PATH
+        stats = asyncio.run(build(args.requests, output, args.concurrency))
+        print(f"{output}: {stats.get('entries', 0)} URLs, {stats.get('records', 0)} records appended "
+              f"(compression {stats.get('compression_ratio', 0.0)}x), {stats['failed_requests']} failed requests")
+        return
+
+    path = args.path or config.SNAPSHOT_PATH
+    store = SnapshotStore(path)
+    try:
+        stats = store.stats()
+        print(f"{path}: {stats['entries']} URLs, {stats['data_bytes']} bytes, "
+              f"{stats['unindexed']} records not yet indexed")
+        if args.list and store._data is not None:
+            latest = {}
+            for _, _, key, recorded_at in store._iter_records(len(DATA_MAGIC)):
+                latest[key] = recorded_at
+            for key, recorded_at in sorted(latest.items()):
+                print(f"  {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(recorded_at))}  {key}")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,879 @@
 """
 Weather API client for the National Weather Service API.
 """
-from typing import Any, Dict, Optional, List, Tuple
+from typing import Any, AsyncIterator, Dict, Optional, List, Tuple, Union
 import httpx
 from httpx import Response
 import json
+import pickle
+import sqlite3
+import zlib
 import sys
 import asyncio
+import contextvars
+import importlib.util
+import time
+from email.utils import parsedate_to_datetime
 from pathlib import Path
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
 
-# Add parent directory to path to import config
-sys.path.append(str(Path(__file__).parent.parent))
 import config
+from utils.cache import TTLCache
+from utils.gazetteer import Gazetteer
+from utils.gridpoints import GridpointIndex
+from utils import metrics
+from utils.json_stream import ArrayItemParser, iter_array_items
+from utils.models import Alert, Forecast, GridData, Gridpoint, HourlyForecast, Place
+from utils.prefetch import PrefetchScheduler
+from utils.rate_limit import BACKGROUND, INTERACTIVE, TokenBucket
+from utils.shared_cache import SharedResponseCache
+from utils.snapshot import MODES as SNAPSHOT_MODES, SnapshotStore
+from utils.resilience import (
+    CircuitBreaker,
+    decorrelated_jitter,
+    is_retryable_exception,
+    is_retryable_status,
+    retry_after_seconds
+)
 
-async def make_nws_request(url: str) -> Optional[Dict[str, Any]]:
+# Statuses meaning a URL is gone for good (NWS moves gridpoints with redirects)
+GONE_STATUSES = (301, 308, 404, 410)
+
+class ResourceGoneError(Exception):
+    """Raised when NWS reports that a resource no longer exists at a URL."""
+
+    def __init__(self, url: str, status_code: int):
+        super().__init__(f"{url} returned HTTP {status_code}")
+        self.url = url
+        self.status_code = status_code
+
+class UpstreamUnavailableError(Exception):
+    """Raised by streaming reads when NWS data could not be fetched at all."""
+
+# A parsed response: alerts, forecasts, grid data and points are parsed into
+# models at this boundary (and cached as such); other endpoints are kept as JSON dicts
+Payload = Union[Tuple[Alert, ...], Forecast, HourlyForecast, GridData, Gridpoint, Dict[str, Any]]
+
+# Shared HTTP client, reused by every NWS request so connections stay pooled
+_client: Optional[httpx.AsyncClient] = None
+_client_users = 0
+
+def _http2_available() -> bool:
+    """Check whether HTTP/2 can be enabled (requires the optional 'h2' package)."""
+    if not config.HTTP2_ENABLED:
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+def _create_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP client used for all NWS requests."""
+    limits = httpx.Limits(
+        max_connections=config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY
+    )
+    return httpx.AsyncClient(
+        headers={
+            "User-Agent": config.USER_AGENT,
+            "Accept": "application/geo+json"
+        },
+        timeout=config.REQUEST_TIMEOUT,
+        limits=limits,
+        http2=_http2_available()
+    )
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client, creating it on first use.
+    
+    Returns:
+        The module-wide pooled httpx.AsyncClient
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create_client()
+    return _client
+
+async def open_client() -> None:
+    """
+    Register a user of the shared HTTP client at server startup.
+    
+    Calls are reference counted so that transports which run one lifespan
+    per session share a single client; pair every call with close_client().
+    The client itself (and its TLS context) is created by the first
+    request, so opening it adds nothing to the server's startup time.
+    """
+    global _client_users
+    _client_users += 1
+
+async def close_client() -> None:
+    """Release the shared HTTP client, closing it (and the snapshot) once the last user is gone."""
+    global _client, _client_users
+    _client_users = max(0, _client_users - 1)
+    if _client_users == 0 and _client is not None:
+        await _client.aclose()
+        _client = None
+    if _client_users == 0:
+        close_snapshot()
+
+# Cache of parsed NWS responses, keyed by URL
+_response_cache = TTLCache(config.CACHE_MAX_ENTRIES, config.CACHE_TTL, config.CACHE_STALE_GRACE)
+
+# Validators (ETag, Last-Modified) and parsed payloads for conditional requests
+_validators = TTLCache(config.CACHE_MAX_ENTRIES, config.CONDITIONAL_VALIDATOR_TTL)
+
+# In-flight upstream requests, keyed by URL, shared by concurrent callers
+_inflight: Dict[str, "asyncio.Future[Optional[Payload]]"] = {}
+
+# Response cache shared with other server processes, opened on first use
+_shared_cache: Optional[SharedResponseCache] = None
+
+# Seconds between checks for a response another process is fetching
+_SHARED_POLL_INTERVAL = 0.05
+
+# Snapshot of recorded responses, opened on first use (see config.SNAPSHOT_MODE)
+_snapshot: Optional[SnapshotStore] = None
+
+# Outbound rate limiter shared by every NWS request
+_rate_limiter: Optional[TokenBucket] = None
+if config.NWS_RATE_LIMIT > 0:
+    _rate_limiter = TokenBucket(config.NWS_RATE_LIMIT, config.NWS_RATE_BURST, config.NWS_RATE_LIMIT_FILE)
+
+# Priority of upstream requests started from the current context
+_request_priority: contextvars.ContextVar = contextvars.ContextVar("nws_request_priority", default=INTERACTIVE)
+
+# Circuit breakers, keyed by host
+_breakers: Dict[str, CircuitBreaker] = {}
+
+# Background refresh scheduler, running while the server is up
+_prefetcher: Optional[PrefetchScheduler] = None
+_prefetch_users = 0
+
+# Persistent gridpoint index, opened on first use
+_gridpoint_index: Optional[GridpointIndex] = None
+
+# Offline place-name index, mapped on first lookup
+_gazetteer: Optional[Gazetteer] = None
+
+# Upstream request counters
+_request_stats = {
+    "upstream_requests": 0,
+    "coalesced": 0,
+    "conditional_requests": 0,
+    "not_modified": 0,
+    "retries": 0,
+    "served_stale": 0,
+    "streamed_early_stops": 0
+}
+
+def _endpoint_ttl(url: str) -> float:
+    """
+    Get the configured cache TTL for an NWS endpoint.
+    
+    Args:
+        url: The full NWS API URL
+        
+    Returns:
+        TTL in seconds for responses from this endpoint
+    """
+    path = urlsplit(url).path
+    if path.startswith("/alerts"):
+        return config.CACHE_TTL_ALERTS
+    if path.startswith("/points/"):
+        return config.CACHE_TTL_POINTS
+    if path.startswith("/gridpoints/"):
+        return config.CACHE_TTL_FORECAST
+    return config.CACHE_TTL
+
+def _header_ttl(response: Response) -> Optional[float]:
+    """
+    Get the freshness lifetime advertised by Cache-Control/Expires headers.
+    
+    Args:
+        response: The NWS API response
+        
+    Returns:
+        TTL in seconds (0 if the response must not be cached) or None if
+        the response carries no caching headers
+    """
+    cache_control = response.headers.get("Cache-Control", "")
+    for directive in cache_control.lower().split(","):
+        directive = directive.strip()
+        if directive in ("no-store", "no-cache"):
+            return 0
+        if directive.startswith("max-age="):
+            try:
+                return max(0, int(directive.split("=", 1)[1]))
+            except ValueError:
+                pass
+    
+    expires = response.headers.get("Expires")
+    if expires:
+        try:
+            expires_at = parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            # Invalid Expires values mean "already expired"
+            return 0
+        return max(0, expires_at - time.time())
+    
+    return None
+
+def _cache_ttl(url: str, response: Response) -> float:
+    """Combine the endpoint TTL with any shorter lifetime set by NWS headers."""
+    ttl = _endpoint_ttl(url)
+    header_ttl = _header_ttl(response)
+    if header_ttl is not None:
+        ttl = min(ttl, header_ttl)
+    return ttl
+
+def get_cache_stats() -> Dict[str, int]:
+    """
+    Get response cache statistics.
+    
+    Returns:
+        Dict with cache size and hit/miss/eviction counters
+    """
+    return _response_cache.stats()
+
+def get_shared_cache() -> Optional[SharedResponseCache]:
+    """
+    Get the cross-process response cache, opening it on first use.
+    
+    Returns:
+        The SharedResponseCache, or None if sharing (or caching) is disabled
+    """
+    global _shared_cache
+    if not (config.SHARED_CACHE_ENABLED and config.ENABLE_CACHE):
+        return None
+    if _shared_cache is None:
+        _shared_cache = SharedResponseCache(config.SHARED_CACHE_PATH)
+    return _shared_cache
+
+def get_shared_cache_stats() -> Optional[Dict[str, int]]:
+    """
+    Get cross-process response cache statistics for this process.
+    
+    Returns:
+        Dict with hit/miss/write and fetch lease counters, or None if the
+        shared cache is disabled
+    """
+    shared = get_shared_cache()
+    return shared.stats() if shared else None
+
+def _shared_get(url: str) -> Optional[Payload]:
+    """Get a fresh response stored by any process, copying it into the local cache."""
+    shared = get_shared_cache()
+    if shared is None:
+        return None
+    try:
+        entry = shared.get(url)
+    except (sqlite3.Error, pickle.PickleError, AttributeError) as e:
+        print(f"Shared cache read failed for {url}: {e}", file=sys.stderr)
+        return None
+    if entry is None:
+        return None
+    data, remaining = entry
+    _response_cache.set(url, data, remaining)
+    return data
+
+def _shared_set(url: str, data: Payload, ttl: float) -> None:
+    """Store a response for the other processes."""
+    shared = get_shared_cache()
+    if shared is None:
+        return
+    try:
+        shared.set(url, data, ttl)
+    except sqlite3.Error as e:
+        print(f"Shared cache write failed for {url}: {e}", file=sys.stderr)
+
+def get_snapshot() -> Optional[SnapshotStore]:
+    """
+    Get the snapshot of recorded responses, opening it on first use.
+    
+    Returns:
+        The SnapshotStore, or None if config.SNAPSHOT_MODE is off (or invalid)
+    """
+    global _snapshot
+    if config.SNAPSHOT_MODE not in SNAPSHOT_MODES[1:]:
+        return None
+    if _snapshot is None:
+        _snapshot = SnapshotStore(config.SNAPSHOT_PATH, writable=config.SNAPSHOT_MODE == "record")
+    return _snapshot
+
+def get_snapshot_stats() -> Optional[Dict[str, Any]]:
+    """
+    Get snapshot statistics.
+    
+    Returns:
+        Dict with the snapshot mode, recorded URLs, lookup hits/misses and
+        records appended, or None if snapshots are off
+    """
+    snapshot = get_snapshot()
+    return {"mode": config.SNAPSHOT_MODE, **snapshot.stats()} if snapshot else None
+
+def close_snapshot() -> None:
+    """Close the snapshot, writing its index if responses were recorded."""
+    global _snapshot
+    if _snapshot is not None:
+        try:
+            _snapshot.close()
+        except OSError as e:
+            print(f"Failed to write snapshot index: {e}", file=sys.stderr)
+        _snapshot = None
+
+def _from_snapshot(url: str) -> Optional[Payload]:
+    """Parse a URL's recorded response from the snapshot (None if it was not recorded)."""
+    snapshot = get_snapshot()
+    if snapshot is None:
+        return None
+    endpoint = _endpoint_name(url)
+    try:
+        with metrics.span("snapshot.read", endpoint=endpoint):
+            body = snapshot.get(url)
+            return _parse_payload(url, json.loads(body)) if body is not None else None
+    except (OSError, ValueError, zlib.error) as e:
+        print(f"Failed to read {url} from the snapshot: {e}", file=sys.stderr)
+        return None
+
+def _record(url: str, body: bytes) -> None:
+    """Append a response body to the snapshot."""
+    snapshot = get_snapshot()
+    if snapshot is None:
+        return
+    try:
+        snapshot.append(url, body)
+    except OSError as e:
+        print(f"Failed to record {url} in the snapshot: {e}", file=sys.stderr)
+
+def _replay(url: str) -> Optional[Payload]:
+    """Serve a URL from the snapshot instead of NWS, caching it like a fetched response."""
+    data = _from_snapshot(url)
+    if data is None:
+        print(f"No snapshot of {url}", file=sys.stderr)
+        return None
+    if config.ENABLE_CACHE:
+        ttl = _endpoint_ttl(url)
+        _response_cache.set(url, data, ttl)
+        _shared_set(url, data, ttl)
+    return data
+
+def get_gridpoint_index() -> Optional[GridpointIndex]:
+    """
+    Get the gridpoint index, opening and warming it on first use.
+    
+    Returns:
+        The GridpointIndex, or None if the index is disabled
+    """
+    global _gridpoint_index
+    if not config.GRIDPOINT_INDEX_ENABLED:
+        return None
+    if _gridpoint_index is None:
+        _gridpoint_index = GridpointIndex(config.GRIDPOINT_INDEX_PATH, config.GRIDPOINT_PRECISION)
+        if config.GRIDPOINT_IMPORT_FILE:
+            try:
+                count = _gridpoint_index.import_file(Path(config.GRIDPOINT_IMPORT_FILE))
+                print(f"Imported {count} gridpoints from {config.GRIDPOINT_IMPORT_FILE}",
+                      file=sys.stderr)
+            except OSError as e:
+                print(f"Failed to import gridpoints: {e}", file=sys.stderr)
+    return _gridpoint_index
+
+async def start_prefetch() -> None:
+    """
+    Start the background refresh scheduler at server startup.
+    
+    Calls are reference counted like open_client(); pair every call with
+    stop_prefetch(). Does nothing if prefetching or caching is disabled.
+    """
+    global _prefetcher, _prefetch_users
+    if not (config.PREFETCH_ENABLED and config.ENABLE_CACHE):
+        return
+    _prefetch_users += 1
+    if _prefetcher is None:
+        _prefetcher = PrefetchScheduler(
+            refresh=_refresh,
+            expires_at=_response_cache.expires_at,
+            max_hot=config.PREFETCH_MAX_HOT,
+            refresh_ahead=config.PREFETCH_REFRESH_AHEAD,
+            budget_per_minute=config.PREFETCH_BUDGET_PER_MINUTE,
+            interval=config.PREFETCH_INTERVAL
+        )
+    _prefetcher.start()
+
+async def stop_prefetch() -> None:
+    """Stop the background refresh scheduler once the last user is gone."""
+    global _prefetch_users
+    if _prefetcher is None:
+        return
+    _prefetch_users = max(0, _prefetch_users - 1)
+    if _prefetch_users == 0:
+        await _prefetcher.stop()
+
+def get_prefetch_stats() -> Optional[Dict[str, Any]]:
+    """
+    Get background refresh statistics.
+    
+    Returns:
+        Dict with queue depth, refresh lag and stale-served counts, or None
+        if the scheduler has not been started
+    """
+    return _prefetcher.stats() if _prefetcher else None
+
+def _is_prefetchable(url: str) -> bool:
+    """Only alerts and gridpoint forecasts expire quickly enough to be worth refreshing."""
+    path = urlsplit(url).path
+    return path.startswith("/alerts") or path.startswith("/gridpoints/")
+
+def get_rate_limit_stats() -> Optional[Dict[str, Any]]:
+    """
+    Get outbound rate limiter statistics.
+    
+    Returns:
+        Dict with queue depth and per-priority queue times, or None if rate
+        limiting is disabled
+    """
+    return _rate_limiter.stats() if _rate_limiter else None
+
+def get_request_stats() -> Dict[str, int]:
+    """
+    Get upstream request statistics.
+    
+    Returns:
+        Dict with the number of upstream HTTP requests sent, calls that
+        joined an in-flight request instead, requests currently in flight,
+        how many conditional requests were answered with 304, retries,
+        stale payloads served during failures, alert streams stopped early
+        at their limit and per-host circuit states
+    """
+    conditional = _request_stats["conditional_requests"]
+    not_modified_rate = _request_stats["not_modified"] / conditional if conditional else 0.0
+    return {
+        **_request_stats,
+        "in_flight": len(_inflight),
+        "not_modified_rate": round(not_modified_rate, 3),
+        "circuits": {host: breaker.stats() for host, breaker in _breakers.items()}
+    }
+
+def clear_cache() -> None:
+    """Remove all cached NWS responses, including those shared with other processes."""
+    _response_cache.clear()
+    shared = get_shared_cache()
+    if shared is not None:
+        shared.clear()
+
+async def make_nws_request(url: str) -> Optional[Payload]:
     """
     Make a request to the NWS API with proper error handling.
     
+    Successful responses are cached per URL when config.ENABLE_CACHE is set,
+    and concurrent calls for the same URL share a single upstream request.
+    
     Args:
         url: The full URL to request from NWS API
         
     Returns:
-        Dict containing the JSON response or None if the request failed
+        The parsed response (see Payload) or None if the request failed
     """
-    headers = {
-        "User-Agent": config.USER_AGENT,
-        "Accept": "application/geo+json"
-    }
+    try:
+        return await _request(url)
+    except ResourceGoneError:
+        return None
+
+async def _request(url: str) -> Optional[Payload]:
+    """
+    Serve a URL from the cache or join/start the in-flight upstream request.
+    
+    Args:
+        url: The full URL to request from NWS API
+        
+    Returns:
+        The parsed response (see Payload) or None if the request failed
+        
+    Raises:
+        ResourceGoneError: If NWS reports the resource as moved or missing
+    """
+    if config.ENABLE_CACHE:
+        prefetcher = _record_request(url)
+        
+        cached = _response_cache.get(url)
+        if cached is not None:
+            return cached
+        
+        # Another server process may have fetched it already
+        shared = _shared_get(url)
+        if shared is not None:
+            return shared
+        
+        # Serve a recently expired copy while the scheduler refreshes it
+        if prefetcher is not None:
+            stale = _response_cache.get_stale(url)
+            if stale is not None:
+                prefetcher.mark_stale_served(url)
+                return stale
+    
+    return await _fetch_shared(url)
+
+def _record_request(url: str) -> Optional[PrefetchScheduler]:
+    """Count a request for a URL with the prefetch scheduler; return the scheduler if it tracks the URL."""
+    prefetcher = _prefetcher if _prefetch_users and _is_prefetchable(url) else None
+    if prefetcher is not None:
+        prefetcher.record(url)
+    return prefetcher
+
+def _register_inflight(url: str, task: "asyncio.Future[Optional[Payload]]") -> None:
+    """Make a task the in-flight fetch of a URL until it finishes."""
+    _inflight[url] = task
+    
+    def done(_: "asyncio.Future[Optional[Payload]]") -> None:
+        # A newer fetch may have taken the slot if this one left it early
+        if _inflight.get(url) is task:
+            del _inflight[url]
+    
+    task.add_done_callback(done)
+
+async def _fetch_shared(url: str) -> Optional[Payload]:
+    """
+    Join the in-flight upstream request for a URL, or start one.
+    
+    Args:
+        url: The full URL to request from NWS API
+        
+    Returns:
+        The parsed response (see Payload) or None if the request failed
+        
+    Raises:
+        ResourceGoneError: If NWS reports the resource as moved or missing
+    """
+    task = _inflight.get(url)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_coordinated(url))
+        _register_inflight(url, task)
+    else:
+        _request_stats["coalesced"] += 1
+    
+    # Shield the shared fetch so one cancelled caller doesn't cancel it for the others
+    return await asyncio.shield(task)
+
+async def _fetch_coordinated(url: str) -> Optional[Payload]:
+    """
+    Fetch a URL, letting only one server process fetch it at a time.
+    
+    With the shared cache enabled, the process that claims the URL's lease
+    fetches it; the others wait for its response to appear in the shared
+    cache, and fetch it themselves only if it does not arrive before the
+    lease lapses.
+    
+    Args:
+        url: The full URL to request from NWS API
+        
+    Returns:
+        The parsed response (see Payload) or None if the request failed
+        
+    Raises:
+        ResourceGoneError: If NWS reports the resource as moved or missing
+    """
+    shared = get_shared_cache()
+    if shared is None:
+        return await _fetch(url)
+    
+    owned = False
+    deadline = time.monotonic() + config.SHARED_CACHE_LEASE
+    try:
+        while not (owned := shared.claim(url, config.SHARED_CACHE_LEASE)):
+            data = _shared_get(url)
+            if data is not None:
+                return data
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(_SHARED_POLL_INTERVAL)
+    except sqlite3.Error as e:
+        print(f"Shared cache lease failed for {url}: {e}", file=sys.stderr)
+    
+    try:
+        return await _fetch(url)
+    finally:
+        if owned:
+            try:
+                shared.release(url)
+            except sqlite3.Error as e:
+                print(f"Shared cache release failed for {url}: {e}", file=sys.stderr)
+
+async def _refresh(url: str) -> None:
+    """Re-fetch a URL into the cache at background priority, bypassing the cached copy."""
+    _request_priority.set(BACKGROUND)
+    try:
+        data = await _fetch_shared(url)
+    except ResourceGoneError:
+        _response_cache.delete(url)
+        return
+    if data is None:
+        raise RuntimeError("upstream request failed")
+
+def _endpoint_name(url: str) -> str:
+    """Name the NWS endpoint of a URL, used to label metrics."""
+    path = urlsplit(url).path.rstrip("/")
+    if path.startswith("/alerts"):
+        return "alerts"
+    if path.startswith("/points/"):
+        return "points"
+    if path.startswith("/gridpoints/"):
+        if path.endswith("/forecast"):
+            return "forecast"
+        if path.endswith("/forecast/hourly"):
+            return "forecast_hourly"
+        return "grid_data" if path.count("/") == 3 else "gridpoints"
+    return "other"
+
+async def _fetch(url: str) -> Optional[Payload]:
+    """Fetch a URL upstream (see _fetch_with_retries), timing the whole fetch."""
+    if config.SNAPSHOT_MODE == "replay":
+        return _replay(url)
+    endpoint = _endpoint_name(url)
+    with metrics.span("nws.fetch", endpoint=endpoint):
+        return await _fetch_with_retries(url, endpoint)
+
+async def _fetch_with_retries(url: str, endpoint: str) -> Optional[Payload]:
+    """
+    Fetch a URL from the NWS API with retries and store the result in the cache.
+    
+    Every attempt first waits for the shared rate limiter. Timeouts,
+    connection errors, 429 and 5xx responses are retried with
+    decorrelated jitter (or as long as Retry-After asks) within the overall
+    config.REQUEST_DEADLINE. Other 4xx responses are not retried. While the
+    host's circuit breaker is open, requests fail fast. If the request
+    cannot be completed, the last known payload is served if one is kept.
+    
+    Args:
+        url: The full URL to request from NWS API
+        endpoint: Endpoint name of the URL, for metrics labels
+        
+    Returns:
+        The parsed response (see Payload) or None if the request failed
+        
+    Raises:
+        ResourceGoneError: If NWS reports the resource as moved or missing
+    """
+    breaker = _get_breaker(url)
+    if not breaker.allow():
+        print(f"Circuit open for {urlsplit(url).netloc}, not fetching {url}", file=sys.stderr)
+        return _fallback(url)
+    
+    client = get_client()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + config.REQUEST_DEADLINE
+    delay = config.RETRY_BASE_DELAY
+    
+    # Revalidate a previously seen payload instead of downloading it again
+    headers = {}
+    validated = _validators.get(url) if config.CONDITIONAL_REQUESTS else None
+    if validated is not None:
+        etag, last_modified, _ = validated
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
     
+    error: Optional[Exception] = None
     for attempt in range(config.MAX_RETRIES):
+        retry_after = None
+        if _rate_limiter is not None:
+            try:
+                with metrics.span("nws.rate_limit_wait", endpoint=endpoint):
+                    await asyncio.wait_for(
+                        _rate_limiter.acquire(_request_priority.get()),
+                        timeout=max(0.0, deadline - loop.time())
+                    )
+            except asyncio.TimeoutError:
+                error = TimeoutError("request deadline passed while waiting for the rate limiter")
+                break
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url, 
-                    headers=headers, 
-                    timeout=config.REQUEST_TIMEOUT
-                )
-                response.raise_for_status()
-                return response.json()
+            _request_stats["upstream_requests"] += 1
+            if headers:
+                _request_stats["conditional_requests"] += 1
+            request = client.build_request(
+                "GET", 
+                url, 
+                headers=headers, 
+                timeout=min(config.REQUEST_TIMEOUT, max(0.0, deadline - loop.time()))
+            )
+            with metrics.span("nws.response_headers", endpoint=endpoint):
+                response = await client.send(request, stream=True)
+            try:
+                if response.status_code == 304 and validated is not None:
+                    # Reuse the parsed payload; formatters reuse their output for it too
+                    _request_stats["not_modified"] += 1
+                    data = validated[2]
+                else:
+                    response.raise_for_status()
+                    data = await _read_payload(url, response)
+                    _store_validators(url, response, data)
+            finally:
+                await response.aclose()
+            
+            breaker.record_success()
+            if config.ENABLE_CACHE:
+                ttl = _cache_ttl(url, response)
+                _response_cache.set(url, data, ttl)
+                _shared_set(url, data, ttl)
+            return data
         except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                print(f"Resource not found: {url}", file=sys.stderr)
-                return None
-            if attempt == config.MAX_RETRIES - 1:
+            status_code = e.response.status_code
+            if status_code in GONE_STATUSES:
+                breaker.record_success()
+                print(f"Resource not found or moved (HTTP {status_code}): {url}",
+                      file=sys.stderr)
+                raise ResourceGoneError(url, status_code)
+            if not is_retryable_status(status_code):
+                # The host is healthy; the request itself is wrong
+                breaker.record_success()
                 print(f"Failed to fetch {url}: {e}", file=sys.stderr)
                 return None
-            # Wait before retry (with exponential backoff)
-            await asyncio.sleep(2 ** attempt)
+            breaker.record_failure()
+            retry_after = retry_after_seconds(e.response)
+            error = e
         except Exception as e:
-            print(f"Error fetching {url}: {e}", file=sys.stderr)
-            return None
+            if not is_retryable_exception(e):
+                # E.g. an unparseable body: the host answered, so it is reachable
+                breaker.record_success()
+                print(f"Error fetching {url}: {e}", file=sys.stderr)
+                return None
+            breaker.record_failure()
+            error = e
+        
+        if attempt == config.MAX_RETRIES - 1 or not breaker.allow():
+            break
+        
+        # Wait before retry, giving up if the wait would overrun the deadline
+        delay = decorrelated_jitter(delay, config.RETRY_BASE_DELAY, config.RETRY_MAX_DELAY)
+        wait = retry_after if retry_after is not None else delay
+        if loop.time() + wait >= deadline:
+            break
+        _request_stats["retries"] += 1
+        with metrics.span("nws.retry_backoff", endpoint=endpoint):
+            await asyncio.sleep(wait)
+    
+    print(f"Failed to fetch {url}: {error}", file=sys.stderr)
+    return _fallback(url)
+
+def _is_alerts_url(url: str) -> bool:
+    """Check whether a URL is an NWS alerts feed."""
+    return "/alerts" in urlsplit(url).path
+
+def _parse_payload(url: str, data: Dict[str, Any]) -> Payload:
+    """
+    Parse a JSON response into the model for its endpoint.
+    
+    Args:
+        url: The requested URL
+        data: The decoded JSON response
+        
+    Returns:
+        Alerts, Forecast, HourlyForecast, GridData or Gridpoint for those
+        endpoints, otherwise data
+        
+    Raises:
+        ValueError: If the response lacks the fields its model needs
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Response is not a JSON object")
+    path = urlsplit(url).path
+    if path.startswith("/alerts"):
+        features = data.get("features")
+        if not isinstance(features, list):
+            raise ValueError("Alerts response has no features")
+        return tuple(Alert.from_feature(feature) for feature in features)
+    if path.startswith("/points/"):
+        return Gridpoint.from_points(data)
+    if path.startswith("/gridpoints/"):
+        if path.endswith("/forecast"):
+            return Forecast.from_payload(data)
+        if path.endswith("/forecast/hourly"):
+            return HourlyForecast.from_payload(data)
+        # /gridpoints/{office}/{x},{y} is the raw forecastGridData
+        if path.rstrip("/").count("/") == 3:
+            return GridData.from_payload(data)
+    return data
+
+async def _read_payload(url: str, response: Response) -> Payload:
+    """
+    Read and parse a streamed response body.
+    
+    Alert feeds are parsed incrementally so geometry is discarded feature by
+    feature instead of the whole document being held in memory; other
+    responses are read in full, as are all responses while recording a
+    snapshot.
+    
+    Args:
+        url: The requested URL
+        response: Response opened with stream=True
+        
+    Returns:
+        The parsed payload
+        
+    Raises:
+        ValueError: If the body is not valid JSON or lacks required fields
+    """
+    endpoint = _endpoint_name(url)
+    recording = config.SNAPSHOT_MODE == "record"
+    if recording or not (config.ALERTS_STREAM_PARSE and _is_alerts_url(url)):
+        with metrics.span("nws.read_body", endpoint=endpoint):
+            await response.aread()
+        with metrics.span("nws.parse", endpoint=endpoint):
+            data = _parse_payload(url, response.json())
+        if recording:
+            _record(url, response.content)
+        return data
+    
+    # Reading and parsing are interleaved when streaming
+    with metrics.span("nws.read_parse_stream", endpoint=endpoint):
+        parser = ArrayItemParser("features", Alert.from_feature)
+        alerts = tuple([alert async for alert in iter_array_items(response.aiter_bytes(), parser)])
+    if not parser.found:
+        raise ValueError("Alerts response has no features")
+    return alerts
+
+def _fallback(url: str) -> Optional[Payload]:
+    """
+    Get the last known payload for a URL while upstream is unavailable.
+    
+    Args:
+        url: The full URL that could not be fetched
+        
+    Returns:
+        A stale cached or last validated payload, or the recorded one in
+        snapshot fallback mode; None if none is kept
+    """
+    data = _response_cache.get_stale(url)
+    if data is None:
+        validated = _validators.get(url)
+        data = validated[2] if validated else None
+    if data is None and config.SNAPSHOT_MODE == "fallback":
+        data = _from_snapshot(url)
+    if data is not None:
+        _request_stats["served_stale"] += 1
+    return data
+
+def _get_breaker(url: str) -> CircuitBreaker:
+    """Get the circuit breaker for a URL's host."""
+    host = urlsplit(url).netloc
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = CircuitBreaker(config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_RESET_TIMEOUT)
+        _breakers[host] = breaker
+    return breaker
+
+def _store_validators(url: str, response: Response, data: Payload) -> None:
+    """Remember a response's ETag/Last-Modified and payload for conditional requests."""
+    if not config.CONDITIONAL_REQUESTS:
+        return
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        _validators.set(url, (etag, last_modified, data))
+    else:
+        _validators.delete(url)
 
-async def get_alerts_for_state(state: str) -> Optional[Dict[str, Any]]:
+async def get_alerts_for_state(state: str) -> Optional[Tuple[Alert, ...]]:
     """
     Get weather alerts for a US state.
     
@@ -59,72 +881,611 @@ async def get_alerts_for_state(state: str) -> Optional[Dict[str, Any]]:
         state: Two-letter US state code (e.g. CA, NY)
         
     Returns:
-        Dict containing alerts data or None if the request failed
+        Tuple of alerts or None if the request failed
     """
     url = f"{config.NWS_API_BASE}/alerts/active/area/{state.upper()}"
     return await make_nws_request(url)
 
-async def get_points_data(latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+async def poll_alerts_for_state(state: str) -> Optional[Tuple[Alert, ...]]:
+    """
+    Get weather alerts for a US state at background priority.
+    
+    Used by the alert subscription feed, whose polls share the response
+    cache with get_alerts_for_state() but yield to interactive requests.
+    Sets the priority of the calling task, so run it in its own task.
+    
+    Args:
+        state: Two-letter US state code (e.g. CA, NY)
+        
+    Returns:
+        Tuple of alerts or None if the request failed
+    """
+    _request_priority.set(BACKGROUND)
+    return await get_alerts_for_state(state)
+
+def _start_alert_stream(url: str) -> Tuple["asyncio.Future[Optional[Payload]]", "asyncio.Queue[Optional[Alert]]"]:
+    """
+    Start the in-flight fetch of an alerts feed, streaming its alerts as they are parsed.
+    
+    The fetch is registered in _inflight like any other, so concurrent
+    requests for the feed wait for it instead of fetching it again. It
+    always reads the whole feed and caches it with its validators, even
+    if the caller that started it stops reading early.
+    
+    Args:
+        url: The full alerts URL to request from NWS API
+        
+    Returns:
+        Tuple of (the fetch task, a queue receiving each alert and then None
+        once the stream ends)
+    """
+    queue: "asyncio.Queue[Optional[Alert]]" = asyncio.Queue()
+    task = asyncio.ensure_future(_fetch_alert_stream(url, queue))
+    _register_inflight(url, task)
+    return task, queue
+
+class _StreamInterrupted(Exception):
+    """An alerts stream failed after NWS answered with 200."""
+
+async def _read_alert_stream(url: str, queue: "asyncio.Queue[Optional[Alert]]") -> Tuple[Response, Tuple[Alert, ...]]:
+    """
+    Make one streaming request for an alerts feed, putting each alert on a queue.
+    
+    Args:
+        url: The full alerts URL to request from NWS API
+        queue: Receives the alerts as they are parsed
+        
+    Returns:
+        Tuple of (the response, the parsed alerts)
+        
+    Raises:
+        httpx.HTTPStatusError: If NWS answers with an error status
+        _StreamInterrupted: If reading or parsing the body fails after a 200
+    """
+    if _rate_limiter is not None:
+        with metrics.span("nws.rate_limit_wait", endpoint="alerts"):
+            await _rate_limiter.acquire(_request_priority.get())
+    _request_stats["upstream_requests"] += 1
+    parser = ArrayItemParser("features", Alert.from_feature)
+    alerts = []
+    async with get_client().stream("GET", url) as response:
+        response.raise_for_status()
+        try:
+            with metrics.span("nws.read_parse_stream", endpoint="alerts"):
+                async for alert in iter_array_items(response.aiter_bytes(), parser):
+                    alerts.append(alert)
+                    queue.put_nowait(alert)
+            if not parser.found:
+                # Rejected like _parse_payload does, rather than cached as no alerts
+                raise ValueError("Alerts response has no features")
+        except Exception as e:
+            raise _StreamInterrupted(str(e)) from e
+    return response, tuple(alerts)
+
+async def _fetch_alert_stream(url: str, queue: "asyncio.Queue[Optional[Alert]]") -> Optional[Payload]:
+    """
+    Fetch an alerts feed with incremental parsing, putting each alert on a queue.
+    
+    Error statuses are handled as in _fetch_with_retries: 404/410 raise
+    ResourceGoneError, 429 and 5xx responses and connection errors are
+    retried with jitter and count against the host's circuit breaker, and
+    every attempt, body included, must finish within
+    config.REQUEST_DEADLINE. Only if the body fails to read or parse after
+    a 200 is the feed fetched again through the regular path.
+    
+    Args:
+        url: The full alerts URL to request from NWS API
+        queue: Receives the alerts as they are parsed, then None
+        
+    Returns:
+        The parsed feed or None if the request failed
+        
+    Raises:
+        ResourceGoneError: If NWS reports the resource as moved or missing
+    """
+    breaker = _get_breaker(url)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + config.REQUEST_DEADLINE
+    delay = config.RETRY_BASE_DELAY
+    error: Optional[Exception] = None
+    try:
+        with metrics.span("nws.fetch", endpoint="alerts"):
+            for attempt in range(config.MAX_RETRIES):
+                retry_after = None
+                try:
+                    response, data = await asyncio.wait_for(
+                        _read_alert_stream(url, queue),
+                        timeout=max(0.0, deadline - loop.time())
+                    )
+                except asyncio.TimeoutError:
+                    breaker.record_failure()
+                    error = TimeoutError("request deadline passed")
+                    break
+                except _StreamInterrupted as e:
+                    # The host answered; the body was cut short or malformed
+                    breaker.record_success()
+                    print(f"Streaming {url} failed, retrying without streaming: {e}", file=sys.stderr)
+                    return await _fetch(url)
+                except httpx.HTTPStatusError as e:
+                    status_code = e.response.status_code
+                    if status_code in GONE_STATUSES:
+                        breaker.record_success()
+                        print(f"Resource not found or moved (HTTP {status_code}): {url}",
+                              file=sys.stderr)
+                        raise ResourceGoneError(url, status_code)
+                    if not is_retryable_status(status_code):
+                        breaker.record_success()
+                        print(f"Failed to fetch {url}: {e}", file=sys.stderr)
+                        return None
+                    breaker.record_failure()
+                    retry_after = retry_after_seconds(e.response)
+                    error = e
+                except Exception as e:
+                    if not is_retryable_exception(e):
+                        breaker.record_success()
+                        print(f"Error fetching {url}: {e}", file=sys.stderr)
+                        return None
+                    breaker.record_failure()
+                    error = e
+                else:
+                    breaker.record_success()
+                    _store_validators(url, response, data)
+                    if config.ENABLE_CACHE:
+                        ttl = _cache_ttl(url, response)
+                        _response_cache.set(url, data, ttl)
+                        _shared_set(url, data, ttl)
+                    return data
+                
+                if attempt == config.MAX_RETRIES - 1 or not breaker.allow():
+                    break
+                delay = decorrelated_jitter(delay, config.RETRY_BASE_DELAY, config.RETRY_MAX_DELAY)
+                wait = retry_after if retry_after is not None else delay
+                if loop.time() + wait >= deadline:
+                    break
+                _request_stats["retries"] += 1
+                with metrics.span("nws.retry_backoff", endpoint="alerts"):
+                    await asyncio.sleep(wait)
+        
+        print(f"Failed to fetch {url}: {error}", file=sys.stderr)
+        return _fallback(url)
+    finally:
+        queue.put_nowait(None)
+        # The caller reading the queue may resume before the done callback runs
+        if _inflight.get(url) is asyncio.current_task():
+            del _inflight[url]
+
+async def stream_alert_features(url: str, limit: Optional[int] = None) -> AsyncIterator[Alert]:
+    """
+    Yield the alerts of an NWS alerts feed as the response arrives.
+    
+    When nothing is cached for the feed, it is fetched as the in-flight
+    request for the URL and each feature is yielded as soon as it is
+    parsed; concurrent callers share that request, and the whole feed is
+    cached (with its validators) even when this caller stops at limit.
+    Cached, stale, in-flight and revalidatable feeds go through the
+    regular request path instead, as do feeds whose host is unhealthy,
+    feeds shared with other server processes and feeds requested while a
+    snapshot is recorded or replayed.
+    
+    Args:
+        url: The full alerts URL to request from NWS API
+        limit: Maximum number of alerts to yield (None for all)
+        
+    Yields:
+        Alerts in feed order
+        
+    Raises:
+        UpstreamUnavailableError: If the feed could not be fetched
+    """
+    if limit is not None and limit <= 0:
+        return
+    
+    use_stream = (
+        config.ALERTS_STREAM_PARSE
+        and url not in _inflight
+        and (not config.ENABLE_CACHE or _response_cache.expires_at(url) is None)
+        and _validators.get(url) is None
+        and _get_breaker(url).state == CircuitBreaker.CLOSED
+        and get_shared_cache() is None
+        and config.SNAPSHOT_MODE in ("off", "fallback")
+    )
+    seen = set()
+    try:
+        if use_stream:
+            if config.ENABLE_CACHE:
+                _record_request(url)
+            task, queue = _start_alert_stream(url)
+            while (alert := await queue.get()) is not None:
+                seen.add(alert.id)
+                yield alert
+                if limit is not None and len(seen) >= limit:
+                    _request_stats["streamed_early_stops"] += 1
+                    return
+            # Shield the fetch so a cancelled caller doesn't cancel it for the others
+            data = await asyncio.shield(task)
+        else:
+            data = await _request(url)
+    except ResourceGoneError:
+        data = None
+    if data is None:
+        raise UpstreamUnavailableError(url)
+    
+    # Skip alerts already yielded by a stream that failed part-way
+    count = len(seen)
+    for alert in data:
+        if limit is not None and count >= limit:
+            return
+        if alert.id in seen:
+            continue
+        count += 1
+        yield alert
+
+async def stream_alerts_for_state(state: str, limit: Optional[int] = None) -> AsyncIterator[Alert]:
+    """
+    Yield weather alerts for a US state as they are parsed.
+    
+    Args:
+        state: Two-letter US state code (e.g. CA, NY)
+        limit: Maximum number of alerts to yield (None for all)
+        
+    Yields:
+        Alerts in feed order
+        
+    Raises:
+        UpstreamUnavailableError: If the alerts could not be fetched
+    """
+    url = f"{config.NWS_API_BASE}/alerts/active/area/{state.upper()}"
+    async for alert in stream_alert_features(url, limit):
+        yield alert
+
+async def get_active_alerts(states: Optional[List[str]] = None,
+                            zones: Optional[List[str]] = None,
+                            point: Optional[Tuple[float, float]] = None,
+                            severity: Optional[List[str]] = None,
+                            urgency: Optional[List[str]] = None,
+                            event: Optional[List[str]] = None) -> Optional[List[Alert]]:
+    """
+    Get active alerts for several areas, filtered on the NWS side.
+    
+    NWS accepts only one of area/zone/point per request, so states and
+    zones are fetched separately and merged (deduplicated by alert ID).
+    
+    Args:
+        states: Two-letter US state codes
+        zones: NWS zone IDs (e.g. CAZ006)
+        point: (latitude, longitude) tuple
+        severity: Severities to include (e.g. Severe, Extreme)
+        urgency: Urgencies to include (e.g. Immediate, Expected)
+        event: Event names to include (e.g. Wind Advisory)
+        
+    Returns:
+        List of the merged alerts, or None if every request failed
+    """
+    # Sorted, normalized parameters keep cache keys stable across callers
+    filters = {}
+    if severity:
+        filters["severity"] = ",".join(sorted({s.strip().capitalize() for s in severity}))
+    if urgency:
+        filters["urgency"] = ",".join(sorted({u.strip().capitalize() for u in urgency}))
+    if event:
+        filters["event"] = ",".join(sorted({e.strip() for e in event}))
+    
+    selectors = []
+    if states:
+        selectors.append({"area": ",".join(sorted({s.strip().upper() for s in states}))})
+    if zones:
+        selectors.append({"zone": ",".join(sorted({z.strip().upper() for z in zones}))})
+    if point:
+        selectors.append({"point": f"{point[0]},{point[1]}"})
+    if not selectors:
+        return None
+    
+    urls = [
+        f"{config.NWS_API_BASE}/alerts/active?{urlencode({**selector, **filters})}"
+        for selector in selectors
+    ]
+    responses = await asyncio.gather(*(make_nws_request(url) for url in urls))
+    if all(response is None for response in responses):
+        return None
+    
+    alerts = {}
+    for response in responses:
+        for alert in response or ():
+            alerts.setdefault(alert.id or id(alert), alert)
+    return list(alerts.values())
+
+def filter_alerts_by_onset(alerts: List[Alert],
+                           onset_after: Optional[datetime] = None,
+                           onset_before: Optional[datetime] = None) -> List[Alert]:
+    """
+    Keep only alerts whose onset falls inside a time window.
+    
+    NWS does not support onset filtering on active alerts, so this runs
+    locally. Alerts without an onset use their effective time instead.
+    
+    Args:
+        alerts: Alerts to filter
+        onset_after: Earliest onset to include (timezone-aware)
+        onset_before: Latest onset to include (timezone-aware)
+        
+    Returns:
+        List of the alerts inside the window
+    """
+    if onset_after is None and onset_before is None:
+        return alerts
+    
+    filtered = []
+    for alert in alerts:
+        try:
+            onset_time = datetime.fromisoformat(alert.onset or alert.effective)
+        except (TypeError, ValueError):
+            continue
+        if onset_after and onset_time < onset_after:
+            continue
+        if onset_before and onset_time > onset_before:
+            continue
+        filtered.append(alert)
+    return filtered
+
+async def get_points_data(latitude: float, longitude: float) -> Optional[Gridpoint]:
     """
     Get grid points data for a location, which is needed to fetch the forecast.
     
+    Successful responses are also recorded in the gridpoint index.
+    
     Args:
         latitude: Latitude of the location
         longitude: Longitude of the location
         
     Returns:
-        Dict containing points data or None if the request failed
+        The location's Gridpoint or None if the request failed
     """
     url = f"{config.NWS_API_BASE}/points/{latitude},{longitude}"
-    return await make_nws_request(url)
+    gridpoint = await make_nws_request(url)
+    
+    index = get_gridpoint_index()
+    if gridpoint and index is not None:
+        index.store(latitude, longitude, gridpoint)
+    
+    return gridpoint
 
-async def get_forecast_from_points_data(points_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+async def resolve_points(latitude: float, longitude: float) -> Optional[Gridpoint]:
     """
-    Get detailed forecast using the forecast URL from points data.
+    Resolve a location to its gridpoint, consulting the gridpoint index first.
     
     Args:
-        points_data: Points data from get_points_data()
+        latitude: Latitude of the location
+        longitude: Longitude of the location
         
     Returns:
-        Dict containing forecast data or None if the request failed
+        The location's Gridpoint, or None if the location could not be resolved
     """
-    try:
-        forecast_url = points_data["properties"]["forecast"]
-        return await make_nws_request(forecast_url)
-    except (KeyError, TypeError):
+    index = get_gridpoint_index()
+    if index is not None:
+        gridpoint = index.lookup(latitude, longitude)
+        if gridpoint:
+            return gridpoint
+    
+    return await get_points_data(latitude, longitude)
+
+async def get_forecast_from_points_data(gridpoint: Gridpoint) -> Optional[Forecast]:
+    """
+    Get detailed forecast using the forecast URL of a gridpoint.
+    
+    Args:
+        gridpoint: Gridpoint from get_points_data()
+        
+    Returns:
+        The Forecast or None if the request failed
+    """
+    if not gridpoint.forecast_url:
         print("Invalid points data or missing forecast URL", file=sys.stderr)
         return None
+    return await make_nws_request(gridpoint.forecast_url)
 
-async def get_forecast_for_location(latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+async def _get_for_location(latitude: float, longitude: float, url_attr: str) -> Optional[Payload]:
     """
-    Get weather forecast for a specific location.
+    Fetch one of a location's gridpoint URLs (forecast, hourly or grid data).
+    
+    Locations already in the gridpoint index are fetched with a single
+    request; if NWS reports the indexed URL as stale, the entry is
+    invalidated and the location is resolved again through /points.
     
     Args:
         latitude: Latitude of the location
         longitude: Longitude of the location
+        url_attr: Gridpoint attribute holding the URL to fetch
         
     Returns:
-        Dict containing forecast data or None if the request failed
+        The parsed response or None if the request failed
     """
-    points_data = await get_points_data(latitude, longitude)
-    if not points_data:
+    index = get_gridpoint_index()
+    if index is not None:
+        gridpoint = index.lookup(latitude, longitude)
+        if gridpoint and getattr(gridpoint, url_attr):
+            try:
+                return await _request(getattr(gridpoint, url_attr))
+            except ResourceGoneError:
+                index.invalidate_forecast_url(gridpoint.forecast_url)
+    
+    gridpoint = await get_points_data(latitude, longitude)
+    if not gridpoint:
+        return None
+    
+    url = getattr(gridpoint, url_attr)
+    if not url:
+        print(f"Points data has no {url_attr}", file=sys.stderr)
         return None
+    return await make_nws_request(url)
+
+async def get_forecast_for_location(latitude: float, longitude: float) -> Optional[Forecast]:
+    """
+    Get weather forecast for a specific location.
+    
+    Locations already in the gridpoint index are fetched with a single
+    request; if NWS reports the indexed forecast URL as stale, the entry is
+    invalidated and the location is resolved again through /points.
+    
+    Args:
+        latitude: Latitude of the location
+        longitude: Longitude of the location
+        
+    Returns:
+        The Forecast or None if the request failed
+    """
+    return await _get_for_location(latitude, longitude, "forecast_url")
+
+async def get_hourly_forecast_for_location(latitude: float, longitude: float) -> Optional[HourlyForecast]:
+    """
+    Get the hourly forecast for a specific location.
+    
+    Args:
+        latitude: Latitude of the location
+        longitude: Longitude of the location
+        
+    Returns:
+        The HourlyForecast or None if the request failed
+    """
+    return await _get_for_location(latitude, longitude, "forecast_hourly_url")
+
+async def get_grid_data_for_location(latitude: float, longitude: float) -> Optional[GridData]:
+    """
+    Get the raw gridpoint forecast layers for a specific location.
+    
+    Args:
+        latitude: Latitude of the location
+        longitude: Longitude of the location
+        
+    Returns:
+        The GridData or None if the request failed
+    """
+    return await _get_for_location(latitude, longitude, "forecast_grid_data_url")
+
+async def get_forecasts_for_locations(
+        locations: List[Tuple[float, float]],
+        max_concurrency: Optional[int] = None) -> List[Tuple[Optional[str], Optional[Forecast]]]:
+    """
+    Get weather forecasts for many locations at once.
+    
+    Duplicate coordinates are resolved once and locations that share a
+    gridpoint share a single forecast request. Upstream requests run with
+    at most max_concurrency in flight.
+    
+    Args:
+        locations: List of (latitude, longitude) tuples
+        max_concurrency: Concurrency limit (defaults to config.BATCH_MAX_CONCURRENCY)
+        
+    Returns:
+        List aligned with locations of (forecast URL, forecast data) tuples;
+        either element is None if that step failed
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or config.BATCH_MAX_CONCURRENCY)
+    
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+    
+    unique_locations = list(dict.fromkeys(locations))
+    points = await asyncio.gather(*(
+        bounded(resolve_points(latitude, longitude)) for latitude, longitude in unique_locations
+    ))
+    
+    forecast_urls: Dict[Tuple[float, float], Optional[str]] = {
+        location: gridpoint.forecast_url if gridpoint else None
+        for location, gridpoint in zip(unique_locations, points)
+    }
     
-    return await get_forecast_from_points_data(points_data)
+    async def fetch(url: str) -> Tuple[Optional[Forecast], bool]:
+        """Fetch a forecast URL, reporting whether NWS considers it stale."""
+        try:
+            return await _request(url), False
+        except ResourceGoneError:
+            index = get_gridpoint_index()
+            if index is not None:
+                index.invalidate_forecast_url(url)
+            return None, True
+    
+    unique_urls = list(dict.fromkeys(url for url in forecast_urls.values() if url))
+    fetched = dict(zip(unique_urls, await asyncio.gather(*(bounded(fetch(url)) for url in unique_urls))))
+    
+    # Re-resolve locations whose indexed forecast URL turned out to be stale
+    stale = [location for location, url in forecast_urls.items() if url and fetched[url][1]]
+    if stale:
+        refreshed = await asyncio.gather(*(
+            bounded(get_points_data(latitude, longitude)) for latitude, longitude in stale
+        ))
+        for location, gridpoint in zip(stale, refreshed):
+            forecast_urls[location] = gridpoint.forecast_url if gridpoint else None
+        new_urls = list(dict.fromkeys(
+            forecast_urls[location] for location in stale
+            if forecast_urls[location] and forecast_urls[location] not in fetched
+        ))
+        forecasts = await asyncio.gather(*(bounded(make_nws_request(url)) for url in new_urls))
+        fetched.update((url, (forecast, False)) for url, forecast in zip(new_urls, forecasts))
+    
+    results = []
+    for location in locations:
+        url = forecast_urls[location]
+        results.append((url, fetched[url][0] if url in fetched else None))
+    return results
+
+def get_gazetteer() -> Gazetteer:
+    """
+    Get the place-name index (its file is mapped on the first lookup).
+    
+    Returns:
+        The Gazetteer for config.GAZETTEER_PATH
+    """
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer(config.GAZETTEER_PATH, config.GAZETTEER_FUZZY_CUTOFF)
+    return _gazetteer
+
+def get_gazetteer_stats() -> Optional[Dict[str, float]]:
+    """
+    Get place-name index statistics.
+    
+    Returns:
+        Dict with the number of places, load time and hit/miss counters,
+        or None if no place has been looked up yet
+    """
+    return _gazetteer.stats() if _gazetteer is not None else None
+
+def search_places(query: str, limit: int = 5) -> List[Place]:
+    """
+    Find places matching a name or ZIP code in the offline gazetteer.
+    
+    Args:
+        query: Place name with optional state (e.g. "Portland, OR"), a name
+            prefix or a ZIP code
+        limit: Maximum number of places returned
+        
+    Returns:
+        Matching places, best match first (empty if nothing matches or the
+        gazetteer cannot be read)
+    """
+    try:
+        with metrics.span("gazetteer.search"):
+            return get_gazetteer().search(query, limit)
+    except (OSError, ValueError) as e:
+        print(f"Gazetteer lookup failed for {query!r}: {e}", file=sys.stderr)
+        return []
 
 async def get_location_from_address(address: str) -> Optional[Tuple[float, float]]:
     """
-    Get latitude and longitude for a given address using NWS API.
-    This is a placeholder - NWS doesn't provide geocoding.
-    In a real implementation, you'd integrate with a geocoding service.
+    Get latitude and longitude for a place name or ZIP code.
+    
+    Names are resolved offline from the bundled gazetteer of US cities and
+    ZIP code centroids (see utils.gazetteer); street addresses are not.
     
     Args:
-        address: Address or location name
+        address: Place name (e.g. "Portland, OR") or ZIP code
         
     Returns:
         Tuple of (latitude, longitude) or None if geocoding failed
     """
-    # This would normally use a geocoding API like Google Maps, OpenStreetMap, etc.
-    # For now, we'll just return None to indicate this isn't implemented
-    print(f"Geocoding not implemented for: {address}", file=sys.stderr)
-    return None
\ No newline at end of file
+    places = search_places(address, 1)
+    if not places:
+        print(f"No gazetteer match for: {address}", file=sys.stderr)
+        return None
+    return places[0].latitude, places[0].longitude
\ No newline at end of file
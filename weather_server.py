@@ -1,79 +1,598 @@
 """
 MCP Weather Server - Main implementation
 """
+import json
+import os
 import sys
-from pathlib import Path
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.types import CallToolResult, ServerCapabilities, TextContent
+from pydantic import AnyUrl
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 
-# Import our modules
-sys.path.append(str(Path(__file__).parent))
+# Import our modules (the repository root is on sys.path when run as a script or with -m)
 import config
-from utils import weather_api, formatters
+from utils import weather_api, formatters, metrics, series
+from utils.alert_feed import AlertFeed
+from utils.models import Place
 from deepseek_client import DeepseekClient
 
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Open the shared NWS HTTP client and background refresh on startup, close them on shutdown."""
+    await weather_api.open_client()
+    await weather_api.start_prefetch()
+    try:
+        yield
+    finally:
+        await weather_api.stop_prefetch()
+        await weather_api.close_client()
+
 # Initialize the MCP server
-mcp = FastMCP(config.SERVER_NAME)
+mcp = FastMCP(config.SERVER_NAME, host=config.SERVER_HOST, port=config.SERVER_PORT, lifespan=lifespan)
 
 # Initialize Deepseek client (if API key is available)
 deepseek = DeepseekClient()
 
-@mcp.tool()
-async def get_alerts(state: str) -> str:
+# Stats kept by the API client and Deepseek cache, exported with the metrics
+metrics.register_collector("cache", weather_api.get_cache_stats)
+metrics.register_collector("requests", weather_api.get_request_stats, labels={"circuits": "host"})
+metrics.register_collector("rate_limit", weather_api.get_rate_limit_stats)
+metrics.register_collector("prefetch", weather_api.get_prefetch_stats)
+metrics.register_collector("shared_cache", weather_api.get_shared_cache_stats)
+metrics.register_collector("snapshot", weather_api.get_snapshot_stats)
+metrics.register_collector("gazetteer", weather_api.get_gazetteer_stats)
+metrics.register_collector("enhancement_cache", lambda: deepseek.get_cache_stats())
+
+# Alert prefix of the subscribable weather://alerts/{state} resources
+ALERTS_URI = "weather://alerts/"
+
+async def _notify_alerts_changed(session: Any, state: str) -> None:
+    """Tell a subscribed session that a state's alerts resource has changes to read."""
+    await session.send_resource_updated(AnyUrl(ALERTS_URI + state))
+
+# Shared poller and change log behind the weather://alerts/{state} subscriptions
+alert_feed = AlertFeed(
+    weather_api.poll_alerts_for_state,
+    _notify_alerts_changed,
+    config.ALERT_FEED_INTERVAL,
+    config.ALERT_FEED_HISTORY
+)
+metrics.register_collector("alert_feed", alert_feed.stats)
+
+async def _enhance(weather_text: str, 
+                   query: str, 
+                   ttl: float,
+                   ctx: Optional[Context] = None, 
+                   stream: Optional[bool] = None) -> str:
+    """
+    Enhance formatted weather text with Deepseek, optionally streaming it.
+    
+    In streaming mode the raw weather text is sent first as a progress
+    notification, followed by notifications carrying the enhancement text
+    as it is generated. Progress notifications are only delivered when the
+    client supplied a progress token.
+    
+    Args:
+        weather_text: Formatted weather text
+        query: What the enhancement should focus on
+        ttl: How long the enhancement may be reused (freshness of the weather data)
+        ctx: MCP request context used to send progress notifications
+        stream: Whether to stream (defaults to config.DEEPSEEK_STREAM)
+        
+    Returns:
+        The enhanced text, or the original text if enhancement is unavailable
+    """
+    if not deepseek.is_available():
+        return weather_text
+    
+    if stream is None:
+        stream = config.DEEPSEEK_STREAM
+    if not stream or ctx is None:
+        with metrics.span("deepseek.enhance", mode="complete"):
+            return await deepseek.enhance_weather_interpretation(weather_text, query, ttl)
+    
+    await ctx.report_progress(0, message=weather_text)
+    
+    # Progress is the number of characters generated so far
+    parts = []
+    generated = 0
+    pending = ""
+    with metrics.span("deepseek.enhance", mode="stream"):
+        async for delta in deepseek.stream_weather_interpretation(weather_text, query, ttl):
+            parts.append(delta)
+            generated += len(delta)
+            pending += delta
+            if len(pending) >= config.DEEPSEEK_STREAM_CHUNK_CHARS:
+                await ctx.report_progress(generated, message=pending)
+                pending = ""
+    if pending:
+        await ctx.report_progress(generated, message=pending)
+    
+    return "".join(parts) or weather_text
+
+def _invalid_fields(fields: Optional[Sequence[str]], allowed: Sequence[str]) -> Optional[str]:
+    """Return an error message if any requested field is unknown."""
+    unknown = [field for field in fields or () if field not in allowed]
+    if unknown:
+        return f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(allowed)}."
+    return None
+
+def _structured_result(payload: Optional[Dict[str, Any]], error: str) -> CallToolResult:
+    """
+    Build a tool result carrying structured content.
+    
+    The compact JSON serialization is also sent as text for clients that
+    do not read structured content.
+    
+    Args:
+        payload: Structured data, or None if it could not be fetched
+        error: Message returned when there is no data
+        
+    Returns:
+        The tool result
+    """
+    if payload is None:
+        return CallToolResult(content=[TextContent(type="text", text=error)], isError=True)
+    text = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    return CallToolResult(content=[TextContent(type="text", text=text)], structuredContent=payload)
+
+# Tools with a structured mode return CallToolResult directly, so FastMCP must
+# not derive an output schema from the return annotation
+@mcp.tool(structured_output=False)
+@metrics.instrument_tool
+async def get_alerts(state: str, 
+                     stream: Optional[bool] = None, 
+                     structured: bool = False, 
+                     fields: Optional[List[str]] = None, 
+                     limit: int = 50, 
+                     ctx: Optional[Context] = None) -> Union[str, CallToolResult]:
     """
     Get weather alerts for a US state.
     
     Args:
         state: Two-letter US state code (e.g. CA, NY)
+        stream: Stream the AI interpretation as progress notifications
+        structured: Return compact JSON (structured content) instead of text
+        fields: Alert fields to include in structured output
+        limit: Maximum number of alerts to include
     """
     # Validate state code format (basic validation)
     if not state or len(state) != 2 or not state.isalpha():
         return "Please provide a valid two-letter US state code (e.g. CA, NY)"
+    if limit < 1:
+        return "Please provide a limit of at least 1."
     
-    # Get alerts data
-    alerts_data = await weather_api.get_alerts_for_state(state)
+    if structured:
+        error = _invalid_fields(fields, formatters.ALERT_FIELDS)
+        if error:
+            return error
+        alerts_data = await weather_api.get_alerts_for_state(state)
+        with metrics.span("format", tool="get_alerts"):
+            payload = formatters.alerts_to_dict(alerts_data, limit, tuple(fields or ()))
+        return _structured_result(payload, "Unable to fetch alerts or no alerts found.")
     
-    # Format alerts into readable text
-    formatted_alerts = formatters.format_alerts_summary(alerts_data)
+    # Format alerts one at a time as the feed is parsed, stopping at the limit
+    alerts_text = []
+    truncated = False
+    try:
+        # One extra alert tells whether the list was cut off; the feed keeps
+        # downloading in the background so it can be cached for later calls
+        async for feature in weather_api.stream_alerts_for_state(state, limit + 1):
+            if len(alerts_text) == limit:
+                truncated = True
+            else:
+                with metrics.span("format", tool="get_alerts"):
+                    alerts_text.append(formatters.format_alert(feature))
+    except weather_api.UpstreamUnavailableError:
+        return "Unable to fetch alerts or no alerts found."
+    if not alerts_text:
+        return "No active alerts for this area."
+    formatted_alerts = formatters.join_alert_texts(alerts_text, truncated)
     
     # Enhance with Deepseek if available
-    if deepseek.is_available():
-        enhanced_alerts = await deepseek.enhance_weather_interpretation(
-            formatted_alerts,
-            f"Summarize the weather alerts for {state} and explain their significance."
-        )
-        return enhanced_alerts
+    return await _enhance(
+        formatted_alerts,
+        f"Summarize the weather alerts for {state} and explain their significance.",
+        config.CACHE_TTL_ALERTS,
+        ctx,
+        stream
+    )
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO 8601 time, treating times without an offset as UTC."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+@mcp.tool(structured_output=False)
+@metrics.instrument_tool
+async def search_alerts(states: Optional[List[str]] = None, 
+                        zones: Optional[List[str]] = None, 
+                        latitude: Optional[float] = None, 
+                        longitude: Optional[float] = None, 
+                        severity: Optional[List[str]] = None, 
+                        urgency: Optional[List[str]] = None, 
+                        event: Optional[List[str]] = None, 
+                        onset_after: Optional[str] = None, 
+                        onset_before: Optional[str] = None, 
+                        compact: bool = True, 
+                        limit: int = 50) -> str:
+    """
+    Search active weather alerts across several states, zones or a point.
+    
+    Args:
+        states: Two-letter US state codes (e.g. ["CA", "NV"])
+        zones: NWS zone IDs (e.g. ["CAZ006"])
+        latitude: Latitude of a point to get alerts for (with longitude)
+        longitude: Longitude of a point to get alerts for (with latitude)
+        severity: Severities to include: Extreme, Severe, Moderate, Minor
+        urgency: Urgencies to include: Immediate, Expected, Future, Past
+        event: Event names to include (e.g. ["Wind Advisory"])
+        onset_after: Only alerts starting at or after this ISO 8601 time
+        onset_before: Only alerts starting at or before this ISO 8601 time
+        compact: One line per alert instead of full descriptions
+        limit: Maximum number of alerts to include
+    """
+    if states and any(len(state) != 2 or not state.isalpha() for state in states):
+        return "Please provide valid two-letter US state codes (e.g. CA, NY)"
+    if limit < 1:
+        return "Please provide a limit of at least 1."
+    
+    point = None
+    if latitude is not None or longitude is not None:
+        if latitude is None or longitude is None:
+            return "Please provide both latitude and longitude for a point query."
+        if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+            return "Please provide valid latitude (-90 to 90) and longitude (-180 to 180) coordinates."
+        point = (latitude, longitude)
+    
+    if not states and not zones and point is None:
+        return "Please provide states, zones or a latitude/longitude point."
     
-    return formatted_alerts
+    try:
+        after = _parse_time(onset_after)
+        before = _parse_time(onset_before)
+    except ValueError:
+        return "Please provide onset times in ISO 8601 format (e.g. 2025-01-31T18:00:00Z)."
+    
+    alerts_data = await weather_api.get_active_alerts(
+        states=states, zones=zones, point=point,
+        severity=severity, urgency=urgency, event=event
+    )
+    if alerts_data is None:
+        return "Unable to fetch alerts or no alerts found."
+    alerts_data = weather_api.filter_alerts_by_onset(alerts_data, after, before)
+    
+    with metrics.span("format", tool="search_alerts"):
+        if compact:
+            return formatters.format_alerts_compact(alerts_data, limit)
+        return formatters.format_alerts_summary(alerts_data[:limit])
 
-@mcp.tool()
-async def get_forecast(latitude: float, longitude: float) -> str:
+@mcp.tool(structured_output=False)
+@metrics.instrument_tool
+async def get_forecast(latitude: float, 
+                       longitude: float, 
+                       stream: Optional[bool] = None, 
+                       structured: bool = False, 
+                       fields: Optional[List[str]] = None, 
+                       periods: int = 5, 
+                       ctx: Optional[Context] = None) -> Union[str, CallToolResult]:
     """
     Get weather forecast for a location.
     
     Args:
         latitude: Latitude of the location
         longitude: Longitude of the location
+        stream: Stream the AI interpretation as progress notifications
+        structured: Return compact JSON (structured content) instead of text
+        fields: Period fields to include in structured output
+        periods: Number of forecast periods to include
     """
     # Validate coordinates (basic validation)
     if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
         return "Please provide valid latitude (-90 to 90) and longitude (-180 to 180) coordinates."
+    if periods < 1:
+        return "Please provide at least 1 forecast period."
+    
+    if structured:
+        error = _invalid_fields(fields, formatters.FORECAST_FIELDS)
+        if error:
+            return error
+    
+    return await _forecast(latitude, longitude, stream, structured, fields, periods, ctx)
+
+async def _forecast(latitude: float, 
+                    longitude: float, 
+                    stream: Optional[bool], 
+                    structured: bool, 
+                    fields: Optional[List[str]], 
+                    periods: int, 
+                    ctx: Optional[Context], 
+                    places: Sequence[Place] = (), 
+                    tool: str = "get_forecast") -> Union[str, CallToolResult]:
+    """
+    Fetch, format and enhance the forecast for validated coordinates.
     
+    Args:
+        latitude: Latitude of the location
+        longitude: Longitude of the location
+        stream: Stream the AI interpretation as progress notifications
+        structured: Return compact JSON (structured content) instead of text
+        fields: Period fields to include in structured output
+        periods: Number of forecast periods to include
+        ctx: Request context, for progress notifications
+        places: Gazetteer places the location was resolved from, best match first
+        tool: Tool name for metrics labels
+        
+    Returns:
+        The tool result
+    """
     # Get forecast data
     forecast_data = await weather_api.get_forecast_for_location(latitude, longitude)
     
+    if structured:
+        with metrics.span("format", tool=tool):
+            payload = formatters.forecast_to_dict(forecast_data, periods, tuple(fields or ()))
+        if payload is not None and places:
+            payload = {
+                "place": places[0].to_dict(),
+                "alternatives": [place.label for place in places[1:]],
+                **payload
+            }
+        return _structured_result(payload, "Unable to fetch forecast data.")
+    
     # Format forecast into readable text
-    formatted_forecast = formatters.format_forecast(forecast_data)
+    with metrics.span("format", tool=tool):
+        formatted_forecast = formatters.format_forecast(forecast_data, periods)
+    if places:
+        resolved = f"Location: {places[0].label} ({places[0].latitude:.4f}, {places[0].longitude:.4f})"
+        if len(places) > 1:
+            resolved += "\nOther matches: " + "; ".join(place.label for place in places[1:])
+        formatted_forecast = f"{resolved}\n\n{formatted_forecast}"
     
     # Enhance with Deepseek if available
-    if deepseek.is_available():
-        enhanced_forecast = await deepseek.enhance_weather_interpretation(
-            formatted_forecast,
-            f"Provide key takeaways from this forecast and any notable weather patterns."
+    return await _enhance(
+        formatted_forecast,
+        "Provide key takeaways from this forecast and any notable weather patterns.",
+        config.CACHE_TTL_FORECAST,
+        ctx,
+        stream
+    )
+
+@mcp.tool(structured_output=False)
+@metrics.instrument_tool
+async def get_forecast_by_place(place: str, 
+                                stream: Optional[bool] = None, 
+                                structured: bool = False, 
+                                fields: Optional[List[str]] = None, 
+                                periods: int = 5, 
+                                ctx: Optional[Context] = None) -> Union[str, CallToolResult]:
+    """
+    Get weather forecast for a US city or ZIP code.
+    
+    The place is resolved offline from a gazetteer of US cities and ZIP code
+    centroids; without a state the most populous match is used, and
+    misspelled names are matched to the closest known place.
+    
+    Args:
+        place: City with optional state (e.g. "Portland, OR", "portland oregon") or a ZIP code
+        stream: Stream the AI interpretation as progress notifications
+        structured: Return compact JSON (structured content) instead of text
+        fields: Period fields to include in structured output
+        periods: Number of forecast periods to include
+    """
+    if periods < 1:
+        return "Please provide at least 1 forecast period."
+    if structured:
+        error = _invalid_fields(fields, formatters.FORECAST_FIELDS)
+        if error:
+            return error
+    
+    places = weather_api.search_places(place, 3)
+    if not places:
+        return f"Could not find a US city or ZIP code matching '{place}'. Try adding the state (e.g. \"Portland, OR\")."
+    
+    return await _forecast(places[0].latitude, places[0].longitude, stream, structured, fields, periods, ctx,
+                           places, "get_forecast_by_place")
+
+@mcp.tool(structured_output=False)
+@metrics.instrument_tool
+async def get_hourly_forecast(latitude: float, 
+                              longitude: float, 
+                              hours: int = 48, 
+                              precipitation_threshold: float = 30) -> Union[str, CallToolResult]:
+    """
+    Summarize the hourly forecast for a location as compact JSON.
+    
+    Reports temperature range and mean, the time windows where the chance of
+    precipitation reaches the threshold, and peak wind speed.
+    
+    Args:
+        latitude: Latitude of the location
+        longitude: Longitude of the location
+        hours: Number of hours to summarize (up to 156)
+        precipitation_threshold: Chance of precipitation (%) that counts as a wet hour
+    """
+    if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+        return "Please provide valid latitude (-90 to 90) and longitude (-180 to 180) coordinates."
+    if hours < 1:
+        return "Please provide a positive number of hours."
+    
+    forecast = await weather_api.get_hourly_forecast_for_location(latitude, longitude)
+    with metrics.span("format", tool="get_hourly_forecast"):
+        summary = series.summarize_hourly(forecast, hours, precipitation_threshold) if forecast else None
+    return _structured_result(summary, "Unable to fetch hourly forecast data.")
+
+@mcp.tool(structured_output=False)
+@metrics.instrument_tool
+async def get_gridpoint_summary(latitude: float, 
+                                longitude: float, 
+                                hours: int = 168, 
+                                precipitation_threshold: float = 30) -> Union[str, CallToolResult]:
+    """
+    Summarize the raw gridpoint forecast data for a location as compact JSON.
+    
+    Adds to the hourly summary the total precipitation amount and peak wind
+    gusts, which only the raw grid data carries.
+    
+    Args:
+        latitude: Latitude of the location
+        longitude: Longitude of the location
+        hours: Number of hours to summarize (up to about 7 days)
+        precipitation_threshold: Chance of precipitation (%) that counts as a wet hour
+    """
+    if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+        return "Please provide valid latitude (-90 to 90) and longitude (-180 to 180) coordinates."
+    if hours < 1:
+        return "Please provide a positive number of hours."
+    
+    grid = await weather_api.get_grid_data_for_location(latitude, longitude)
+    with metrics.span("format", tool="get_gridpoint_summary"):
+        summary = series.summarize_grid_data(grid, hours, precipitation_threshold) if grid else None
+    return _structured_result(summary, "Unable to fetch gridpoint data.")
+
+@mcp.tool(structured_output=False)
+@metrics.instrument_tool
+async def get_forecasts_batch(locations: List[Dict[str, float]], 
+                              periods: int = 2, 
+                              summarize: bool = False, 
+                              ctx: Optional[Context] = None) -> str:
+    """
+    Get weather forecasts for many locations in one call.
+    
+    Locations that fall in the same forecast grid cell share one upstream
+    request. Each location gets its own forecast or error message.
+    
+    Args:
+        locations: List of {"latitude": ..., "longitude": ...} objects
+        periods: Number of forecast periods to include per location
+        summarize: Add a single AI summary covering all locations
+    """
+    if not locations:
+        return "Please provide at least one location."
+    if len(locations) > config.BATCH_MAX_LOCATIONS:
+        return f"Please provide at most {config.BATCH_MAX_LOCATIONS} locations per batch."
+    if periods < 1:
+        return "Please provide at least 1 forecast period."
+    
+    # Validate coordinates, keeping per-location errors
+    coordinates = []
+    errors = {}
+    for i, location in enumerate(locations):
+        try:
+            latitude = float(location["latitude"])
+            longitude = float(location["longitude"])
+        except (KeyError, TypeError, ValueError):
+            errors[i] = "Expected an object with numeric latitude and longitude."
+            continue
+        if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+            errors[i] = "Latitude must be -90 to 90 and longitude -180 to 180."
+            continue
+        coordinates.append((i, (latitude, longitude)))
+    
+    forecasts = await weather_api.get_forecasts_for_locations([coord for _, coord in coordinates])
+    
+    # Format each gridpoint once, even if several locations share it
+    formatted: Dict[str, str] = {}
+    results: Dict[int, str] = {}
+    for (i, _), (forecast_url, forecast_data) in zip(coordinates, forecasts):
+        if forecast_data is None:
+            errors[i] = "Unable to fetch forecast data."
+            continue
+        if forecast_url not in formatted:
+            with metrics.span("format", tool="get_forecasts_batch"):
+                formatted[forecast_url] = formatters.format_forecast(forecast_data, periods)
+        results[i] = formatted[forecast_url]
+    
+    sections = []
+    for i, location in enumerate(locations):
+        label = f"Location {i + 1}"
+        if isinstance(location, dict) and "latitude" in location and "longitude" in location:
+            label += f" ({location['latitude']}, {location['longitude']})"
+        body = results.get(i) or f"Error: {errors[i]}"
+        sections.append(f"{label}:\n{body}")
+    
+    batch_text = ("\n\n" + "=" * 40 + "\n\n").join(sections)
+    
+    if summarize and results:
+        summary = await _enhance(
+            batch_text,
+            "Summarize the forecasts across all of these locations in one overview, "
+            "highlighting locations with notable or hazardous weather.",
+            config.CACHE_TTL_FORECAST,
+            ctx
         )
-        return enhanced_forecast
+        return f"{summary}\n\n{'=' * 40}\n\n{batch_text}"
+    
+    return batch_text
+
+@mcp.resource("weather://metrics", mime_type="application/json")
+def get_metrics() -> str:
+    """Per-stage latency histograms, tool concurrency and cache/request counters."""
+    return json.dumps(metrics.snapshot(), indent=2)
+
+def _alerts_state(uri: Union[AnyUrl, str]) -> str:
+    """
+    Get the state code of a weather://alerts/{state} URI.
+    
+    Raises:
+        ValueError: If the URI is not an alerts resource of a two-letter area code
+    """
+    uri = str(uri)
+    state = uri[len(ALERTS_URI):].upper() if uri.startswith(ALERTS_URI) else ""
+    if len(state) != 2 or not state.isalpha():
+        raise ValueError(f"Cannot subscribe to {uri}; subscribable resources are {ALERTS_URI}{{state}}")
+    return state
+
+@mcp.resource("weather://alerts/{state}", mime_type="application/json")
+async def get_alert_changes(state: str, ctx: Context) -> str:
+    """
+    Active alerts for a US state as a change feed.
     
-    return formatted_forecast
+    Subscribe to the resource to be notified when its alerts change; each
+    read by a subscribed session then returns only the alerts that are
+    new, updated or expired since that session's previous read. The first
+    read after subscribing, and any read without a subscription, returns
+    all active alerts.
+    """
+    state = _alerts_state(ALERTS_URI + state)
+    with metrics.span("alert_feed.read"):
+        return json.dumps(await alert_feed.read(state, ctx.session))
+
+@mcp._mcp_server.subscribe_resource()
+async def subscribe_resource(uri: AnyUrl) -> None:
+    """Subscribe the requesting session to a weather://alerts/{state} resource."""
+    await alert_feed.subscribe(mcp._mcp_server.request_context.session, _alerts_state(uri))
+
+@mcp._mcp_server.unsubscribe_resource()
+async def unsubscribe_resource(uri: AnyUrl) -> None:
+    """Unsubscribe the requesting session from a weather://alerts/{state} resource."""
+    await alert_feed.unsubscribe(mcp._mcp_server.request_context.session, _alerts_state(uri))
+
+_server_capabilities = mcp._mcp_server.get_capabilities
+
+def _get_capabilities(*args: Any, **kwargs: Any) -> ServerCapabilities:
+    """Advertise resource subscriptions, which FastMCP leaves disabled even with a handler."""
+    capabilities = _server_capabilities(*args, **kwargs)
+    if capabilities.resources is not None:
+        capabilities.resources.subscribe = True
+    return capabilities
+
+mcp._mcp_server.get_capabilities = _get_capabilities
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    """Serve the metrics in Prometheus text format on the HTTP transports."""
+    return PlainTextResponse(metrics.prometheus(), media_type="text/plain; version=0.0.4")
 
 @mcp.resource("weather://help")
 def get_help() -> str:
@@ -85,19 +604,114 @@ This server provides weather information through the following tools:
 
 ## Tools
 
-- **get_alerts(state)**: Get weather alerts for a US state (use two-letter state code)
+- **get_alerts(state, stream, structured, fields, limit)**: Get weather alerts for a US state (use two-letter state code)
   Example: get_alerts("CA") for California alerts
 
-- **get_forecast(latitude, longitude)**: Get weather forecast for a specific location
+- **get_forecast(latitude, longitude, stream, structured, fields, periods)**: Get weather forecast for a specific location
   Example: get_forecast(37.7749, -122.4194) for San Francisco
 
+- **get_forecast_by_place(place, stream, structured, fields, periods)**: Get weather forecast for a US city
+  or ZIP code, resolved offline (state optional; misspellings are matched to the closest place)
+  Example: get_forecast_by_place("Portland, OR") or get_forecast_by_place("94103")
+
+- **get_hourly_forecast(latitude, longitude, hours, precipitation_threshold)**: Summarize the hourly forecast
+  (temperature range, wet windows, peak wind) as compact JSON
+  Example: get_hourly_forecast(37.7749, -122.4194, hours=24)
+
+- **get_gridpoint_summary(latitude, longitude, hours, precipitation_threshold)**: Summarize the raw gridpoint
+  data, including total precipitation and peak gusts, as compact JSON
+  Example: get_gridpoint_summary(37.7749, -122.4194)
+
+- **search_alerts(states, zones, latitude, longitude, severity, urgency, event, onset_after, onset_before, compact, limit)**:
+  Search active alerts across several areas with filters, one line per alert by default
+  Example: search_alerts(states=["CA", "NV"], severity=["Severe", "Extreme"])
+
+- **get_forecasts_batch(locations, periods, summarize)**: Get forecasts for many locations at once
+  Example: get_forecasts_batch([{"latitude": 37.7749, "longitude": -122.4194},
+                                {"latitude": 34.0522, "longitude": -118.2437}])
+
+Set `stream` to true to receive the raw weather text and the AI interpretation
+incrementally as progress notifications (requires a progress token).
+
+Set `structured` to true on get_alerts or get_forecast to get compact JSON
+(structured content) without prose or AI interpretation, optionally limited
+to the listed `fields`.
+Example: get_forecast(37.7749, -122.4194, structured=True, periods=3,
+                      fields=["name", "temperature", "shortForecast"])
+
+## Resources
+
+- **weather://metrics**: Latency histograms per stage (NWS fetch, rate limiter
+  wait, body read, parsing, formatting, Deepseek), per-tool call counts and
+  in-flight gauges, and cache/coalescing/retry counters as JSON. On the HTTP
+  transports the same metrics are served in Prometheus format at /metrics.
+
+- **weather://alerts/{state}**: Active alerts for a state as JSON. Subscribe to it
+  (resources/subscribe) to be notified when alerts change; after the first read,
+  each read returns only the new, updated and expired alerts since the last one.
+  Example: subscribe to weather://alerts/CA, then read it on each update notification
+
 ## Usage Tips
 
-- For forecasts, you'll need to know the latitude and longitude coordinates
+- For forecasts, use latitude and longitude coordinates, or get_forecast_by_place for US cities and ZIP codes
 - Alerts are organized by state and include severity and instructions
 - This server uses data from the US National Weather Service API
     """
 
+def create_worker_app() -> Starlette:
+    """
+    Build the streamable HTTP app run by each worker process.
+    
+    Workers run in stateless mode, since consecutive requests of one client
+    session may reach different workers. Stateless requests each enter the
+    server lifespan, so the worker also holds it for its whole lifetime;
+    the per-request entries then only bump the reference counts of the
+    shared HTTP client and prefetch scheduler instead of reopening them.
+    
+    Returns:
+        The ASGI application
+    """
+    mcp.settings.stateless_http = True
+    app = mcp.streamable_http_app()
+    session_manager_lifespan = app.router.lifespan_context
+    
+    @asynccontextmanager
+    async def worker_lifespan(app: Starlette) -> AsyncIterator[None]:
+        async with lifespan(mcp), session_manager_lifespan(app):
+            yield
+    
+    app.router.lifespan_context = worker_lifespan
+    return app
+
+def run_workers() -> None:
+    """
+    Serve streamable HTTP from config.SERVER_WORKERS processes on one socket.
+    
+    The supervisor binds the socket and restarts workers that exit,
+    including those recycled after config.SERVER_WORKER_MAX_REQUESTS
+    requests; SIGHUP restarts all workers and SIGTERM/SIGINT shut them down
+    after in-flight requests finish (up to config.SERVER_GRACEFUL_TIMEOUT).
+    Workers share the response, gridpoint and enhancement caches and the
+    NWS rate limit through files in config.CACHE_DIR.
+    """
+    import uvicorn
+    
+    # Read by config in each worker process as it starts
+    os.environ["WEATHER_SHARED_CACHE"] = "1"
+    os.environ.setdefault("NWS_RATE_LIMIT_FILE", str(config.CACHE_DIR / "nws_rate_limit"))
+    config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    
+    uvicorn.run(
+        "weather_server:create_worker_app",
+        factory=True,
+        host=config.SERVER_HOST,
+        port=config.SERVER_PORT,
+        workers=config.SERVER_WORKERS,
+        limit_max_requests=config.SERVER_WORKER_MAX_REQUESTS or None,
+        timeout_graceful_shutdown=config.SERVER_GRACEFUL_TIMEOUT,
+        log_level=mcp.settings.log_level.lower()
+    )
+
 if __name__ == "__main__":
     print("Starting Weather MCP Server...", file=sys.stderr)
     
@@ -108,4 +722,11 @@ if __name__ == "__main__":
         print("Deepseek API integration disabled (no API key provided).", file=sys.stderr)
     
     # Run the server with configured transport
-    mcp.run(transport=config.DEFAULT_TRANSPORT)
\ No newline at end of file
+    if config.SERVER_WORKERS > 1 and config.DEFAULT_TRANSPORT == "streamable-http":
+        print(f"Starting {config.SERVER_WORKERS} streamable-http workers.", file=sys.stderr)
+        run_workers()
+    else:
+        if config.SERVER_WORKERS > 1:
+            print(f"MCP_WORKERS is only supported with streamable-http; "
+                  f"running a single {config.DEFAULT_TRANSPORT} server.", file=sys.stderr)
+        mcp.run(transport=config.DEFAULT_TRANSPORT)
\ No newline at end of file